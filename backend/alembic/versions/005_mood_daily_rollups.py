@@ -0,0 +1,92 @@
+"""Mood daily rollups
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+# Aggregate every existing mood log into its user's local day. Unknown timezone
+# names fall back to UTC, matching MoodService._local_timezone.
+BACKFILL_SQL = """
+INSERT INTO mood_daily_rollups (
+    id, user_id, local_date, day_of_week,
+    log_count, mood_sum, mood_min, mood_max,
+    energy_count, energy_sum, energy_min, energy_max,
+    anxiety_count, anxiety_sum, anxiety_min, anxiety_max
+)
+SELECT
+    gen_random_uuid(),
+    days.user_id,
+    days.local_date,
+    EXTRACT(ISODOW FROM days.local_date)::smallint - 1,
+    COUNT(*),
+    SUM(days.mood_score),
+    MIN(days.mood_score),
+    MAX(days.mood_score),
+    COUNT(days.energy_level),
+    COALESCE(SUM(days.energy_level), 0),
+    MIN(days.energy_level),
+    MAX(days.energy_level),
+    COUNT(days.anxiety_level),
+    COALESCE(SUM(days.anxiety_level), 0),
+    MIN(days.anxiety_level),
+    MAX(days.anxiety_level)
+FROM (
+    SELECT
+        l.user_id,
+        date(timezone(
+            CASE WHEN u.timezone IN (SELECT name FROM pg_timezone_names) THEN u.timezone ELSE 'UTC' END,
+            l.logged_at
+        )) AS local_date,
+        l.mood_score,
+        l.energy_level,
+        l.anxiety_level
+    FROM mood_logs l
+    JOIN users u ON u.id = l.user_id
+) AS days
+GROUP BY days.user_id, days.local_date
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'mood_daily_rollups',
+        sa.Column('id', UUID(), nullable=False),
+        sa.Column('user_id', UUID(), nullable=False),
+        sa.Column('local_date', sa.Date(), nullable=False),
+        sa.Column('day_of_week', sa.SmallInteger(), nullable=False),
+        sa.Column('log_count', sa.Integer(), nullable=False),
+        sa.Column('mood_sum', sa.Integer(), nullable=False),
+        sa.Column('mood_min', sa.SmallInteger(), nullable=False),
+        sa.Column('mood_max', sa.SmallInteger(), nullable=False),
+        sa.Column('energy_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('energy_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('energy_min', sa.SmallInteger(), nullable=True),
+        sa.Column('energy_max', sa.SmallInteger(), nullable=True),
+        sa.Column('anxiety_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('anxiety_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('anxiety_min', sa.SmallInteger(), nullable=True),
+        sa.Column('anxiety_max', sa.SmallInteger(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        # Also serves as the (user_id, local_date) lookup index
+        sa.UniqueConstraint('user_id', 'local_date', name='uq_mood_rollup_user_date'),
+    )
+
+    # Backfill from existing logs
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    op.drop_table('mood_daily_rollups')
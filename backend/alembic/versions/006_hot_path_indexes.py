@@ -0,0 +1,74 @@
+"""Composite and partial indexes for per-user time-range queries
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built CONCURRENTLY so writes to these tables keep flowing during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_mood_logs_user_logged_at', 'mood_logs',
+            ['user_id', sa.text('logged_at DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_mood_factors_mood_log_id', 'mood_factors', ['mood_log_id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_journal_entries_user_created_at', 'journal_entries',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_user_insights_user_active', 'user_insights',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_where=sa.text('dismissed_at IS NULL'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_recommendations_user_created_at', 'recommendations',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_recommendations_user_open', 'recommendations',
+            ['user_id', sa.text('priority DESC'), sa.text('created_at DESC')],
+            postgresql_where=sa.text('completed_at IS NULL'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_content_library_target_moods', 'content_library', ['target_moods'],
+            postgresql_using='gin',
+            postgresql_ops={'target_moods': 'jsonb_path_ops'},
+            postgresql_concurrently=True,
+        )
+
+        # Covered by the composite indexes above (same leading column)
+        op.drop_index('ix_mood_logs_user_id', 'mood_logs', postgresql_concurrently=True)
+        op.drop_index('ix_journal_entries_user_id', 'journal_entries', postgresql_concurrently=True)
+        op.drop_index('ix_recommendations_user_id', 'recommendations', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index('ix_recommendations_user_id', 'recommendations', ['user_id'])
+    op.create_index('ix_journal_entries_user_id', 'journal_entries', ['user_id'])
+    op.create_index('ix_mood_logs_user_id', 'mood_logs', ['user_id'])
+
+    op.drop_index('ix_content_library_target_moods', 'content_library')
+    op.drop_index('ix_recommendations_user_open', 'recommendations')
+    op.drop_index('ix_recommendations_user_created_at', 'recommendations')
+    op.drop_index('ix_user_insights_user_active', 'user_insights')
+    op.drop_index('ix_journal_entries_user_created_at', 'journal_entries')
+    op.drop_index('ix_mood_factors_mood_log_id', 'mood_factors')
+    op.drop_index('ix_mood_logs_user_logged_at', 'mood_logs')
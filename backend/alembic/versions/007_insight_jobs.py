@@ -0,0 +1,53 @@
+"""Insight generation jobs
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'insight_jobs',
+        sa.Column('id', UUID(), nullable=False),
+        sa.Column('user_id', UUID(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('trigger', sa.String(20), nullable=False),
+        sa.Column('insights_created', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_insight_jobs_user_id', 'insight_jobs', ['user_id'])
+    op.create_index(
+        'uq_insight_jobs_user_active', 'insight_jobs', ['user_id'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_mood_logs_unprocessed_user', 'mood_logs', ['user_id'],
+            postgresql_where=sa.text('processed_for_insights IS NOT TRUE'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_mood_logs_unprocessed_user', 'mood_logs', postgresql_concurrently=True)
+    op.drop_index('uq_insight_jobs_user_active', 'insight_jobs')
+    op.drop_index('ix_insight_jobs_user_id', 'insight_jobs')
+    op.drop_table('insight_jobs')
@@ -0,0 +1,35 @@
+"""Deferred post-response tasks
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'deferred_tasks',
+        sa.Column('id', UUID(), nullable=False),
+        sa.Column('kind', sa.String(40), nullable=False),
+        sa.Column('payload', JSONB(), nullable=False),
+        sa.Column('attempts', sa.SmallInteger(), nullable=False, server_default='0'),
+        sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_deferred_tasks_kind_run_after', 'deferred_tasks', ['kind', 'run_after'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deferred_tasks_kind_run_after', 'deferred_tasks')
+    op.drop_table('deferred_tasks')
@@ -0,0 +1,40 @@
+"""Rolling chat context summary
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'chat_sessions',
+        sa.Column('summary_message_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'chat_sessions',
+        sa.Column('summary_through', sa.DateTime(timezone=True), nullable=True),
+    )
+    # Chat context reads a session's newest messages; the composite index also
+    # covers the old single-column one
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_chat_messages_session_created_at', 'chat_messages',
+            ['session_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_chat_messages_session_id', 'chat_messages', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index('ix_chat_messages_session_id', 'chat_messages', ['session_id'])
+    op.drop_index('ix_chat_messages_session_created_at', 'chat_messages')
+    op.drop_column('chat_sessions', 'summary_through')
+    op.drop_column('chat_sessions', 'summary_message_count')
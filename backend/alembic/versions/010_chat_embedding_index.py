@@ -0,0 +1,33 @@
+"""HNSW index on chat message embeddings
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Cosine distance, matching ChatService._recall. HNSW rather than IVFFlat: it
+    # needs no training data, so it can be built on an empty table and stays
+    # accurate as rows are added. Query-time recall is tuned with hnsw.ef_search
+    # (CHAT_MEMORY_EF_SEARCH).
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_chat_messages_embedding_hnsw', 'chat_messages', ['embedding'],
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+            postgresql_where=sa.text('embedding IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_embedding_hnsw', 'chat_messages')
@@ -1,27 +1,74 @@
 from typing import Annotated
 from uuid import UUID
+import time
 from fastapi import Depends, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
 from app.models.user import User
+from app.utils.principal import UserPrincipal, principal_cache
 from app.utils.security import decode_token
 from app.utils.exceptions import UnauthorizedException
 
 
-async def get_current_user(
-    authorization: Annotated[str | None, Header()] = None,
-    db: AsyncSession = Depends(get_db),
-) -> User:
+async def _access_token_payload(authorization: str | None) -> dict:
     if not authorization or not authorization.startswith("Bearer "):
         raise UnauthorizedException("Missing or invalid authorization header")
 
     token = authorization.replace("Bearer ", "")
-    payload = decode_token(token)
+    payload = await decode_token(token)
 
     if not payload or payload.get("type") != "access":
         raise UnauthorizedException("Invalid or expired token")
 
+    return payload
+
+
+async def get_access_token_payload(
+    authorization: Annotated[str | None, Header()] = None,
+) -> dict:
+    return await _access_token_payload(authorization)
+
+
+async def get_current_principal(
+    authorization: Annotated[str | None, Header()] = None,
+    db: AsyncSession = Depends(get_db),
+) -> UserPrincipal:
+    """
+    Resolve the bearer token to a cached `UserPrincipal`.
+
+    Cache hits never touch the database (the request's session stays unconnected
+    unless the endpoint uses it); misses select only the principal columns.
+    """
+    payload = await _access_token_payload(authorization)
+    user_id = UUID(payload["sub"])
+    iat = payload.get("iat")
+
+    principal = principal_cache.get(user_id, iat)
+    if principal is not None:
+        return principal
+
+    loaded_at = time.monotonic()
+    result = await db.execute(
+        select(*UserPrincipal.COLUMNS).where(User.id == user_id, User.deleted_at.is_(None))
+    )
+    row = result.one_or_none()
+
+    if not row:
+        raise UnauthorizedException("User not found")
+
+    principal = UserPrincipal.from_row(row)
+    principal_cache.set(user_id, iat, principal, loaded_at)
+    return principal
+
+
+async def get_current_user(
+    authorization: Annotated[str | None, Header()] = None,
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Full `User` row, for endpoints that modify the user or need its relationships."""
+    payload = await _access_token_payload(authorization)
+
     user_id = UUID(payload["sub"])
     result = await db.execute(select(User).where(User.id == user_id, User.deleted_at.is_(None)))
     user = result.scalar_one_or_none()
@@ -35,16 +82,19 @@ async def get_current_user(
 async def get_current_user_optional(
     authorization: Annotated[str | None, Header()] = None,
     db: AsyncSession = Depends(get_db),
-) -> User | None:
+) -> UserPrincipal | None:
     if not authorization:
         return None
     try:
-        return await get_current_user(authorization, db)
+        return await get_current_principal(authorization, db)
     except UnauthorizedException:
         return None
 
 
-# Type aliases for cleaner endpoint signatures
-CurrentUser = Annotated[User, Depends(get_current_user)]
-OptionalUser = Annotated[User | None, Depends(get_current_user_optional)]
+# Type aliases for cleaner endpoint signatures. Services only read the user's
+# id/timezone/subscription, so the cached principal serves as the current user.
+CurrentUser = Annotated[UserPrincipal, Depends(get_current_principal)]
+CurrentUserRow = Annotated[User, Depends(get_current_user)]
+AccessTokenPayload = Annotated[dict, Depends(get_access_token_payload)]
+OptionalUser = Annotated[UserPrincipal | None, Depends(get_current_user_optional)]
 DBSession = Annotated[AsyncSession, Depends(get_db)]
@@ -0,0 +1,291 @@
+"""
+Socket.IO chat gateway for the frontend's `socket.io-client` (frontend/src/lib/socket.ts).
+
+A connection authenticates with `auth: {token}` and keeps the user row for its
+lifetime. The token is re-checked (expiry, revocation) on every event, and the
+connection is dropped once it no longer verifies. Each event opens a short-lived
+DB session, so idle sockets hold no pooled connection. Chat turns are charged to the
+same rate-limit buckets as the HTTP streaming endpoint.
+
+Client -> server: `join_room`, `leave_room`, `send_message`, `typing`
+Server -> client: `message_status`, `user_typing`, `crisis_alert`, `message_delta`,
+                  `new_message`, `error`
+
+Outgoing events go through a bounded per-connection send queue drained by one
+sender task: token deltas wait for room (backpressure on the model stream), while
+typing indicators are dropped when the client falls behind.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncGenerator
+from uuid import UUID
+import logging
+import math
+
+import socketio
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.user import User
+from app.schemas.chat import ChatMessageSend
+from app.services.chat_service import ChatService
+from app.utils.rate_limit import rate_limiter
+from app.utils.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+ASSISTANT_ID = "assistant"
+
+sio = socketio.AsyncServer(
+    async_mode="asgi",
+    cors_allowed_origins=settings.allowed_origins,
+)
+
+session_factory = AsyncSessionLocal
+
+
+@dataclass
+class Connection:
+    user: User
+    token: str
+    queue: asyncio.Queue
+    sender: asyncio.Task | None = None
+    rooms: set[str] = field(default_factory=set)
+    # One turn at a time per connection, so replies arrive in order
+    turn_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    turn: asyncio.Task | None = None
+
+
+connections: dict[str, Connection] = {}
+
+
+async def _sender(sid: str, queue: asyncio.Queue) -> None:
+    while True:
+        event, data, room, skip_sid = await queue.get()
+        try:
+            await sio.emit(event, data, to=room or sid, skip_sid=skip_sid)
+        except Exception as e:
+            logger.warning(f"Socket send failed: sid={sid} event={event}: {e}")
+
+
+async def send(sid: str, event: str, data: dict, room: str | None = None, droppable: bool = False):
+    """Queue an event for a connection (or broadcast to `room` through it)."""
+    conn = connections.get(sid)
+    if conn is None:
+        return
+    item = (event, data, room, sid if room else None)
+    if droppable:
+        try:
+            conn.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            pass
+    else:
+        await conn.queue.put(item)
+
+
+async def _access_payload(token: str | None) -> dict | None:
+    payload = await decode_token(token) if token else None
+    if not payload or payload.get("type") != "access":
+        return None
+    return payload
+
+
+async def _authenticate(token: str | None) -> User | None:
+    payload = await _access_payload(token)
+    if payload is None:
+        return None
+
+    async with session_factory() as db:
+        result = await db.execute(
+            select(User).where(User.id == UUID(payload["sub"]), User.deleted_at.is_(None))
+        )
+        return result.scalar_one_or_none()
+
+
+async def _connection(sid: str) -> Connection | None:
+    """The connection for `sid` if its token still verifies; drops it otherwise."""
+    conn = connections.get(sid)
+    if conn is None:
+        return None
+    if await _access_payload(conn.token) is None:
+        # Directly, not through the send queue: disconnecting stops its sender
+        await sio.emit("error", {"message": "Invalid or expired token"}, to=sid)
+        await sio.disconnect(sid)
+        return None
+    return conn
+
+
+@sio.event
+async def connect(sid, environ, auth):
+    token = (auth or {}).get("token")
+    user = await _authenticate(token)
+    if user is None:
+        raise socketio.exceptions.ConnectionRefusedError("Invalid or expired token")
+
+    queue = asyncio.Queue(maxsize=settings.ws_send_queue_size)
+    conn = Connection(user=user, token=token, queue=queue)
+    conn.sender = asyncio.create_task(_sender(sid, queue))
+    connections[sid] = conn
+
+
+@sio.event
+async def disconnect(sid):
+    conn = connections.pop(sid, None)
+    if conn is None:
+        return
+    # Like an HTTP client going away mid-stream: the turn is abandoned, and its
+    # own DB session rolls back
+    if conn.turn is not None:
+        conn.turn.cancel()
+    if conn.sender is not None:
+        conn.sender.cancel()
+
+
+@sio.event
+async def join_room(sid, data):
+    conn = await _connection(sid)
+    if conn is None:
+        return
+    room_id = (data or {}).get("roomId")
+    try:
+        async with session_factory() as db:
+            await ChatService(db, conn.user).get_session(UUID(room_id))
+    except (HTTPException, ValueError, TypeError):
+        await send(sid, "error", {"message": "Chat session not found"})
+        return
+
+    conn.rooms.add(room_id)
+    await sio.enter_room(sid, room_id)
+
+
+@sio.event
+async def leave_room(sid, data):
+    conn = await _connection(sid)
+    if conn is None:
+        return
+    room_id = (data or {}).get("roomId")
+    conn.rooms.discard(room_id)
+    await sio.leave_room(sid, room_id)
+
+
+@sio.event
+async def typing(sid, data):
+    conn = await _connection(sid)
+    if conn is None:
+        return
+    room_id = (data or {}).get("roomId")
+    if room_id not in conn.rooms:
+        return
+    # Relay to the user's other devices in the same session
+    await send(
+        sid,
+        "user_typing",
+        {"userId": str(conn.user.id), "isTyping": bool(data.get("isTyping"))},
+        room=room_id,
+        droppable=True,
+    )
+
+
+@sio.event
+async def send_message(sid, data):
+    conn = await _connection(sid)
+    if conn is None:
+        return
+    data = data or {}
+    room_id = data.get("sessionId") or next(iter(conn.rooms), None)
+    client_id = data.get("id")
+
+    if room_id not in conn.rooms:
+        await send(sid, "message_status", {"id": client_id, "status": "error"})
+        return
+
+    try:
+        message = ChatMessageSend(content=data.get("content", ""))
+    except ValueError:
+        await send(sid, "message_status", {"id": client_id, "status": "error"})
+        return
+
+    if await _rate_limited(sid, conn, room_id, client_id):
+        return
+
+    async with conn.turn_lock:
+        if connections.get(sid) is not conn:
+            return  # Disconnected while waiting for the previous turn
+        conn.turn = asyncio.current_task()
+        await send(sid, "message_status", {"id": client_id, "status": "sent"})
+        await send(
+            sid, "user_typing", {"userId": ASSISTANT_ID, "isTyping": True}, droppable=True
+        )
+        try:
+            # stream_message commits before returning and the stream persists through
+            # its own session, so no connection is held while the model streams
+            async with session_factory() as db:
+                events = await ChatService(db, conn.user).stream_message(UUID(room_id), message)
+            await _relay_turn(sid, room_id, events)
+        except Exception as e:
+            logger.error(f"Socket chat turn failed: sid={sid}: {e}")
+            await send(sid, "message_status", {"id": client_id, "status": "error"})
+        finally:
+            conn.turn = None
+            await send(
+                sid, "user_typing", {"userId": ASSISTANT_ID, "isTyping": False}, droppable=True
+            )
+
+
+async def _rate_limited(sid: str, conn: Connection, room_id: str, client_id: str | None) -> bool:
+    """Charge a turn to the same buckets as POST .../messages/stream; tell the client if refused."""
+    if not settings.rate_limit_enabled:
+        return False
+    decision = await rate_limiter.check(
+        f"user:{conn.user.id}",
+        "POST",
+        f"{settings.api_v1_prefix}/chat/sessions/{room_id}/messages/stream",
+    )
+    if decision.allowed:
+        return False
+    await send(
+        sid,
+        "message_status",
+        {"id": client_id, "status": "error", "retryAfter": math.ceil(decision.retry_after)},
+    )
+    return True
+
+
+async def _relay_turn(
+    sid: str, room_id: str, events: AsyncGenerator[tuple[str, dict], None]
+) -> None:
+    """Forward a streamed turn's events to the client."""
+    try:
+        async for event, payload in events:
+            if event == "delta":
+                await send(sid, "message_delta", {"sessionId": room_id, **payload})
+            elif event == "crisis_alert":
+                await send(sid, "crisis_alert", payload)
+            elif event == "done":
+                await send(sid, "new_message", _to_client_message(room_id, payload))
+    finally:
+        # Close the stream now (e.g. the turn was cancelled by a disconnect), so it
+        # saves the partial reply instead of waiting for garbage collection
+        await events.aclose()
+
+
+def _to_client_message(session_id: str, response: dict) -> dict:
+    """Shape a ChatAIResponse like the frontend's ChatMessage interface."""
+    message = response["message"]
+    return {
+        "id": message["id"],
+        "content": message["content"],
+        "userId": ASSISTANT_ID,
+        "timestamp": message.get("created_at") or datetime.now(timezone.utc).isoformat(),
+        "sessionId": session_id,
+        "status": "sent",
+        "suggestions": response.get("suggestions"),
+        "actionCards": response.get("action_cards"),
+        "crisisAlert": response.get("crisis_alert"),
+    }
+
+
+socket_app = socketio.ASGIApp(sio, socketio_path=None)
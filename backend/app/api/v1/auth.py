@@ -6,10 +6,12 @@ from app.schemas.auth import (
     LoginRequest,
     TokenResponse,
     RefreshRequest,
+    LogoutRequest,
     UserResponse,
 )
 from app.services.auth_service import AuthService
-from app.api.deps import CurrentUser
+from app.api.deps import AccessTokenPayload, CurrentUser
+from app.utils.principal import invalidate_principal
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -43,7 +45,14 @@ async def get_current_user_info(current_user: CurrentUser):
 
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-async def logout(current_user: CurrentUser):
-    """Logout (client should discard tokens)."""
-    # In a full implementation, you'd add the token to a blacklist
+async def logout(
+    current_user: CurrentUser,
+    access_payload: AccessTokenPayload,
+    data: LogoutRequest | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Logout: revoke the access token, and the refresh token if provided."""
+    service = AuthService(db)
+    await service.logout(access_payload, data.refresh_token if data else None)
+    invalidate_principal(current_user.id)
     return None
@@ -1,5 +1,8 @@
+from typing import AsyncIterator
 from uuid import UUID
+import json
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -36,10 +39,12 @@ async def list_chat_sessions(
     db: AsyncSession = Depends(get_db),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    include_total: bool | None = None,
 ):
     """List user's chat sessions."""
     service = ChatService(db, current_user)
-    return await service.list_sessions(page, per_page)
+    return await service.list_sessions(page, per_page, cursor, include_total)
 
 
 @router.get("/sessions/{session_id}", response_model=ChatSessionDetail)
@@ -75,6 +80,33 @@ async def send_chat_message(
     return await service.send_message(session_id, data)
 
 
+@router.post("/sessions/{session_id}/messages/stream")
+async def stream_chat_message(
+    session_id: UUID,
+    data: ChatMessageSend,
+    current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Send a message and stream the AI response as Server-Sent Events.
+
+    Events: `crisis_alert` (first, if any), `delta` ({"text"}) per token chunk,
+    and a final `done` carrying the full ChatAIResponse.
+    """
+    service = ChatService(db, current_user)
+    events = await service.stream_message(session_id, data)
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse(events: AsyncIterator[tuple[str, dict]]) -> AsyncIterator[str]:
+    async for event, payload in events:
+        yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
 @router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_chat_session(
     session_id: UUID,
@@ -2,7 +2,8 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_user, get_db
+from app.api.deps import get_current_user
+from app.database import get_db
 from app.models.user import User
 from app.schemas.content import (
     ContentDetail,
@@ -38,4 +39,6 @@ async def list_content(
         is_premium=params.is_premium,
         page=params.page,
         per_page=params.per_page,
+        cursor=params.cursor,
+        include_total=params.include_total,
     )
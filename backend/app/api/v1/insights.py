@@ -1,30 +1,45 @@
+from uuid import UUID
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_user, get_db
-from app.models.user import User
-from app.schemas.insight import InsightResponse, PaginatedInsights
+from app.api.deps import CurrentUser
+from app.database import get_db
+from app.schemas.insight import InsightJobResponse, PaginatedInsights
 from app.services.insight_service import InsightService
 
 router = APIRouter(prefix="/insights", tags=["Insights"])
 
 
-@router.post("/generate", response_model=list[InsightResponse])
+@router.post("/generate", response_model=InsightJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def generate_insights(
+    current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
-    """Trigger on-demand insight generation."""
+    """Queue on-demand insight generation; poll GET /insights/jobs/{id} for the result."""
     service = InsightService(db, current_user)
-    return await service.generate_insights()
+    return await service.enqueue_generation()
+
+
+@router.get("/jobs/{job_id}", response_model=InsightJobResponse)
+async def get_insight_job(
+    job_id: UUID,
+    current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+):
+    service = InsightService(db, current_user)
+    return await service.get_job(job_id)
 
 
 @router.get("", response_model=PaginatedInsights)
 async def list_insights(
+    current_user: CurrentUser,
     page: int = 1,
     per_page: int = 20,
+    cursor: str | None = None,
+    include_total: bool | None = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
 ):
     service = InsightService(db, current_user)
-    return await service.list_insights(page=page, per_page=per_page)
+    return await service.list_insights(
+        page=page, per_page=per_page, cursor=cursor, include_total=include_total
+    )
@@ -38,10 +38,14 @@ async def list_journal_entries(
     entry_type: str | None = None,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
+    cursor: str | None = None,
+    include_total: bool | None = None,
 ):
     """List journal entries (without content for privacy)."""
     service = JournalService(db, current_user)
-    return await service.list_entries(page, per_page, entry_type, start_date, end_date)
+    return await service.list_entries(
+        page, per_page, entry_type, start_date, end_date, cursor, include_total
+    )
 
 
 @router.get("/entries/{entry_id}", response_model=JournalEntryDetail)
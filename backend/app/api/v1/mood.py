@@ -38,10 +38,12 @@ async def list_mood_logs(
     per_page: int = Query(20, ge=1, le=100),
     start_date: datetime | None = None,
     end_date: datetime | None = None,
+    cursor: str | None = None,
+    include_total: bool | None = None,
 ):
     """List mood logs with pagination and optional date filtering."""
     service = MoodService(db, current_user)
-    return await service.list_logs(page, per_page, start_date, end_date)
+    return await service.list_logs(page, per_page, start_date, end_date, cursor, include_total)
 
 
 @router.get("/logs/{log_id}", response_model=MoodLogResponse)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.dependencies import get_current_user, get_db
+from app.api.deps import get_current_user
+from app.database import get_db
 from app.models.user import User
 from app.schemas.recommendation import RecommendationResponse, PaginatedRecommendations
 from app.services.recommendation_service import RecommendationService
@@ -23,8 +24,12 @@ async def get_daily_recommendations(
 async def list_recommendations(
     page: int = 1,
     per_page: int = 20,
+    cursor: str | None = None,
+    include_total: bool | None = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     service = RecommendationService(db, current_user)
-    return await service.list_recommendations(page=page, per_page=per_page)
+    return await service.list_recommendations(
+        page=page, per_page=per_page, cursor=cursor, include_total=include_total
+    )
@@ -22,7 +22,7 @@ class Settings(BaseSettings):
     db_max_overflow: int = 10
     db_echo: bool = False
 
-    # Redis (for future rate limiting)
+    # Redis (shared caches, rate limiting)
     redis_url: str = "redis://localhost:6379"
 
     # JWT Auth
@@ -30,9 +30,62 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 30
+    auth_cache_size: int = 10_000  # Cached principals per process, keyed by (user, token iat)
+    auth_cache_ttl_seconds: int = 30  # Upper bound on cross-process staleness after invalidation
+    revocation_backend: str = "memory"  # "memory" or "redis" (redis_url; needed with several workers)
+    revocation_bloom_capacity: int = 100_000  # Live revoked tokens before the filter is resized
+    revocation_bloom_error_rate: float = 0.001  # Share of valid tokens that still hit the store
+    revocation_sync_seconds: float = 5.0  # Filter rebuild interval (cross-process revocation delay)
+    password_hash_workers: int = 2  # bcrypt worker processes, 0 = hash inline on the event loop
+    password_hash_max_queue: int = 32  # Hashes waiting for a worker before requests get a 503
+
+    # Rate limiting (see app/utils/rate_limit.py for per-route costs)
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"  # "memory" or "redis" (redis_url; needed with several workers)
+    rate_limit_budget: int = 120  # Request-cost units a caller can spend in a burst
+    rate_limit_budget_per_minute: float = 60  # Units refilled per minute
+    rate_limit_route_costs: dict[str, int] = {}  # Cost overrides, e.g. {"POST /auth/login": 10}
 
     # Gemini AI (used by Agent 3)
     gemini_api_key: str = ""
+    gemini_cache_size: int = 1_000  # Cached responses per process (see GeminiClient)
+    gemini_cache_ttl_seconds: int = 3600
+    gemini_cache_max_temperature: float = 0.3  # Requests at or below this are cached; others only if templated
+    gemini_cache_shared: bool = False  # Add Redis (redis_url) as a shared second tier
+
+    # ML inference
+    ml_backend: str = "torch"  # "torch" or "onnx" (INT8-quantized, onnxruntime on CPU)
+    onnx_cache_dir: str = ".model_cache/onnx"  # Exported ONNX artifacts are reused from here
+    onnx_num_threads: int = 0  # intra-op threads for onnxruntime, 0 = runtime default
+    sentiment_batch_size: int = 16  # Max texts per sentiment forward pass
+    sentiment_batch_wait_ms: float = 5.0  # How long to wait for a batch to fill up
+    embedding_batch_size: int = 32  # Max texts per encode call
+    embedding_batch_wait_ms: float = 5.0
+    embedding_workers: int = 2  # Threads running encode concurrently
+    embedding_max_queue: int = 1024  # Pending texts before generate() waits for room
+    embedding_cache_size: int = 10_000  # In-process LRU entries (~1.5 KB each)
+    embedding_cache_shared: bool = False  # Add Redis (redis_url) as a shared second tier
+    embedding_cache_ttl_seconds: int = 7 * 24 * 3600  # TTL in the shared tier
+    trend_engine: str = "numpy"  # "numpy" (robust regression) or "prophet" (optional, slow to fit)
+    insight_job_workers: int = 2  # Pattern-detection processes, 0 = run inline on the event loop
+    insight_job_timeout_seconds: float = 300  # Jobs still queued/running after this are failed
+
+    # Deferred post-response work (embeddings, analytics; see app/utils/work_queue.py)
+    deferred_poll_seconds: float = 2.0  # Worker poll interval when not woken by a local commit
+    deferred_batch_size: int = 64  # Default tasks per handler call
+    deferred_max_attempts: int = 5  # Failed tasks are dropped after this many tries
+
+    # Chat context (see ChatService._build_context)
+    chat_context_messages: int = 10  # Most recent messages sent to the model verbatim
+    chat_summary_every: int = 6  # Older messages are folded into the session summary this many at a time
+    chat_memory_k: int = 3  # Similar past messages recalled from the user's other turns, 0 = off
+    chat_memory_max_distance: float = 0.5  # Cosine distance; farther matches are not recalled
+    chat_memory_ef_search: int = 40  # HNSW candidate list size: higher = better recall, slower
+    chat_memory_probes: int = 10  # IVFFlat lists scanned, if the index is rebuilt as IVFFlat
+    chat_memory_iterative_scan: str = "relaxed_order"  # pgvector >= 0.8 keeps scanning past other users' rows; "" = off
+
+    # Realtime chat gateway
+    ws_send_queue_size: int = 256  # Outgoing events buffered per socket before senders wait
 
     # Encryption key for sensitive data
     encryption_key: str = "CHANGE_ME_32_BYTE_KEY_HERE_1234"
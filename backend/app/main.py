@@ -3,15 +3,37 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.api.v1.router import api_router
+from app.api.socket import socket_app
+from app.ml.sentiment import sentiment_analyzer
+from app.ml.embeddings import embedding_service
+from app.ml.gemini_client import gemini_client
+from app.services import deferred_handlers  # noqa: F401  (registers work queue handlers)
+from app.services.insight_jobs import insight_job_runner
+from app.services.insight_service import InsightService
+from app.utils.password_hasher import password_hasher
+from app.utils.rate_limit import RateLimitMiddleware
+from app.utils.revocation import revocation_list
+from app.utils.work_queue import work_queue
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print(f"Starting {settings.app_name}...")
+    password_hasher.start()
+    insight_job_runner.start()
+    insight_job_runner.start_recovery(InsightService.job_work)
+    work_queue.start()
+    revocation_list.start()
     yield
     # Shutdown
     print("Shutting down...")
+    await revocation_list.stop()
+    await work_queue.stop()
+    await sentiment_analyzer.batcher.close()
+    await embedding_service.batcher.close()
+    password_hasher.shutdown()
+    await insight_job_runner.shutdown()
 
 
 app = FastAPI(
@@ -23,6 +45,9 @@ app = FastAPI(
     redoc_url="/redoc" if settings.debug else None,
 )
 
+# Per-caller request-cost budgets (added first so CORS headers wrap its 429s)
+app.add_middleware(RateLimitMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -35,7 +60,22 @@ app.add_middleware(
 # Include API routes
 app.include_router(api_router, prefix=settings.api_v1_prefix)
 
+# Realtime chat gateway (socket.io-client connects to /socket.io)
+app.mount("/socket.io", socket_app)
+
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": settings.app_name}
+
+
+@app.get("/health/ml")
+async def ml_health_check():
+    """Queue depth and batch-size metrics for the in-process model workers."""
+    return {
+        "sentiment": sentiment_analyzer.batcher.stats(),
+        "embedding": embedding_service.stats(),
+        "gemini": gemini_client.stats(),
+        "insight_jobs": insight_job_runner.stats(),
+        "deferred": work_queue.stats(),
+    }
@@ -0,0 +1,215 @@
+"""
+Pluggable inference backends for the sentiment and embedding models.
+
+- "torch": the original HuggingFace pipeline / SentenceTransformer path.
+- "onnx":  the same models exported once to ONNX, dynamically quantized to INT8,
+           cached on disk and served through onnxruntime on CPU.
+
+Select with `ML_BACKEND`; `ONNX_CACHE_DIR` and `ONNX_NUM_THREADS` tune the ONNX path.
+"""
+from pathlib import Path
+from typing import Protocol
+import logging
+import threading
+
+import numpy as np
+from transformers import AutoTokenizer
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_MAX_LENGTH = 256  # all-MiniLM-L6-v2 max_seq_length
+
+_export_lock = threading.Lock()
+
+
+class SentimentBackend(Protocol):
+    def predict(self, texts: list[str]) -> list[dict]:
+        """Return one {"label": str, "score": float} per text."""
+        ...
+
+
+class EmbeddingBackend(Protocol):
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Return a (len(texts), dim) float32 array of normalized embeddings."""
+        ...
+
+
+# --- Torch -------------------------------------------------------------------
+
+
+class TorchSentimentBackend:
+    def __init__(self):
+        from transformers import pipeline
+
+        self.pipeline = pipeline(
+            "sentiment-analysis",
+            model=SENTIMENT_MODEL,
+            device=-1,  # CPU, use 0 for GPU
+        )
+
+    def predict(self, texts: list[str]) -> list[dict]:
+        return self.pipeline(texts, batch_size=len(texts), truncation=True)
+
+
+class TorchEmbeddingBackend:
+    def __init__(self):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+
+
+# --- ONNX Runtime ------------------------------------------------------------
+
+
+def _artifact_dir(model_name: str) -> Path:
+    return Path(settings.onnx_cache_dir) / model_name.replace("/", "--")
+
+
+def export_onnx(model_name: str, task: str) -> Path:
+    """
+    Export `model_name` to ONNX and quantize it to INT8, once.
+
+    Returns the path of the quantized model; later calls reuse the cached file.
+    """
+    target_dir = _artifact_dir(model_name)
+    quantized_path = target_dir / "model.int8.onnx"
+
+    with _export_lock:
+        if quantized_path.exists():
+            return quantized_path
+
+        import torch
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        from transformers import AutoModel, AutoModelForSequenceClassification
+
+        logger.info(f"Exporting {model_name} to ONNX (INT8)...")
+        target_dir.mkdir(parents=True, exist_ok=True)
+        fp32_path = target_dir / "model.onnx"
+
+        model_cls = AutoModelForSequenceClassification if task == "sentiment" else AutoModel
+        model = model_cls.from_pretrained(model_name).eval()
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        tokenizer.save_pretrained(target_dir)
+
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        output_name = "logits" if task == "sentiment" else "last_hidden_state"
+        dynamic_axes = {
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            output_name: {0: "batch"} if task == "sentiment" else {0: "batch", 1: "sequence"},
+        }
+
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"]),
+                str(fp32_path),
+                input_names=["input_ids", "attention_mask"],
+                output_names=[output_name],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+            )
+
+        quantize_dynamic(str(fp32_path), str(quantized_path), weight_type=QuantType.QInt8)
+        fp32_path.unlink(missing_ok=True)
+        return quantized_path
+
+
+def _onnx_session(model_path: Path):
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    if settings.onnx_num_threads > 0:
+        options.intra_op_num_threads = settings.onnx_num_threads
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(
+        str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+    )
+
+
+class OnnxSentimentBackend:
+    def __init__(self):
+        from transformers import AutoConfig
+
+        model_path = export_onnx(SENTIMENT_MODEL, "sentiment")
+        self.session = _onnx_session(model_path)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path.parent)
+        self.id2label = AutoConfig.from_pretrained(SENTIMENT_MODEL).id2label
+
+    def predict(self, texts: list[str]) -> list[dict]:
+        inputs = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=512, return_tensors="np"
+        )
+        (logits,) = self.session.run(
+            None,
+            {
+                "input_ids": inputs["input_ids"].astype(np.int64),
+                "attention_mask": inputs["attention_mask"].astype(np.int64),
+            },
+        )
+
+        # Softmax, matching the pipeline's top-1 output
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs = exp / exp.sum(axis=1, keepdims=True)
+        best = probs.argmax(axis=1)
+
+        return [
+            {"label": self.id2label[int(idx)], "score": float(probs[row, idx])}
+            for row, idx in enumerate(best)
+        ]
+
+
+class OnnxEmbeddingBackend:
+    def __init__(self):
+        model_path = export_onnx(EMBEDDING_MODEL, "embedding")
+        self.session = _onnx_session(model_path)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path.parent)
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        inputs = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=EMBEDDING_MAX_LENGTH,
+            return_tensors="np",
+        )
+        mask = inputs["attention_mask"].astype(np.int64)
+        (hidden,) = self.session.run(
+            None, {"input_ids": inputs["input_ids"].astype(np.int64), "attention_mask": mask}
+        )
+
+        # Mean pooling over real tokens + L2 normalization (the SentenceTransformer head)
+        weights = mask[..., None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+# --- Factories ---------------------------------------------------------------
+
+
+def load_sentiment_backend(name: str | None = None) -> SentimentBackend:
+    name = name or settings.ml_backend
+    if name == "onnx":
+        try:
+            return OnnxSentimentBackend()
+        except ImportError as e:
+            logger.warning(f"ONNX backend unavailable ({e}), falling back to torch")
+    return TorchSentimentBackend()
+
+
+def load_embedding_backend(name: str | None = None) -> EmbeddingBackend:
+    name = name or settings.ml_backend
+    if name == "onnx":
+        try:
+            return OnnxEmbeddingBackend()
+        except ImportError as e:
+            logger.warning(f"ONNX backend unavailable ({e}), falling back to torch")
+    return TorchEmbeddingBackend()
@@ -0,0 +1,160 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Generic, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Coalesces concurrent single-item requests into batches for a model call.
+
+    Callers `await submit(item)`; a background task collects items for up to
+    `max_wait_ms` (or until `max_batch_size` is reached), runs `batch_fn` once on a
+    bounded pool of worker threads so the event loop keeps serving other requests,
+    and resolves each caller's future with its own result.
+
+    While every worker is busy, new items keep accumulating in the queue and are
+    picked up as one larger batch, so throughput grows with load. `max_queue_size`
+    bounds the queue; once full, `submit` waits for room (backpressure).
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[T]], list[R]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        max_workers: int = 1,
+        max_queue_size: int = 0,
+        name: str = "batcher",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(0, max_queue_size)
+        self.name = name
+
+        self._executor: ThreadPoolExecutor | None = None
+        self._queue: asyncio.Queue[tuple[T, asyncio.Future]] | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._in_flight: set[asyncio.Task] = set()
+
+        # Counters
+        self.batches_run = 0
+        self.items_processed = 0
+        self.last_batch_size = 0
+        self.largest_batch_size = 0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"{self.name}-worker"
+                )
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._worker = loop.create_task(self._run(), name=f"{self.name}-batcher")
+        return self._queue
+
+    async def submit(self, item: T) -> R:
+        """Queue one item and wait for its result."""
+        queue = self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((item, future))
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue) -> list[tuple[T, asyncio.Future]]:
+        """Wait for the first item, then keep collecting until the batch is full or time is up."""
+        batch = [await queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        slots = self._slots
+
+        while True:
+            # Only start collecting once a worker is free; until then the queue fills up
+            await slots.acquire()
+            batch = await self._collect(queue)
+            task = asyncio.create_task(self._dispatch(batch, slots))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(
+        self, batch: list[tuple[T, asyncio.Future]], slots: asyncio.Semaphore
+    ) -> None:
+        items = [item for item, _ in batch]
+        loop = asyncio.get_running_loop()
+
+        try:
+            results = await loop.run_in_executor(self._executor, self.batch_fn, items)
+        except Exception as e:
+            logger.error(f"{self.name} batch of {len(items)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            slots.release()
+
+        self.batches_run += 1
+        self.items_processed += len(items)
+        self.last_batch_size = len(items)
+        self.largest_batch_size = max(self.largest_batch_size, len(items))
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "batches_in_flight": len(self._in_flight),
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "avg_batch_size": (
+                round(self.items_processed / self.batches_run, 2) if self.batches_run else 0.0
+            ),
+            "last_batch_size": self.last_batch_size,
+            "largest_batch_size": self.largest_batch_size,
+        }
+
+    async def close(self) -> None:
+        """Stop the background task and release the worker threads."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            self._worker = None
+        for task in list(self._in_flight):
+            task.cancel()
+        self._in_flight.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -1,6 +1,6 @@
 import re
 from dataclasses import dataclass
-from typing import Literal
+from typing import Iterable, Literal
 import logging
 
 logger = logging.getLogger(__name__)
@@ -56,36 +56,49 @@ class CrisisDetector:
         self.high_re = [re.compile(p, re.IGNORECASE) for p in self.HIGH_PATTERNS]
         self.medium_re = [re.compile(p, re.IGNORECASE) for p in self.MEDIUM_PATTERNS]
 
-    async def analyze(self, text: str) -> CrisisResult:
-        """
-        Analyze text for crisis indicators.
-        
-        Returns CrisisResult with severity level and matched indicators.
-        """
-        if not text:
-            return CrisisResult(is_crisis=False, severity="none", indicators=[], confidence=0.0)
+        # Every pattern tagged with its severity level, in evaluation order
+        self._tagged = [
+            (level, pattern)
+            for level, compiled in (
+                ("critical", self.critical_re),
+                ("high", self.high_re),
+                ("medium", self.medium_re),
+            )
+            for pattern in compiled
+        ]
+
+        # All patterns merged into one alternation so a message is scanned once.
+        # Groups are kept non-capturing: capture groups around the branches disable
+        # sre's alternation prefix optimisation and make the scan ~5x slower.
+        self.combined_re = re.compile(
+            "|".join(f"(?:{pattern.pattern})" for _, pattern in self._tagged),
+            re.IGNORECASE,
+        )
 
+    def _scan_patterns(self, text: str) -> tuple[list[str], dict[str, int]]:
+        """Check each pattern individually and collect the matched indicators."""
         indicators = []
         severity_scores = {"critical": 0, "high": 0, "medium": 0}
 
-        # Check critical patterns
-        for pattern in self.critical_re:
+        for level, pattern in self._tagged:
             if pattern.search(text):
-                indicators.append(f"critical: {pattern.pattern}")
-                severity_scores["critical"] += 1
+                indicators.append(f"{level}: {pattern.pattern}")
+                severity_scores[level] += 1
 
-        # Check high patterns
-        for pattern in self.high_re:
-            if pattern.search(text):
-                indicators.append(f"high: {pattern.pattern}")
-                severity_scores["high"] += 1
+        return indicators, severity_scores
 
-        # Check medium patterns
-        for pattern in self.medium_re:
-            if pattern.search(text):
-                indicators.append(f"medium: {pattern.pattern}")
-                severity_scores["medium"] += 1
+    def _scan(self, text: str) -> tuple[list[str], dict[str, int]]:
+        """
+        Single pass over the combined regex; messages without any hit (the vast
+        majority) return straight away. When something matched, the patterns are
+        confirmed one by one so that every indicator is reported, including ones
+        that overlap each other in the text.
+        """
+        if self.combined_re.search(text) is None:
+            return [], {"critical": 0, "high": 0, "medium": 0}
+        return self._scan_patterns(text)
 
+    def _build_result(self, indicators: list[str], severity_scores: dict[str, int]) -> CrisisResult:
         # Determine overall severity
         if severity_scores["critical"] > 0:
             severity = "critical"
@@ -105,9 +118,6 @@ class CrisisDetector:
 
         is_crisis = severity in ["medium", "high", "critical"]
 
-        if indicators:
-            logger.warning(f"Crisis indicators detected: severity={severity}, count={len(indicators)}")
-
         return CrisisResult(
             is_crisis=is_crisis,
             severity=severity,
@@ -115,6 +125,48 @@ class CrisisDetector:
             confidence=confidence,
         )
 
+    def detect(self, text: str) -> CrisisResult:
+        """Synchronous core of `analyze`; safe to call from worker threads and processes."""
+        if not text:
+            return CrisisResult(is_crisis=False, severity="none", indicators=[], confidence=0.0)
+
+        indicators, severity_scores = self._scan(text)
+        return self._build_result(indicators, severity_scores)
+
+    async def analyze(self, text: str) -> CrisisResult:
+        """
+        Analyze text for crisis indicators.
+        
+        Returns CrisisResult with severity level and matched indicators.
+        """
+        result = self.detect(text)
+
+        if result.indicators:
+            logger.warning(
+                f"Crisis indicators detected: severity={result.severity}, "
+                f"count={len(result.indicators)}"
+            )
+
+        return result
+
+    def analyze_many(self, texts: Iterable[str | None]) -> list[CrisisResult]:
+        """
+        Analyze a batch of texts, returning one CrisisResult per text in input order.
+
+        Intended for backfills and bulk imports, so nothing is logged per text.
+        """
+        return [self.detect(text) for text in texts]
+
 
 # Singleton
 crisis_detector = CrisisDetector()
+
+
+def analyze_many(texts: list[str | None]) -> list[CrisisResult]:
+    """
+    Module-level entry point for `ProcessPoolExecutor.map`/`run_in_executor`.
+
+    Each worker process builds its own `crisis_detector` on import, so only the
+    texts and the resulting dataclasses cross the process boundary.
+    """
+    return crisis_detector.analyze_many(texts)
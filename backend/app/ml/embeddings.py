@@ -1,33 +1,123 @@
-from sentence_transformers import SentenceTransformer
 from functools import lru_cache
 import numpy as np
+import asyncio
+import hashlib
 import logging
+import threading
+
+from app.config import settings
+from app.ml.backends import EMBEDDING_MODEL, load_embedding_backend
+from app.ml.batching import MicroBatcher
+from app.utils.cache import LRUCache, RedisCache, SharedCache, two_tier_stats
 
 logger = logging.getLogger(__name__)
 
 
 class EmbeddingService:
-    """Generate text embeddings for semantic search."""
+    """
+    Generate text embeddings for semantic search.
+
+    `encode` never runs on the event loop: concurrent `generate` calls are queued,
+    coalesced into `encode` batches and executed on a bounded thread pool.
+
+    Vectors are cached by a SHA-256 of the normalized text, as compact float32
+    bytes, in an in-process LRU and optionally a shared (Redis) second tier, so
+    repeated short replies and fallback responses are only encoded once.
+    """
 
     def __init__(self):
         self._model = None
+        self._model_lock = threading.Lock()
         self.dimension = 384  # all-MiniLM-L6-v2 output dimension
+        self.batcher = MicroBatcher(
+            self._encode_batch,
+            max_batch_size=settings.embedding_batch_size,
+            max_wait_ms=settings.embedding_batch_wait_ms,
+            max_workers=settings.embedding_workers,
+            max_queue_size=settings.embedding_max_queue,
+            name="embedding",
+        )
+        self.cache = LRUCache(settings.embedding_cache_size)
+        # The shared tier outlives this process: vectors from another model or backend
+        # (torch fp32 vs ONNX INT8) must not be served under the same key
+        self.shared_cache: SharedCache | None = (
+            RedisCache(settings.redis_url, prefix=f"emb:{EMBEDDING_MODEL}:{settings.ml_backend}:")
+            if settings.embedding_cache_shared
+            else None
+        )
+        self.shared_hits = 0
 
     @property
     def model(self):
         if self._model is None:
-            logger.info("Loading embedding model...")
-            self._model = SentenceTransformer("all-MiniLM-L6-v2")
+            # Several encode workers may hit the first request at the same time
+            with self._model_lock:
+                if self._model is None:
+                    logger.info(f"Loading embedding model ({settings.ml_backend} backend)...")
+                    self._model = load_embedding_backend()
         return self._model
 
+    def _encode_batch(self, texts: list[str]) -> list[bytes]:
+        """Encode a batch of texts (called on a batcher worker thread)."""
+        embeddings = np.asarray(self.model.encode(texts), dtype=np.float32)
+        return [row.tobytes() for row in embeddings]
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        # MiniLM is uncased, so case and whitespace runs don't change the embedding
+        return " ".join(text.split()).lower()
+
+    @staticmethod
+    def cache_key(normalized: str) -> str:
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    async def _embed(self, texts: list[str]) -> list[bytes]:
+        """Resolve each text from the local cache, then the shared tier, then the model."""
+        normalized = [self.normalize(text) for text in texts]
+        keys = [self.cache_key(text) for text in normalized]
+        text_for = dict(zip(keys, normalized))
+
+        found: dict[str, bytes] = {}
+        missing = []
+        for key in text_for:
+            cached = self.cache.get(key)
+            if cached is not None:
+                found[key] = cached
+            else:
+                missing.append(key)
+
+        if missing and self.shared_cache is not None:
+            shared = await self.shared_cache.get_many(missing)
+            for key, value in zip(missing, shared):
+                if value is not None:
+                    found[key] = value
+                    self.cache.set(key, value)
+                    self.shared_hits += 1
+            missing = [key for key in missing if key not in found]
+
+        if missing:
+            vectors = await asyncio.gather(*(self.batcher.submit(text_for[key]) for key in missing))
+            fresh = dict(zip(missing, vectors))
+            for key, value in fresh.items():
+                self.cache.set(key, value)
+            if self.shared_cache is not None:
+                await self.shared_cache.set_many(fresh, settings.embedding_cache_ttl_seconds)
+            found.update(fresh)
+
+        return [found[key] for key in keys]
+
+    @staticmethod
+    def to_list(vector: bytes) -> list[float]:
+        return np.frombuffer(vector, dtype=np.float32).tolist()
+
     async def generate(self, text: str) -> list[float]:
         """Generate embedding vector for text."""
         if not text:
             return [0.0] * self.dimension
 
         try:
-            embedding = self.model.encode(text, convert_to_numpy=True)
-            return embedding.tolist()
+            (vector,) = await self._embed([text])
+            return self.to_list(vector)
         except Exception as e:
             logger.error(f"Embedding generation error: {e}")
             return [0.0] * self.dimension
@@ -38,12 +128,23 @@ class EmbeddingService:
             return []
 
         try:
-            embeddings = self.model.encode(texts, convert_to_numpy=True)
-            return embeddings.tolist()
+            non_empty = [text for text in texts if text]
+            vectors = iter(await self._embed(non_empty) if non_empty else [])
+            return [
+                self.to_list(next(vectors)) if text else [0.0] * self.dimension
+                for text in texts
+            ]
         except Exception as e:
             logger.error(f"Batch embedding error: {e}")
             return [[0.0] * self.dimension for _ in texts]
 
+    def stats(self) -> dict:
+        """Queue depth and batch-size metrics for the encode pool, plus cache hit rates."""
+        return {
+            **self.batcher.stats(),
+            "cache": two_tier_stats(self.cache, self.shared_hits),
+        }
+
 
 # Singleton
 embedding_service = EmbeddingService()
@@ -1,6 +1,10 @@
+from typing import AsyncIterator
 import google.genai as genai
 from google.genai import types
 from app.config import settings
+from app.utils.cache import LRUCache, RedisCache, SharedCache, two_tier_stats
+import hashlib
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,11 +41,55 @@ CRISIS_ESCALATION_PROMPT = """IMPORTANT: The user may be in crisis.
 - DO NOT try to fix or minimize their feelings
 - Prioritize connection and safety over advice"""
 
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and MindFlow, a mental wellness companion.
+You are given the current summary and the messages that follow it. Return an updated summary that keeps what matters for continuing the conversation:
+- How the user has been feeling, and the situations and people they mentioned
+- Coping techniques tried and how they went
+- Goals, and any safety concerns
+Write in the third person, under 200 words. Output only the summary."""
+
+SAFETY_SETTINGS = [
+    types.SafetySetting(
+        category="HARM_CATEGORY_DANGEROUS_CONTENT",
+        threshold="BLOCK_ONLY_HIGH"
+    ),
+    types.SafetySetting(
+        category="HARM_CATEGORY_HARASSMENT",
+        threshold="BLOCK_ONLY_HIGH"
+    ),
+]
+
 
 class GeminiClient:
+    """
+    Async Gemini chat client with mental health guardrails.
+
+    Generation configs are built once per (is_crisis, temperature, max_tokens) and
+    reused across calls.
+
+    Responses are cached by a SHA-256 of the model, system prompt, sampling
+    parameters and messages, in an in-process LRU with a TTL and optionally a
+    shared (Redis) second tier. Only near-deterministic requests (temperature at
+    most GEMINI_CACHE_MAX_TEMPERATURE) and ones the caller marks `cacheable`
+    (templated prompts) are cached; crisis turns and fallback replies never are.
+    """
+
     def __init__(self):
         self.client = genai.Client(api_key=settings.gemini_api_key)
         self.model = "gemini-2.5-flash"  # or "gemini-2.5-pro" for better quality
+        self._configs: dict[tuple[bool, float, int], types.GenerateContentConfig] = {}
+        for is_crisis in (False, True):
+            self._config(None, is_crisis, 0.7, 1024)
+        self._summary_config = types.GenerateContentConfig(
+            system_instruction=SUMMARY_PROMPT,
+            temperature=0.2,
+            max_output_tokens=512,
+        )
+        self.cache = LRUCache(settings.gemini_cache_size, ttl_seconds=settings.gemini_cache_ttl_seconds)
+        self.shared_cache: SharedCache | None = (
+            RedisCache(settings.redis_url, prefix="gemini:") if settings.gemini_cache_shared else None
+        )
+        self.shared_hits = 0
 
     async def chat(
         self,
@@ -50,6 +98,7 @@ class GeminiClient:
         is_crisis: bool = False,
         temperature: float = 0.7,
         max_tokens: int = 1024,
+        cacheable: bool = False,
     ) -> dict:
         """
         Send chat messages to Gemini and get response.
@@ -60,6 +109,7 @@ class GeminiClient:
             is_crisis: If True, adds crisis escalation instructions
             temperature: Response randomness (0-1)
             max_tokens: Maximum response length
+            cacheable: Templated request; cache the response whatever the temperature
             
         Returns:
             {
@@ -69,44 +119,21 @@ class GeminiClient:
                 "suggestions": list[str] | None
             }
         """
-        try:
-            # Build system instruction
-            system = system_prompt or MENTAL_HEALTH_SYSTEM_PROMPT
-            if is_crisis:
-                system += "\n\n" + CRISIS_ESCALATION_PROMPT
-
-            # Convert to Gemini format
-            gemini_messages = []
-            for msg in messages:
-                role = "user" if msg["role"] == "user" else "model"
-                gemini_messages.append(
-                    types.Content(
-                        role=role,
-                        parts=[types.Part.from_text(text=msg["content"])]
-                    )
-                )
+        key = self._cache_key(messages, system_prompt, is_crisis, temperature, max_tokens, cacheable)
+        if key is not None:
+            cached = await self._cache_get(key)
+            if cached is not None:
+                return cached
 
-            # Create generation config
-            config = types.GenerateContentConfig(
-                system_instruction=system,
-                temperature=temperature,
-                max_output_tokens=max_tokens,
-                safety_settings=[
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_DANGEROUS_CONTENT",
-                        threshold="BLOCK_ONLY_HIGH"
-                    ),
-                    types.SafetySetting(
-                        category="HARM_CATEGORY_HARASSMENT",
-                        threshold="BLOCK_ONLY_HIGH"
-                    ),
-                ]
+        try:
+            contents, config = self._prepare_request(
+                messages, system_prompt, is_crisis, temperature, max_tokens
             )
 
             # Generate response
             response = await self.client.aio.models.generate_content(
                 model=self.model,
-                contents=gemini_messages,
+                contents=contents,
                 config=config,
             )
 
@@ -116,12 +143,15 @@ class GeminiClient:
             # Extract suggested quick replies (if we can parse them from response)
             suggestions = self._extract_suggestions(content)
 
-            return {
+            result = {
                 "content": content,
                 "tokens_used": tokens,
                 "model": self.model,
                 "suggestions": suggestions,
             }
+            if key is not None:
+                await self._cache_set(key, result)
+            return result
 
         except Exception as e:
             logger.error(f"Gemini API error: {e}")
@@ -132,6 +162,184 @@ class GeminiClient:
                 "suggestions": None,
             }
 
+    async def chat_stream(
+        self,
+        messages: list[dict],
+        system_prompt: str | None = None,
+        is_crisis: bool = False,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        cacheable: bool = False,
+    ) -> AsyncIterator[dict]:
+        """
+        Streaming variant of `chat`.
+
+        Yields {"type": "delta", "text": str} as tokens arrive, then exactly one
+        {"type": "done", ...} carrying the same fields `chat` returns. A cached
+        response arrives as a single delta.
+        """
+        key = self._cache_key(messages, system_prompt, is_crisis, temperature, max_tokens, cacheable)
+        if key is not None:
+            cached = await self._cache_get(key)
+            if cached is not None:
+                yield {"type": "delta", "text": cached["content"]}
+                yield {"type": "done", **cached}
+                return
+
+        parts: list[str] = []
+        tokens = 0
+        model = self.model
+        completed = False
+
+        try:
+            contents, config = self._prepare_request(
+                messages, system_prompt, is_crisis, temperature, max_tokens
+            )
+            stream = await self.client.aio.models.generate_content_stream(
+                model=self.model,
+                contents=contents,
+                config=config,
+            )
+            async for chunk in stream:
+                if chunk.usage_metadata and chunk.usage_metadata.total_token_count:
+                    tokens = chunk.usage_metadata.total_token_count
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield {"type": "delta", "text": chunk.text}
+            completed = True
+
+        except Exception as e:
+            logger.error(f"Gemini streaming error: {e}")
+            if not parts:
+                fallback = self._fallback_response(is_crisis)
+                parts.append(fallback)
+                model = "fallback"
+                yield {"type": "delta", "text": fallback}
+
+        content = "".join(parts)
+        result = {
+            "content": content,
+            "tokens_used": tokens,
+            "model": model,
+            "suggestions": self._extract_suggestions(content) if model != "fallback" else None,
+        }
+        # A stream cut off partway still ends in "done", but must not be replayed
+        if key is not None and completed:
+            await self._cache_set(key, result)
+        yield {"type": "done", **result}
+
+    async def summarize(self, summary: str | None, messages: list[dict]) -> str:
+        """
+        Fold `messages` (same format as `chat`) into the running `summary`.
+
+        Unlike `chat` there is no fallback: errors propagate so the caller can retry
+        later rather than store a placeholder summary.
+        """
+        transcript = "\n".join(
+            f"{'User' if msg['role'] == 'user' else 'MindFlow'}: {msg['content']}" for msg in messages
+        )
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=f"Current summary:\n{summary or '(none yet)'}\n\nNew messages:\n{transcript}",
+            config=self._summary_config,
+        )
+        if not response.text:
+            raise ValueError("Gemini returned an empty summary")
+        return response.text.strip()
+
+    def _system(self, system_prompt: str | None, is_crisis: bool) -> str:
+        system = system_prompt or MENTAL_HEALTH_SYSTEM_PROMPT
+        if is_crisis:
+            system += "\n\n" + CRISIS_ESCALATION_PROMPT
+        return system
+
+    def _config(
+        self, system_prompt: str | None, is_crisis: bool, temperature: float, max_tokens: int
+    ) -> types.GenerateContentConfig:
+        """Generation config, shared between calls unless a custom system prompt is given."""
+        key = (is_crisis, temperature, max_tokens)
+        config = None if system_prompt else self._configs.get(key)
+        if config is None:
+            config = types.GenerateContentConfig(
+                system_instruction=self._system(system_prompt, is_crisis),
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                safety_settings=SAFETY_SETTINGS,
+            )
+            if not system_prompt:
+                self._configs[key] = config
+        return config
+
+    def _prepare_request(
+        self,
+        messages: list[dict],
+        system_prompt: str | None,
+        is_crisis: bool,
+        temperature: float,
+        max_tokens: int,
+    ) -> tuple[list[types.Content], types.GenerateContentConfig]:
+        # Convert to Gemini format
+        gemini_messages = []
+        for msg in messages:
+            role = "user" if msg["role"] == "user" else "model"
+            gemini_messages.append(
+                types.Content(
+                    role=role,
+                    parts=[types.Part.from_text(text=msg["content"])]
+                )
+            )
+
+        return gemini_messages, self._config(system_prompt, is_crisis, temperature, max_tokens)
+
+    def _cache_key(
+        self,
+        messages: list[dict],
+        system_prompt: str | None,
+        is_crisis: bool,
+        temperature: float,
+        max_tokens: int,
+        cacheable: bool,
+    ) -> str | None:
+        """Response cache key, or None if this request must not be cached."""
+        if is_crisis or not (cacheable or temperature <= settings.gemini_cache_max_temperature):
+            return None
+        request = {
+            "model": self.model,
+            "system": self._system(system_prompt, is_crisis),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "messages": [[msg["role"], msg["content"]] for msg in messages],
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    async def _cache_get(self, key: str) -> dict | None:
+        """Look up a response in the local cache, then the shared tier."""
+        response = self.cache.get(key)
+        if response is None and self.shared_cache is not None:
+            (value,) = await self.shared_cache.get_many([key])
+            if value is not None:
+                response = json.loads(value)
+                self.cache.set(key, response)
+                self.shared_hits += 1
+        if response is None:
+            return None
+        # Served without calling the model, so no tokens were spent on it
+        return {**response, "tokens_used": 0}
+
+    async def _cache_set(self, key: str, response: dict) -> None:
+        self.cache.set(key, response)
+        if self.shared_cache is not None:
+            await self.shared_cache.set_many(
+                {key: json.dumps(response).encode()}, settings.gemini_cache_ttl_seconds
+            )
+
+    def stats(self) -> dict:
+        """Prebuilt generation configs and response cache hit rates."""
+        return {
+            "configs": len(self._configs),
+            "cache": two_tier_stats(self.cache, self.shared_hits),
+        }
+
     def _extract_suggestions(self, content: str) -> list[str] | None:
         """Extract any suggested quick replies from AI response."""
         # Simple heuristic - could be enhanced
@@ -2,9 +2,11 @@ from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 import pandas as pd
 import numpy as np
-from prophet import Prophet
 import logging
 
+from app.config import settings
+from app.ml.trend import daily_series, fit_trends
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,20 +23,33 @@ class PatternInsight:
 class PatternDetector:
     """Detects patterns in mood and wellness data."""
 
-    def __init__(self):
-        pass
+    def __init__(self, trend_engine: str | None = None):
+        # "numpy" (batched robust regression, app/ml/trend.py) or "prophet"
+        self.trend_engine = trend_engine or settings.trend_engine
 
     async def analyze_mood_patterns(
         self,
-        mood_logs: list[dict],  # List of {date, mood_score, time_of_day, day_of_week, factors}
+        mood_logs: list[dict] | dict[str, list],  # Rows or columns: logged_at, mood_score, time_of_day, factors
+        min_days: int = 14,
+    ) -> list[PatternInsight]:
+        """Analyze mood logs to find patterns (inline; see `detect_patterns` for workers)."""
+        return self.detect(mood_logs, min_days)
+
+    def detect(
+        self,
+        mood_logs: list[dict] | dict[str, list],
         min_days: int = 14,
+        factors: dict[str, list] | None = None,  # Columns: mood_score, factor_type, impact_score
     ) -> list[PatternInsight]:
-        """Analyze mood logs to find patterns."""
-        if len(mood_logs) < min_days:
+        """
+        Synchronous analysis; CPU-bound, so keep it off the event loop. Factors come
+        either as columns (one entry per mood_factors row) or nested in each log.
+        """
+        df = pd.DataFrame(mood_logs)
+        if len(df) < min_days:
             return []
 
         insights = []
-        df = pd.DataFrame(mood_logs)
         df["date"] = pd.to_datetime(df["logged_at"])
 
         # 1. Weekly patterns
@@ -47,9 +62,9 @@ class PatternDetector:
         if tod_insight:
             insights.append(tod_insight)
 
-        # 3. Overall trend (with Prophet)
+        # 3. Overall trend
         if len(df) >= 21:
-            trend_insight = await self._detect_trend(df)
+            trend_insight = self._detect_trend(df)
             if trend_insight:
                 insights.append(trend_insight)
 
@@ -59,9 +74,10 @@ class PatternDetector:
             insights.append(self._create_streak_milestone(streak))
 
         # 5. Factor correlations
-        if "factors" in df.columns:
-            factor_insights = self._detect_factor_correlations(df)
-            insights.extend(factor_insights)
+        if factors is None and "factors" in df.columns:
+            factors = self._factor_columns(df)
+        if factors is not None:
+            insights.extend(self._detect_factor_correlations(pd.DataFrame(factors)))
 
         return insights
 
@@ -140,33 +156,18 @@ class PatternDetector:
             },
         )
 
-    async def _detect_trend(self, df: pd.DataFrame) -> PatternInsight | None:
-        """Use Prophet to detect mood trend over time."""
+    def _detect_trend(self, df: pd.DataFrame) -> PatternInsight | None:
+        """Detect the de-seasonalized mood trend over the logged days."""
         try:
-            # Prepare data for Prophet
-            prophet_df = df.groupby(df["date"].dt.date)["mood_score"].mean().reset_index()
-            prophet_df.columns = ["ds", "y"]
-            prophet_df["ds"] = pd.to_datetime(prophet_df["ds"])
+            daily = df.groupby(df["date"].dt.date)["mood_score"].mean().reset_index()
+            daily.columns = ["ds", "y"]
+            daily["ds"] = pd.to_datetime(daily["ds"])
 
-            if len(prophet_df) < 14:
+            if len(daily) < 14:
                 return None
 
-            model = Prophet(
-                daily_seasonality=False,
-                weekly_seasonality=True,
-                yearly_seasonality=False,
-                changepoint_prior_scale=0.1,
-            )
-            model.fit(prophet_df)
-
-            # Get trend component
-            future = model.make_future_dataframe(periods=0)
-            forecast = model.predict(future)
-
-            # Calculate trend direction
-            trend_start = forecast["trend"].iloc[0]
-            trend_end = forecast["trend"].iloc[-1]
-            trend_change = trend_end - trend_start
+            trend = self._fit_trend(daily)
+            trend_change = float(trend[-1] - trend[0])
 
             if abs(trend_change) < 0.5:
                 return None
@@ -174,13 +175,13 @@ class PatternDetector:
             if trend_change > 0:
                 title = "Your mood is trending upward! 📈"
                 description = (
-                    f"Over the past {len(prophet_df)} days, your mood has improved by "
+                    f"Over the past {len(daily)} days, your mood has improved by "
                     f"about {abs(trend_change):.1f} points. Keep doing what works for you!"
                 )
             else:
                 title = "Your mood has been declining 📉"
                 description = (
-                    f"Over the past {len(prophet_df)} days, your mood has dropped by "
+                    f"Over the past {len(daily)} days, your mood has dropped by "
                     f"about {abs(trend_change):.1f} points. Consider what changes might help."
                 )
 
@@ -188,22 +189,51 @@ class PatternDetector:
                 insight_type="trend",
                 title=title,
                 description=description,
-                confidence=min(0.9, len(prophet_df) / 45),
+                confidence=min(0.9, len(daily) / 45),
                 data_points={
                     "trend_change": round(trend_change, 2),
-                    "days_analyzed": len(prophet_df),
+                    "days_analyzed": len(daily),
                 },
                 visualization={
                     "type": "line",
-                    "labels": prophet_df["ds"].dt.strftime("%m/%d").tolist(),
-                    "data": forecast["trend"].round(2).tolist(),
+                    "labels": daily["ds"].dt.strftime("%m/%d").tolist(),
+                    "data": np.round(trend, 2).tolist(),
                 },
             )
 
         except Exception as e:
-            logger.error(f"Prophet trend detection failed: {e}")
+            logger.error(f"Trend detection failed: {e}")
             return None
 
+    def _fit_trend(self, daily: pd.DataFrame) -> np.ndarray:
+        """Trend value for each row of `daily` (columns ds, y)."""
+        if self.trend_engine == "prophet":
+            try:
+                return self._fit_trend_prophet(daily)
+            except ImportError as e:
+                logger.warning(f"Prophet unavailable ({e}), falling back to the numpy trend engine")
+
+        values, weekdays, _ = daily_series(daily["ds"].to_numpy(), daily["y"].to_numpy())
+        fit = fit_trends(values, weekdays)
+        offsets = (daily["ds"] - daily["ds"].min()).dt.days.to_numpy()
+        return fit.trend(offsets)[0]
+
+    def _fit_trend_prophet(self, daily: pd.DataFrame) -> np.ndarray:
+        from prophet import Prophet
+
+        model = Prophet(
+            daily_seasonality=False,
+            weekly_seasonality=True,
+            yearly_seasonality=False,
+            changepoint_prior_scale=0.1,
+        )
+        model.fit(daily)
+
+        # Get trend component
+        future = model.make_future_dataframe(periods=0)
+        forecast = model.predict(future)
+        return forecast["trend"].to_numpy()
+
     def _calculate_streak(self, df: pd.DataFrame) -> int:
         """Calculate consecutive days with mood logs."""
         dates = df["date"].dt.date.unique()
@@ -247,60 +277,75 @@ class PatternDetector:
             data_points={"streak_days": streak},
         )
 
-    def _detect_factor_correlations(self, df: pd.DataFrame) -> list[PatternInsight]:
-        """Detect correlations between factors and mood."""
+    def _factor_columns(self, df: pd.DataFrame) -> dict[str, list]:
+        """Flatten factors nested in each log into columns."""
+        rows = [
+            (score, factor.get("factor_type"), factor.get("impact_score"))
+            for score, factors in zip(df["mood_score"], df["factors"])
+            if isinstance(factors, list)
+            for factor in factors
+        ]
+        mood_scores, factor_types, impact_scores = zip(*rows) if rows else ((), (), ())
+        return {
+            "mood_score": list(mood_scores),
+            "factor_type": list(factor_types),
+            "impact_score": list(impact_scores),
+        }
+
+    def _detect_factor_correlations(self, factor_df: pd.DataFrame) -> list[PatternInsight]:
+        """Detect correlations between factors and mood (one row per logged factor)."""
         insights = []
 
-        # Flatten factors into columns
-        factor_rows = []
-        for _, row in df.iterrows():
-            if row.get("factors"):
-                for factor in row["factors"]:
-                    factor_rows.append({
-                        "mood_score": row["mood_score"],
-                        "factor_type": factor.get("factor_type"),
-                        "factor_value": factor.get("factor_value"),
-                        "impact_score": factor.get("impact_score"),
-                    })
-
-        if len(factor_rows) < 10:
+        if len(factor_df) < 10:
             return insights
 
-        factor_df = pd.DataFrame(factor_rows)
-
-        # Analyze by factor type
-        for factor_type in factor_df["factor_type"].unique():
-            type_data = factor_df[factor_df["factor_type"] == factor_type]
-
-            if len(type_data) < 5:
-                continue
-
-            # Check if impact scores correlate with mood
-            if type_data["impact_score"].notna().sum() >= 5:
-                corr = type_data["mood_score"].corr(type_data["impact_score"])
-
-                if abs(corr) > 0.3:
-                    if corr > 0:
-                        title = f"Good {factor_type} = better mood"
-                        desc = f"When you rate your {factor_type} positively, your mood tends to be higher."
-                    else:
-                        title = f"Poor {factor_type} affects your mood"
-                        desc = f"Challenges with {factor_type} seem to impact your overall mood."
-
-                    insights.append(PatternInsight(
-                        insight_type="correlation",
-                        title=title,
-                        description=desc,
-                        confidence=min(0.75, abs(corr)),
-                        data_points={
-                            "factor_type": factor_type,
-                            "correlation": round(corr, 2),
-                            "sample_size": len(type_data),
-                        },
-                    ))
+        # Per-type moments in one pass, then Pearson r from the sums
+        codes, types = pd.factorize(factor_df["factor_type"])  # Missing types get -1
+        mood = factor_df["mood_score"].to_numpy(dtype=float)
+        impact = pd.to_numeric(factor_df["impact_score"]).to_numpy(dtype=float)
+
+        rows = np.bincount(codes[codes >= 0], minlength=len(types))
+        paired = (codes >= 0) & ~np.isnan(impact)
+        at, x, y = codes[paired], mood[paired], impact[paired]
+        n, sx, sy, sxx, syy, sxy = (
+            np.bincount(at, weights=w, minlength=len(types))
+            for w in (None, x, y, x * x, y * y, x * y)
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = (sxy - sx * sy / n) / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+
+        eligible = np.flatnonzero((rows >= 5) & (n >= 5) & (np.abs(corr) > 0.3))
+        # Strongest first; floating-point error can push |r| slightly past 1
+        for i in eligible[np.argsort(-np.abs(corr[eligible]), kind="stable")]:
+            factor_type, r = types[i], float(np.clip(corr[i], -1, 1))
+            if r > 0:
+                title = f"Good {factor_type} = better mood"
+                desc = f"When you rate your {factor_type} positively, your mood tends to be higher."
+            else:
+                title = f"Poor {factor_type} affects your mood"
+                desc = f"Challenges with {factor_type} seem to impact your overall mood."
+
+            insights.append(PatternInsight(
+                insight_type="correlation",
+                title=title,
+                description=desc,
+                confidence=min(0.75, abs(r)),
+                data_points={
+                    "factor_type": factor_type,
+                    "correlation": round(r, 2),
+                    "sample_size": int(rows[i]),
+                },
+            ))
 
         return insights[:3]  # Limit to top 3
 
 
 # Singleton
 pattern_detector = PatternDetector()
+
+
+def detect_patterns(
+    mood_logs: list[dict] | dict[str, list], min_days: int = 14, factors: dict[str, list] | None = None
+) -> list[PatternInsight]:
+    """Module-level entry point, picklable for process pool workers."""
+    return pattern_detector.detect(mood_logs, min_days, factors)
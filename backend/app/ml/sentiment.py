@@ -1,23 +1,28 @@
-from transformers import pipeline
 from functools import lru_cache
 import logging
 
+from app.config import settings
+from app.ml.backends import load_sentiment_backend
+from app.ml.batching import MicroBatcher
+
 logger = logging.getLogger(__name__)
 
 
 class SentimentAnalyzer:
     def __init__(self):
         self._model = None
+        self.batcher = MicroBatcher(
+            self._predict_batch,
+            max_batch_size=settings.sentiment_batch_size,
+            max_wait_ms=settings.sentiment_batch_wait_ms,
+            name="sentiment",
+        )
 
     @property
     def model(self):
         if self._model is None:
-            logger.info("Loading sentiment model...")
-            self._model = pipeline(
-                "sentiment-analysis",
-                model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                device=-1,  # CPU, use 0 for GPU
-            )
+            logger.info(f"Loading sentiment model ({settings.ml_backend} backend)...")
+            self._model = load_sentiment_backend()
         return self._model
 
     async def analyze(self, text: str) -> dict:
@@ -36,30 +41,34 @@ class SentimentAnalyzer:
 
         try:
             # Truncate for model limits
-            truncated = text[:512]
-            result = self.model(truncated)[0]
-
-            # Map labels to scores
-            label = result["label"].lower()
-            confidence = result["score"]
-
-            if label == "positive":
-                score = confidence
-            elif label == "negative":
-                score = -confidence
-            else:
-                score = 0.0
-
-            return {
-                "score": round(score, 4),
-                "label": label,
-                "confidence": round(confidence, 4),
-            }
-
+            return await self.batcher.submit(text[:512])
         except Exception as e:
             logger.error(f"Sentiment analysis error: {e}")
             return {"score": 0.0, "label": "neutral", "confidence": 0.0}
 
+    def _predict_batch(self, texts: list[str]) -> list[dict]:
+        """Run one forward pass over a padded batch of texts (called on the batcher thread)."""
+        results = self.model.predict(texts)
+        return [self._to_result(result) for result in results]
+
+    def _to_result(self, result: dict) -> dict:
+        # Map labels to scores
+        label = result["label"].lower()
+        confidence = result["score"]
+
+        if label == "positive":
+            score = confidence
+        elif label == "negative":
+            score = -confidence
+        else:
+            score = 0.0
+
+        return {
+            "score": round(score, 4),
+            "label": label,
+            "confidence": round(confidence, 4),
+        }
+
     async def detect_emotion(self, text: str) -> str | None:
         """Detect primary emotion from text."""
         # Simple keyword-based for now - can enhance with emotion model
@@ -83,6 +92,29 @@ class SentimentAnalyzer:
             return max(scores, key=scores.get)
         return None
 
+    def detect_topics(self, text: str, limit: int = 3) -> list[str]:
+        """Life areas a text mentions, most mentioned first (keyword-based)."""
+        text_lower = text.lower()
+
+        topic_keywords = {
+            "work": ["work", "job", "boss", "meeting", "deadline", "career", "office"],
+            "family": ["family", "mom", "dad", "mother", "father", "parent", "brother", "sister", "kids"],
+            "relationships": ["partner", "boyfriend", "girlfriend", "husband", "wife", "dating", "breakup"],
+            "friends": ["friend", "friends"],
+            "health": ["health", "sick", "doctor", "pain", "exercise", "workout", "therapy"],
+            "sleep": ["sleep", "tired", "insomnia", "nap", "exhausted"],
+            "school": ["school", "exam", "class", "study", "homework", "college"],
+            "money": ["money", "rent", "bills", "debt", "salary", "budget"],
+        }
+
+        scores = {}
+        for topic, keywords in topic_keywords.items():
+            score = sum(1 for kw in keywords if kw in text_lower)
+            if score > 0:
+                scores[topic] = score
+
+        return sorted(scores, key=scores.get, reverse=True)[:limit]
+
 
 # Singleton
 sentiment_analyzer = SentimentAnalyzer()
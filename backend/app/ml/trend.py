@@ -0,0 +1,124 @@
+"""
+Batched robust trend fitting for short daily mood series.
+
+Each series is modelled as
+
+    y[t] = intercept + slope * t + weekday_effect[t % 7] + noise
+
+with weekday effects summing to zero (so intercept + slope * t is the
+de-seasonalized trend, the part Prophet reports as `trend`). Fitting is Huber
+IRLS on the normal equations, stacked across series, so thousands of users fit
+in a handful of (B, 8, 8) solves. Missing days are NaN and get zero weight.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+HUBER_K = 1.345  # 95% efficiency under Gaussian noise
+SEASONAL_RIDGE = 1e-3  # Keeps weekday terms identifiable when some weekdays have no data
+
+
+@dataclass
+class TrendFit:
+    intercept: np.ndarray  # (B,)
+    slope: np.ndarray  # (B,) per day
+    weekday_effects: np.ndarray  # (B, 7), Monday first, sums to zero
+    observed: np.ndarray  # (B, T) bool
+
+    def trend(self, t: np.ndarray) -> np.ndarray:
+        """Trend values at day offsets `t`, shape (B, len(t))."""
+        return self.intercept[:, None] + self.slope[:, None] * np.asarray(t, dtype=float)[None, :]
+
+    def trend_change(self) -> np.ndarray:
+        """Trend at the last observed day minus trend at the first, per series."""
+        t = np.arange(self.observed.shape[1])
+        first = np.where(self.observed.any(axis=1), self.observed.argmax(axis=1), 0)
+        last = t[-1] - np.where(self.observed.any(axis=1), self.observed[:, ::-1].argmax(axis=1), t[-1])
+        return self.slope * (last - first)
+
+
+def _design(weekdays: np.ndarray) -> np.ndarray:
+    """(T, 8): intercept, t, and six effect-coded weekday columns (Sunday = -1s)."""
+    n = len(weekdays)
+    X = np.zeros((n, 8))
+    X[:, 0] = 1.0
+    X[:, 1] = np.arange(n)
+    for day in range(6):
+        X[weekdays == day, 2 + day] = 1.0
+    X[weekdays == 6, 2:] = -1.0
+    return X
+
+
+def _solve(X: np.ndarray, y: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """Weighted least squares for every series at once. Returns (B, 8) coefficients."""
+    wx = w[:, :, None] * X  # (B, T, 8)
+    xtwx = wx.transpose(0, 2, 1) @ X
+    xtwy = (wx * y[:, :, None]).sum(axis=1)
+    ridge = np.zeros(X.shape[1])
+    ridge[2:] = SEASONAL_RIDGE
+    xtwx += np.diag(ridge)
+    # Series with fewer than two observed days have no slope; pin it (and an empty
+    # series' intercept) to zero
+    n_observed = (w > 0).sum(axis=1)
+    xtwx[:, 0, 0] += n_observed < 1
+    xtwx[:, 1, 1] += n_observed < 2
+    return np.linalg.solve(xtwx, xtwy[..., None])[..., 0]
+
+
+def _row_median(a: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Median of the non-NaN values in each row (np.nanmedian is slow on many short rows)."""
+    ordered = np.sort(a, axis=1)  # NaNs sort last
+    lo = np.maximum((counts - 1) // 2, 0)[:, None]
+    hi = np.maximum(counts // 2, 0)[:, None]
+    median = (np.take_along_axis(ordered, lo, 1) + np.take_along_axis(ordered, hi, 1))[:, 0] / 2
+    return np.where(counts > 0, median, 0.0)
+
+
+def fit_trends(values: np.ndarray, weekdays: np.ndarray, iterations: int = 5) -> TrendFit:
+    """
+    Fit every row of `values` (B, T), one value per calendar day and NaN where the
+    user logged nothing. `weekdays` (T,) gives each column's weekday, 0 = Monday;
+    all rows share the same calendar.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    weekdays = np.asarray(weekdays) % 7
+    observed = ~np.isnan(values)
+    y = np.where(observed, values, 0.0)
+    base = observed.astype(float)
+    counts = observed.sum(axis=1)
+
+    X = _design(weekdays)
+    w = base
+    coef = _solve(X, y, w)
+    for _ in range(iterations):
+        if not observed.any():
+            break
+        resid = np.where(observed, y - coef @ X.T, np.nan)
+        # Robust scale (MAD); guard against perfectly fitting series
+        center = _row_median(resid, counts)
+        mad = _row_median(np.abs(resid - center[:, None]), counts)
+        scale = np.maximum(1.4826 * mad, 1e-6)[:, None]
+        u = np.abs(np.nan_to_num(resid)) / scale
+        w = base * np.minimum(1.0, HUBER_K / np.maximum(u, 1e-12))
+        coef = _solve(X, y, w)
+
+    effects = np.concatenate([coef[:, 2:], -coef[:, 2:].sum(axis=1, keepdims=True)], axis=1)
+    return TrendFit(intercept=coef[:, 0], slope=coef[:, 1], weekday_effects=effects, observed=observed)
+
+
+def daily_series(dates: np.ndarray, scores: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Average scores per calendar day over the span from the first to the last date.
+    Returns (values (T,) with NaN for empty days, weekdays (T,), observed dates).
+    """
+    days = np.asarray(dates, dtype="datetime64[D]")
+    start = days.min()
+    offsets = (days - start).astype(int)
+    length = offsets.max() + 1
+    sums = np.bincount(offsets, weights=np.asarray(scores, dtype=float), minlength=length)
+    counts = np.bincount(offsets, minlength=length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.where(counts > 0, sums / counts, np.nan)
+    # 1970-01-01 was a Thursday (weekday 3)
+    weekdays = (np.arange(length) + start.astype(int) + 3) % 7
+    return values, weekdays, np.unique(days)
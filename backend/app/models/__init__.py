@@ -1,10 +1,11 @@
 # Export all models for Alembic
 from app.models.base import Base, BaseModel
 from app.models.user import User, UserConsent, OAuthConnection
-from app.models.mood import MoodLog, MoodFactor
+from app.models.mood import MoodLog, MoodFactor, MoodDailyRollup
 from app.models.journal import JournalEntry
 from app.models.chat import ChatSession, ChatMessage
 from app.models.crisis import CrisisEvent, CrisisResource
 from app.models.content import ContentLibrary
-from app.models.insight import UserInsight
+from app.models.insight import UserInsight, InsightJob
 from app.models.recommendation import Recommendation
+from app.models.deferred import DeferredTask
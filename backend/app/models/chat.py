@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import UUID
-from sqlalchemy import String, Text, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import String, Text, Integer, Boolean, DateTime, ForeignKey, Index, desc, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from pgvector.sqlalchemy import Vector
@@ -17,6 +17,8 @@ class ChatSession(BaseModel):
     
     # AI context
     context_summary: Mapped[str | None] = mapped_column(Text, nullable=True)  # Rolling summary
+    summary_message_count: Mapped[int] = mapped_column(Integer, default=0)  # Oldest messages folded into it
+    summary_through: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)  # created_at of the last one
     mood_context: Mapped[dict | None] = mapped_column(JSONB, nullable=True)  # Recent mood for personalization
 
     # Status
@@ -37,8 +39,20 @@ class ChatSession(BaseModel):
 
 class ChatMessage(BaseModel):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_session_created_at", "session_id", desc("created_at")),
+        # Long-term memory recall (ChatService._recall), cosine distance
+        Index(
+            "ix_chat_messages_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+            postgresql_where=text("embedding IS NOT NULL"),
+        ),
+    )
 
-    session_id: Mapped[UUID] = mapped_column(ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    session_id: Mapped[UUID] = mapped_column(ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False)
 
     role: Mapped[str] = mapped_column(String(10), nullable=False)  # user, assistant
     content: Mapped[str] = mapped_column(Text, nullable=False)
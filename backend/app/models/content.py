@@ -1,4 +1,4 @@
-from sqlalchemy import String, Text, SmallInteger, Boolean, Float, Integer
+from sqlalchemy import String, Text, SmallInteger, Boolean, Float, Integer, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from app.models.base import BaseModel
@@ -6,6 +6,15 @@ from app.models.base import BaseModel
 
 class ContentLibrary(BaseModel):
     __tablename__ = "content_library"
+    __table_args__ = (
+        # Serves `target_moods @> '["anxious"]'` containment filters
+        Index(
+            "ix_content_library_target_moods",
+            "target_moods",
+            postgresql_using="gin",
+            postgresql_ops={"target_moods": "jsonb_path_ops"},
+        ),
+    )
 
     content_type: Mapped[str] = mapped_column(String(30), nullable=False)  # breathing, meditation, grounding, tip, article
     title: Mapped[str] = mapped_column(String(200), nullable=False)
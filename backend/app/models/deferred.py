@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy import String, Text, SmallInteger, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import BaseModel
+
+
+class DeferredTask(BaseModel):
+    """
+    Post-response work (embeddings, analytics), written in the same transaction
+    as the request's own changes and processed by app/utils/work_queue.py.
+    Rows are deleted once handled.
+    """
+
+    __tablename__ = "deferred_tasks"
+    __table_args__ = (Index("ix_deferred_tasks_kind_run_after", "kind", "run_after"),)
+
+    kind: Mapped[str] = mapped_column(String(40), nullable=False)  # chat_embedding, mood_note_sentiment, ...
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    attempts: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
+    run_after: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<DeferredTask {self.kind} attempts={self.attempts}>"
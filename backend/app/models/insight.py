@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import UUID
-from sqlalchemy import String, Text, Float, SmallInteger, DateTime, ForeignKey
+from sqlalchemy import String, Text, Float, Integer, SmallInteger, DateTime, ForeignKey, Index, desc, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import BaseModel
@@ -8,6 +8,15 @@ from app.models.base import BaseModel
 
 class UserInsight(BaseModel):
     __tablename__ = "user_insights"
+    __table_args__ = (
+        # Active (not dismissed) insights, newest first
+        Index(
+            "ix_user_insights_user_active",
+            "user_id",
+            desc("created_at"),
+            postgresql_where=text("dismissed_at IS NULL"),
+        ),
+    )
 
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
@@ -36,6 +45,34 @@ class UserInsight(BaseModel):
         return f"<Insight {self.title}>"
 
 
+class InsightJob(BaseModel):
+    """One insight-generation run, queued by a user request or the nightly sweep."""
+
+    __tablename__ = "insight_jobs"
+    __table_args__ = (
+        # At most one queued/running job per user; enqueueing again returns it
+        Index(
+            "uq_insight_jobs_user_active",
+            "user_id",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    trigger: Mapped[str] = mapped_column(String(20), nullable=False, default="request")  # request, nightly
+    insights_created: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<InsightJob {self.id} {self.status}>"
+
+
 # Import at end to avoid circular imports, though not strictly needed here if we use string forward refs, 
 # but good for explicit availability if needed.
 # from app.models.recommendation import Recommendation 
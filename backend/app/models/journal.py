@@ -1,6 +1,6 @@
 from datetime import datetime
 from uuid import UUID
-from sqlalchemy import String, Integer, Text, Float, LargeBinary, DateTime, ForeignKey
+from sqlalchemy import String, Integer, Text, Float, LargeBinary, DateTime, ForeignKey, Index, desc
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from app.models.base import BaseModel
@@ -8,8 +8,9 @@ from app.models.base import BaseModel
 
 class JournalEntry(BaseModel):
     __tablename__ = "journal_entries"
+    __table_args__ = (Index("ix_journal_entries_user_created_at", "user_id", desc("created_at")),)
 
-    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # Encrypted content (E2E encrypted on client OR server-side encrypted)
     content_encrypted: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
@@ -1,14 +1,26 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
-from sqlalchemy import String, SmallInteger, Text, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import (
+    String, SmallInteger, Integer, Text, Float, Boolean, Date, DateTime, ForeignKey, Index, UniqueConstraint,
+    desc, text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import BaseModel
 
 
 class MoodLog(BaseModel):
     __tablename__ = "mood_logs"
+    __table_args__ = (
+        Index("ix_mood_logs_user_logged_at", "user_id", desc("logged_at")),
+        # Nightly insight sweep: users with logs not yet folded into insights
+        Index(
+            "ix_mood_logs_unprocessed_user",
+            "user_id",
+            postgresql_where=text("processed_for_insights IS NOT TRUE"),
+        ),
+    )
 
-    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # Core mood data
     mood_score: Mapped[int] = mapped_column(SmallInteger, nullable=False)  # 1-10
@@ -41,10 +53,43 @@ class MoodLog(BaseModel):
 class MoodFactor(BaseModel):
     __tablename__ = "mood_factors"
 
-    mood_log_id: Mapped[UUID] = mapped_column(ForeignKey("mood_logs.id", ondelete="CASCADE"), nullable=False)
+    mood_log_id: Mapped[UUID] = mapped_column(ForeignKey("mood_logs.id", ondelete="CASCADE"), nullable=False, index=True)
 
     factor_type: Mapped[str] = mapped_column(String(30), nullable=False)  # sleep, exercise, social, work, weather, health
     factor_value: Mapped[str | None] = mapped_column(String(50), nullable=True)  # poor, good, stressful, etc.
     impact_score: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)  # -5 to 5
 
     mood_log: Mapped["MoodLog"] = relationship(back_populates="factors")
+
+
+class MoodDailyRollup(BaseModel):
+    """
+    Per-user, per-local-day aggregates of mood logs.
+
+    Maintained in the same transaction as mood log writes (see MoodService), so
+    stats and trends read at most one row per day instead of every log.
+    """
+    __tablename__ = "mood_daily_rollups"
+    __table_args__ = (UniqueConstraint("user_id", "local_date", name="uq_mood_rollup_user_date"),)
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    local_date: Mapped[date] = mapped_column(Date, nullable=False)  # In the user's timezone
+    day_of_week: Mapped[int] = mapped_column(SmallInteger, nullable=False)  # 0-6, Monday = 0
+
+    log_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    mood_sum: Mapped[int] = mapped_column(Integer, nullable=False)
+    mood_min: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    mood_max: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+
+    # Energy/anxiety are optional, so they carry their own counts
+    energy_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    energy_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    energy_min: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+    energy_max: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+    anxiety_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    anxiety_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    anxiety_min: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+    anxiety_max: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+
+    def __repr__(self):
+        return f"<MoodDailyRollup {self.user_id} {self.local_date} n={self.log_count}>"
@@ -1,14 +1,25 @@
 from datetime import datetime
 from uuid import UUID
-from sqlalchemy import String, SmallInteger, DateTime, ForeignKey
+from sqlalchemy import String, SmallInteger, DateTime, ForeignKey, Index, desc, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import BaseModel
 
 
 class Recommendation(BaseModel):
     __tablename__ = "recommendations"
-
-    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    __table_args__ = (
+        Index("ix_recommendations_user_created_at", "user_id", desc("created_at")),
+        # Open (not completed) recommendations in list order
+        Index(
+            "ix_recommendations_user_open",
+            "user_id",
+            desc("priority"),
+            desc("created_at"),
+            postgresql_where=text("completed_at IS NULL"),
+        ),
+    )
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     insight_id: Mapped[UUID | None] = mapped_column(ForeignKey("user_insights.id", ondelete="SET NULL"), nullable=True)
     content_id: Mapped[UUID] = mapped_column(ForeignKey("content_library.id", ondelete="CASCADE"), nullable=False)
 
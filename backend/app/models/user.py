@@ -13,7 +13,7 @@ class User(BaseModel):
     password_hash: Mapped[str | None] = mapped_column(String(255), nullable=True)
     display_name: Mapped[str | None] = mapped_column(String(100), nullable=True)
     avatar_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
-    timezone: Mapped[str] = mapped_column(String(50), default="UTC")
+    timezone: Mapped[str] = mapped_column(String(50), default="UTC")  # Changing it must call MoodService.rebuild_rollups()
     locale: Mapped[str] = mapped_column(String(10), default="en-US")
 
     # Subscription
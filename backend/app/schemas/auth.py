@@ -27,6 +27,10 @@ class RefreshRequest(BaseModel):
     refresh_token: str
 
 
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = None
+
+
 class UserResponse(BaseModel):
     id: UUID
     email: str
@@ -64,6 +64,7 @@ class ChatAIResponse(BaseModel):
     suggestions: list[str] | None = None
     action_cards: list[ActionCard] | None = None
     crisis_alert: CrisisAlert | None = None
+    timings: dict[str, int] | None = None  # Milliseconds per stage of the turn, plus "total"
 
 
 class ChatSessionDetail(ChatSessionResponse):
@@ -72,6 +73,7 @@ class ChatSessionDetail(ChatSessionResponse):
 
 class PaginatedChatSessions(BaseModel):
     items: list[ChatSessionResponse]
-    total: int
+    total: int | None
     page: int
     per_page: int
+    next_cursor: str | None = None
@@ -34,13 +34,16 @@ class ContentQuery(BaseModel):
     is_premium: bool | None = None
     page: int = Field(1, ge=1)
     per_page: int = Field(20, ge=1, le=100)
+    cursor: str | None = None
+    include_total: bool | None = None
 
 
 class PaginatedContent(BaseModel):
     items: list[ContentBrief]
-    total: int
+    total: int | None
     page: int
     per_page: int
+    next_cursor: str | None = None
 
 
 class ContentRating(BaseModel):
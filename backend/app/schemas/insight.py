@@ -19,6 +19,20 @@ class InsightResponse(BaseModel):
         from_attributes = True
 
 
+class InsightJobResponse(BaseModel):
+    id: UUID
+    status: Literal["queued", "running", "succeeded", "failed"]
+    trigger: str
+    insights_created: int | None
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
 class InsightFeedback(BaseModel):
     helpful_rating: int = Field(..., ge=1, le=5)
     feedback_text: str | None = None
@@ -26,6 +40,7 @@ class InsightFeedback(BaseModel):
 
 class PaginatedInsights(BaseModel):
     items: list[InsightResponse]
-    total: int
+    total: int | None
     page: int
     per_page: int
+    next_cursor: str | None = None
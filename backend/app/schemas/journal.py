@@ -42,10 +42,11 @@ class JournalEntriesQuery(BaseModel):
 
 class PaginatedJournalEntries(BaseModel):
     items: list[JournalEntryResponse]
-    total: int
+    total: int | None
     page: int
     per_page: int
-    pages: int
+    pages: int | None
+    next_cursor: str | None = None
 
 
 class JournalPrompt(BaseModel):
@@ -63,10 +63,11 @@ class MoodLogsQuery(BaseModel):
 
 class PaginatedMoodLogs(BaseModel):
     items: list[MoodLogResponse]
-    total: int
+    total: int | None
     page: int
     per_page: int
-    pages: int
+    pages: int | None
+    next_cursor: str | None = None
 
 
 class MoodStatsResponse(BaseModel):
@@ -23,6 +23,7 @@ class RecommendationFeedback(BaseModel):
 
 class PaginatedRecommendations(BaseModel):
     items: list[RecommendationResponse]
-    total: int
+    total: int | None
     page: int
     per_page: int
+    next_cursor: str | None = None
@@ -3,7 +3,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.user import User
 from app.schemas.auth import RegisterRequest, LoginRequest, TokenResponse
-from app.utils.security import hash_password, verify_password, create_access_token, create_refresh_token
+from app.utils.password_hasher import password_hasher
+from app.utils.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    revoke_token,
+)
 from app.utils.exceptions import ConflictException, UnauthorizedException
 from app.config import settings
 
@@ -20,7 +26,7 @@ class AuthService:
 
         user = User(
             email=data.email,
-            password_hash=hash_password(data.password),
+            password_hash=await password_hasher.hash(data.password),
             display_name=data.display_name,
             timezone=data.timezone,
             locale=data.locale,
@@ -39,9 +45,14 @@ class AuthService:
         if not user or not user.password_hash:
             raise UnauthorizedException("Invalid email or password")
 
-        if not verify_password(data.password, user.password_hash):
+        valid, new_hash = await password_hasher.verify(data.password, user.password_hash)
+        if not valid:
             raise UnauthorizedException("Invalid email or password")
 
+        # Upgrade hashes made with deprecated settings while we have the plaintext
+        if new_hash:
+            user.password_hash = new_hash
+
         # Update last active
         user.last_active_at = datetime.now(timezone.utc)
         await self.db.commit()
@@ -54,9 +65,7 @@ class AuthService:
         )
 
     async def refresh_tokens(self, refresh_token: str) -> TokenResponse:
-        from app.utils.security import decode_token
-
-        payload = decode_token(refresh_token)
+        payload = await decode_token(refresh_token)
         if not payload or payload.get("type") != "refresh":
             raise UnauthorizedException("Invalid refresh token")
 
@@ -71,9 +80,23 @@ class AuthService:
         if not user:
             raise UnauthorizedException("User not found")
 
+        # Rotate: each refresh token is single-use, so a stolen copy dies on first use.
+        # Revoking is the atomic spend: of two concurrent refreshes only one gets True.
+        if not await revoke_token(payload):
+            raise UnauthorizedException("Invalid refresh token")
+
         return TokenResponse(
             access_token=create_access_token(user.id),
             refresh_token=create_refresh_token(user.id),
             token_type="bearer",
             expires_in=settings.access_token_expire_minutes * 60,
         )
+
+    async def logout(self, access_payload: dict, refresh_token: str | None = None) -> None:
+        """Revoke the caller's access token and, if given, their refresh token."""
+        await revoke_token(access_payload)
+
+        if refresh_token:
+            payload = await decode_token(refresh_token)
+            if payload and payload.get("type") == "refresh" and payload.get("sub") == access_payload["sub"]:
+                await revoke_token(payload)
@@ -1,11 +1,14 @@
 from datetime import datetime, timezone
+from typing import AsyncIterator
 from uuid import UUID
-import time
+import asyncio
 import math
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import and_, func, select, update
 from sqlalchemy.orm import selectinload
 
+from app.config import settings
+from app.database import AsyncSessionLocal
 from app.models.chat import ChatSession, ChatMessage
 from app.models.user import User
 from app.schemas.chat import (
@@ -19,14 +22,20 @@ from app.schemas.chat import (
     PaginatedChatSessions,
 )
 from app.ml.gemini_client import gemini_client
-from app.ml.crisis_detector import crisis_detector
+from app.ml.crisis_detector import crisis_detector, CrisisResult
 from app.ml.sentiment import sentiment_analyzer
 from app.ml.embeddings import embedding_service
 from app.services.crisis_service import CrisisService
+from app.services.deferred_handlers import enqueue_chat_embedding, enqueue_chat_summary
 from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.pagination import SortKey, paginate
+from app.utils.timing import StageTimer
 
 
 class ChatService:
+    # Sessions for work that outlives the request's own (a streamed turn's persist)
+    session_factory = AsyncSessionLocal
+
     def __init__(self, db: AsyncSession, current_user: User):
         self.db = db
         self.user = current_user
@@ -71,112 +80,370 @@ class ChatService:
 
         return session
 
-    async def list_sessions(self, page: int = 1, per_page: int = 20) -> PaginatedChatSessions:
-        query = (
-            select(ChatSession)
-            .where(ChatSession.user_id == self.user.id)
-            .order_by(ChatSession.last_message_at.desc().nullsfirst())
-        )
-
-        count_result = await self.db.execute(
-            select(func.count(ChatSession.id)).where(ChatSession.user_id == self.user.id)
+    async def list_sessions(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        cursor: str | None = None,
+        include_total: bool | None = None,
+    ) -> PaginatedChatSessions:
+        result = await paginate(
+            self.db,
+            select(ChatSession).where(ChatSession.user_id == self.user.id),
+            order=[SortKey(ChatSession.last_message_at)],
+            id_column=ChatSession.id,
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total,
         )
-        total = count_result.scalar()
-
-        offset = (page - 1) * per_page
-        query = query.offset(offset).limit(per_page)
-
-        result = await self.db.execute(query)
-        sessions = result.scalars().all()
 
         return PaginatedChatSessions(
-            items=[ChatSessionResponse.model_validate(s) for s in sessions],
-            total=total,
+            items=[ChatSessionResponse.model_validate(s) for s in result.items],
+            total=result.total,
             page=page,
             per_page=per_page,
+            next_cursor=result.next_cursor,
         )
 
     async def send_message(self, session_id: UUID, data: ChatMessageSend) -> ChatAIResponse:
-        """Process user message and generate AI response."""
-        session = await self.get_session(session_id, include_messages=True)
-        start_time = time.time()
-
-        # 1. Crisis detection (fast path)
-        crisis_result = await crisis_detector.analyze(data.content)
+        """
+        Process user message and generate AI response.
+
+        Crisis detection and the user-message embedding run first and concurrently
+        (the model call depends on both: the embedding drives memory recall). Then
+        the model call and crisis handling run concurrently. The assistant-message
+        embedding and any summary update are queued for after the response.
+        """
+        session = await self.get_session(session_id)
+        timer = StageTimer()
+        sent_at = datetime.now(timezone.utc)
 
-        # 2. Create user message
-        user_embedding = await embedding_service.generate(data.content)
-        user_msg = ChatMessage(
-            session_id=session_id,
-            role="user",
-            content=data.content,
-            crisis_detected=crisis_result.is_crisis,
-            embedding=user_embedding,
+        # 1. Crisis detection (fast path) and the embedding; neither uses the db session
+        crisis_result, user_embedding = await asyncio.gather(
+            timer.timed("crisis_detection", crisis_detector.analyze(data.content)),
+            timer.timed("user_embedding", embedding_service.generate(data.content)),
         )
-        self.db.add(user_msg)
 
-        # 3. Handle crisis if detected
-        crisis_alert = None
+        # 2. Build conversation context
+        memories = await timer.timed("memory_recall", self._recall(session, user_embedding))
+        with timer.stage("context"):
+            context_messages = await self._build_context(session, data.content, memories)
+
+        # 3. Independent stages; crisis handling is the only one using the db session
+        stages = [
+            timer.timed(
+                "generation",
+                gemini_client.chat(
+                    messages=context_messages,
+                    is_crisis=crisis_result.is_crisis,
+                    cacheable=self._is_templated(session),
+                ),
+            ),
+        ]
         if crisis_result.is_crisis:
-            crisis_service = CrisisService(self.db, self.user)
-            await crisis_service.handle_detection(
-                source="chat",
-                severity=crisis_result.severity,
-                confidence=crisis_result.confidence,
+            stages.append(timer.timed("crisis_handling", self._handle_crisis(crisis_result)))
+        ai_response, *crisis = await asyncio.gather(*stages)
+        crisis_alert = crisis[0] if crisis else None
+        response_time = timer.elapsed_ms()
+
+        # 4. Persist the turn
+        with timer.stage("persist"):
+            user_msg = ChatMessage(
+                session_id=session_id,
+                role="user",
+                content=data.content,
+                crisis_detected=crisis_result.is_crisis,
+                embedding=user_embedding,
+                created_at=sent_at,
             )
-            crisis_alert = await crisis_service.build_crisis_alert(crisis_result.severity)
+            assistant_msg = ChatMessage(
+                session_id=session_id,
+                role="assistant",
+                content=ai_response["content"],
+                model_used=ai_response["model"],
+                tokens_used=ai_response["tokens_used"],
+                response_time_ms=response_time,
+                created_at=datetime.now(timezone.utc),
+            )
+            self.db.add_all([user_msg, assistant_msg])
+            await self.db.flush()
 
-        # 4. Build conversation context
-        context_messages = self._build_context(session.messages, data.content)
+            # Deferred: nothing in this turn reads the assistant embedding
+            enqueue_chat_embedding(self.db, assistant_msg.id)
 
-        # 5. Generate AI response
-        ai_response = await gemini_client.chat(
-            messages=context_messages,
-            is_crisis=crisis_result.is_crisis,
-        )
+            session.message_count += 2
+            session.last_message_at = assistant_msg.created_at
+            if self._needs_summary(session.message_count, session.summary_message_count):
+                enqueue_chat_summary(self.db, session_id)
 
-        response_time = int((time.time() - start_time) * 1000)
+            await self.db.commit()
+            await self.db.refresh(assistant_msg)
 
-        # 6. Create assistant message
-        assistant_embedding = await embedding_service.generate(ai_response["content"])
-        assistant_msg = ChatMessage(
-            session_id=session_id,
-            role="assistant",
-            content=ai_response["content"],
-            model_used=ai_response["model"],
-            tokens_used=ai_response["tokens_used"],
-            response_time_ms=response_time,
-            embedding=assistant_embedding,
+        # 5. Build response
+        action_cards = self._generate_action_cards(ai_response["content"], crisis_result.is_crisis)
+
+        return ChatAIResponse(
+            message=ChatMessageResponse.model_validate(assistant_msg),
+            suggestions=ai_response.get("suggestions"),
+            action_cards=action_cards,
+            crisis_alert=crisis_alert,
+            timings=timer.breakdown(),
+        )
+
+    async def _handle_crisis(self, crisis_result: CrisisResult) -> CrisisAlert:
+        crisis_service = CrisisService(self.db, self.user)
+        await crisis_service.handle_detection(
+            source="chat",
+            severity=crisis_result.severity,
+            confidence=crisis_result.confidence,
         )
-        self.db.add(assistant_msg)
+        return await crisis_service.build_crisis_alert(crisis_result.severity)
+
+    async def stream_message(
+        self, session_id: UUID, data: ChatMessageSend
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Streaming variant of `send_message`, yielding (event, payload) pairs.
+
+        Session lookup, crisis detection and context building run before this
+        returns, so errors still surface as regular HTTP responses and the crisis
+        alert is always the first event. The user's message is saved before
+        streaming starts and the reply when the stream closes, even if the client
+        disconnects partway.
+
+        Everything on `self.db` is committed before this returns: the request's
+        session is closed once the endpoint returns, before the stream is consumed,
+        so the returned iterator persists the reply through a session of its own.
+        """
+        session = await self.get_session(session_id)
+        timer = StageTimer()
+        sent_at = datetime.now(timezone.utc)
 
-        # 7. Update session
-        session.message_count += 2
-        session.last_message_at = datetime.now(timezone.utc)
+        crisis_result, user_embedding = await asyncio.gather(
+            timer.timed("crisis_detection", crisis_detector.analyze(data.content)),
+            timer.timed("user_embedding", embedding_service.generate(data.content)),
+        )
 
+        crisis_alert = None
+        if crisis_result.is_crisis:
+            with timer.stage("crisis_handling"):
+                crisis_alert = await self._handle_crisis(crisis_result)
+
+        memories = await timer.timed("memory_recall", self._recall(session, user_embedding))
+        with timer.stage("context"):
+            context_messages = await self._build_context(session, data.content, memories)
+
+        self.db.add(
+            ChatMessage(
+                session_id=session_id,
+                role="user",
+                content=data.content,
+                crisis_detected=crisis_result.is_crisis,
+                embedding=user_embedding,
+                created_at=sent_at,
+            )
+        )
+        session.message_count += 1
+        session.last_message_at = sent_at
         await self.db.commit()
-        await self.db.refresh(assistant_msg)
 
-        # 8. Build response
+        return self._stream_turn(
+            session_id,
+            crisis_result,
+            crisis_alert,
+            context_messages,
+            self._is_templated(session),
+            timer,
+        )
+
+    async def _stream_turn(
+        self,
+        session_id: UUID,
+        crisis_result: CrisisResult,
+        crisis_alert: CrisisAlert | None,
+        context_messages: list[dict],
+        cacheable: bool,
+        timer: StageTimer,
+    ) -> AsyncIterator[tuple[str, dict]]:
+        if crisis_alert:
+            yield "crisis_alert", crisis_alert.model_dump(mode="json")
+
+        ai_response = None
+        parts: list[str] = []
+        try:
+            with timer.stage("generation"):
+                async for event in gemini_client.chat_stream(
+                    messages=context_messages,
+                    is_crisis=crisis_result.is_crisis,
+                    cacheable=cacheable,
+                ):
+                    if event["type"] == "delta":
+                        parts.append(event["text"])
+                        yield "delta", {"text": event["text"]}
+                    else:
+                        ai_response = event
+        finally:
+            # Also runs when the client disconnects and the stream is closed early:
+            # keep what was sent, marked as aborted. Shielded, so the cancellation
+            # that closes the stream does not cancel the write too.
+            if ai_response is None and parts:
+                ai_response = {"content": "".join(parts), "model": "aborted", "tokens_used": 0}
+            if ai_response is not None:
+                with timer.stage("persist"):
+                    assistant_msg = await asyncio.shield(
+                        asyncio.ensure_future(
+                            self._persist_reply(session_id, ai_response, timer.elapsed_ms())
+                        )
+                    )
+
         action_cards = self._generate_action_cards(ai_response["content"], crisis_result.is_crisis)
 
-        return ChatAIResponse(
+        response = ChatAIResponse(
             message=ChatMessageResponse.model_validate(assistant_msg),
             suggestions=ai_response.get("suggestions"),
             action_cards=action_cards,
             crisis_alert=crisis_alert,
+            timings=timer.breakdown(),
+        )
+        yield "done", response.model_dump(mode="json")
+
+    async def _persist_reply(
+        self, session_id: UUID, ai_response: dict, response_time: int
+    ) -> ChatMessage:
+        """
+        Save a streamed reply. The request's session is gone by now, so this uses
+        its own and updates the chat session row by id.
+        """
+        assistant_msg = ChatMessage(
+            session_id=session_id,
+            role="assistant",
+            content=ai_response["content"],
+            model_used=ai_response["model"],
+            tokens_used=ai_response["tokens_used"],
+            response_time_ms=response_time,
+            created_at=datetime.now(timezone.utc),
+        )
+        async with self.session_factory() as db:
+            db.add(assistant_msg)
+            await db.flush()
+            enqueue_chat_embedding(db, assistant_msg.id)
+            result = await db.execute(
+                update(ChatSession)
+                .where(ChatSession.id == session_id)
+                .values(
+                    message_count=ChatSession.message_count + 1,
+                    last_message_at=assistant_msg.created_at,
+                )
+                .returning(ChatSession.message_count, ChatSession.summary_message_count)
+            )
+            if self._needs_summary(*result.one()):
+                enqueue_chat_summary(db, session_id)
+            await db.commit()
+            await db.refresh(assistant_msg)
+        return assistant_msg
+
+    def _in_window(self, session: ChatSession):
+        """Filter for the session's messages the model already sees verbatim."""
+        condition = ChatMessage.session_id == session.id
+        if session.summary_through is not None:
+            condition = and_(condition, ChatMessage.created_at > session.summary_through)
+        return condition
+
+    async def _recall(self, session: ChatSession, embedding: list[float]) -> list:
+        """
+        Long-term memory: the user's past messages (any session) closest to
+        `embedding`, skipping the current context window, nearest first.
+
+        Served by the HNSW index on `chat_messages.embedding`; the pgvector search
+        parameters apply to this transaction only.
+        """
+        if settings.chat_memory_k <= 0 or not any(embedding):
+            return []  # Disabled, or the embedding fell back to zeros
+
+        search_params = [
+            func.set_config("hnsw.ef_search", str(settings.chat_memory_ef_search), True),
+            func.set_config("ivfflat.probes", str(settings.chat_memory_probes), True),
+        ]
+        if settings.chat_memory_iterative_scan:
+            # Without it, the index returns ef_search rows across all users before
+            # the user filter, which can leave fewer than k
+            search_params.append(
+                func.set_config("hnsw.iterative_scan", settings.chat_memory_iterative_scan, True)
+            )
+        await self.db.execute(select(*search_params))
+
+        distance = ChatMessage.embedding.cosine_distance(embedding)
+        result = await self.db.execute(
+            select(
+                ChatMessage.role,
+                ChatMessage.content,
+                ChatMessage.created_at,
+                distance.label("distance"),
+            )
+            .join(ChatSession, ChatSession.id == ChatMessage.session_id)
+            .where(
+                ChatSession.user_id == self.user.id,
+                ChatMessage.embedding.is_not(None),
+                ~self._in_window(session),
+            )
+            .order_by(distance)
+            .limit(settings.chat_memory_k)
+        )
+        # relaxed_order scans may return near-ties slightly out of order
+        return sorted(
+            (row for row in result.all() if row.distance <= settings.chat_memory_max_distance),
+            key=lambda row: row.distance,
         )
 
-    def _build_context(self, messages: list[ChatMessage], new_message: str) -> list[dict]:
-        """Build conversation context for AI, limiting to recent messages."""
-        # Take last 10 messages for context
-        recent = messages[-10:] if len(messages) > 10 else messages
-
-        context = [{"role": msg.role, "content": msg.content} for msg in recent]
+    async def _build_context(
+        self, session: ChatSession, new_message: str, memories: list | None = None
+    ) -> list[dict]:
+        """
+        Build conversation context for AI: recalled memories, the session's rolling
+        summary, and the messages not yet folded into it (at most
+        CHAT_CONTEXT_MESSAGES), so the prompt stays the same size however long the
+        session gets.
+        """
+        result = await self.db.execute(
+            select(ChatMessage.role, ChatMessage.content)
+            .where(self._in_window(session))
+            .order_by(ChatMessage.created_at.desc())
+            .limit(settings.chat_context_messages)
+        )
+        recent = reversed(result.all())
+
+        context = []
+        if memories:
+            lines = []
+            for m in memories:
+                speaker = "User" if m.role == "user" else "MindFlow"
+                lines.append(f"- {speaker} ({m.created_at:%Y-%m-%d}): {m.content}")
+            recalled = "\n".join(lines)
+            context.append({
+                "role": "user",
+                "content": f"(From our earlier conversations, possibly relevant:\n{recalled})",
+            })
+        if session.context_summary:
+            context.append({
+                "role": "user",
+                "content": f"(Summary of our conversation so far: {session.context_summary})",
+            })
+        context.extend({"role": msg.role, "content": msg.content} for msg in recent)
         context.append({"role": "user", "content": new_message})
 
         return context
 
+    def _is_templated(self, session: ChatSession) -> bool:
+        # The opening message of a check-in or guided session usually comes from the
+        # client's template, so identical openers can share a cached reply
+        return session.message_count == 0 and session.session_type != "general"
+
+    def _needs_summary(self, message_count: int, summary_message_count: int) -> bool:
+        # Folding is deferred; until it runs, the oldest unsummarized messages
+        # just drop out of the context window
+        return message_count - summary_message_count > settings.chat_context_messages
+
     def _generate_action_cards(self, content: str, is_crisis: bool) -> list[ActionCard] | None:
         """Generate action cards based on AI response content."""
         cards = []
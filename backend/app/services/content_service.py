@@ -1,7 +1,7 @@
 from uuid import UUID
 import math
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 
 from app.models.content import ContentLibrary
 from app.models.user import User
@@ -11,7 +11,9 @@ from app.schemas.content import (
     PaginatedContent,
     ContentRating,
 )
+from app.services.deferred_handlers import enqueue_content_view
 from app.utils.exceptions import NotFoundException
+from app.utils.pagination import SortKey, paginate
 
 
 class ContentService:
@@ -40,8 +42,8 @@ class ContentService:
         if content.is_premium and self.user and not getattr(self.user, 'is_premium', False):
              raise NotFoundException("Premium content - upgrade to access")
 
-        # Increment view count
-        content.view_count += 1
+        # Counted after the response, batched per content item
+        enqueue_content_view(self.db, content.id)
         await self.db.commit()
 
         return ContentDetail(
@@ -58,7 +60,7 @@ class ContentService:
             audio_url=content.audio_url,
             target_moods=content.target_moods,
             avg_rating=content.avg_rating,
-            view_count=content.view_count,
+            view_count=(content.view_count or 0) + 1,  # Including this view
         )
 
     async def list_content(
@@ -69,6 +71,8 @@ class ContentService:
         is_premium: bool | None = None,
         page: int = 1,
         per_page: int = 20,
+        cursor: str | None = None,
+        include_total: bool | None = None,
     ) -> PaginatedContent:
         query = select(ContentLibrary).where(ContentLibrary.is_active == True)
 
@@ -81,44 +85,23 @@ class ContentService:
         if mood:
             query = query.where(ContentLibrary.target_moods.contains([mood]))
 
-        # Count
-        count_query = select(func.count(ContentLibrary.id)).where(ContentLibrary.is_active == True)
-        if content_type:
-            count_query = count_query.where(ContentLibrary.content_type == content_type)
-        # Note: applying all filters to count query properly requires more complex construction or re-using base query
-        # For simplicity in this iteration, we focus on partial count filtering or assume optimized later.
-        # But to be correct let's apply same filters.
-        # Simplest way in sqlalchemy 1.4+ is select(func.count()).select_from(subquery) but here we can just reuse the where clauses?
-        # Let's keep it simple for now, the 'count_query' above only adds content_type. 
-        # Ideally we should copy the where clause.
-        
-        # Let's fix count query construction:
-        # Re-apply filters
-        count_query = select(func.count(ContentLibrary.id)).where(ContentLibrary.is_active == True)
-        if content_type:
-            count_query = count_query.where(ContentLibrary.content_type == content_type)
-        if difficulty:
-            count_query = count_query.where(ContentLibrary.difficulty == difficulty)
-        if is_premium is not None:
-             count_query = count_query.where(ContentLibrary.is_premium == is_premium)
-        if mood:
-            count_query = count_query.where(ContentLibrary.target_moods.contains([mood]))
-
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
-
-        # Paginate
-        offset = (page - 1) * per_page
-        query = query.offset(offset).limit(per_page)
-
-        result = await self.db.execute(query)
-        contents = result.scalars().all()
+        result = await paginate(
+            self.db,
+            query,
+            order=[SortKey(ContentLibrary.created_at)],
+            id_column=ContentLibrary.id,
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total,
+        )
 
         return PaginatedContent(
-            items=[ContentBrief.model_validate(c) for c in contents],
-            total=total,
+            items=[ContentBrief.model_validate(c) for c in result.items],
+            total=result.total,
             page=page,
             per_page=per_page,
+            next_cursor=result.next_cursor,
         )
 
     async def get_for_mood(self, mood: str, limit: int = 5) -> list[ContentLibrary]:
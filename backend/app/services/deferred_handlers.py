@@ -0,0 +1,190 @@
+"""
+Handlers for post-response work (see app/utils/work_queue.py).
+
+Each takes every due task of its kind in one call, so model work runs as one
+batch: 64 pending message embeddings become a single `generate_batch`, and
+sentiment requests submitted together are coalesced by the sentiment batcher.
+"""
+from collections import Counter
+from uuid import UUID
+import asyncio
+
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.ml.embeddings import embedding_service
+from app.ml.gemini_client import gemini_client
+from app.ml.sentiment import sentiment_analyzer
+from app.models.chat import ChatMessage, ChatSession
+from app.models.content import ContentLibrary
+from app.models.journal import JournalEntry
+from app.models.mood import MoodLog
+from app.utils.encryption import decrypt_content
+from app.utils.work_queue import work_queue
+
+
+def _ids(payloads: list[dict], key: str) -> list[UUID]:
+    return list({UUID(p[key]) for p in payloads})
+
+
+@work_queue.handler("chat_embedding", batch_size=64)
+async def embed_chat_messages(db: AsyncSession, payloads: list[dict]) -> None:
+    result = await db.execute(
+        select(ChatMessage.id, ChatMessage.content).where(
+            ChatMessage.id.in_(_ids(payloads, "message_id"))
+        )
+    )
+    rows = result.all()
+    if not rows:
+        return
+
+    embeddings = await embedding_service.generate_batch([row.content for row in rows])
+    await db.execute(
+        update(ChatMessage),
+        [{"id": row.id, "embedding": embedding} for row, embedding in zip(rows, embeddings)],
+    )
+
+
+@work_queue.handler("chat_summary", batch_size=16)
+async def summarize_chat_sessions(db: AsyncSession, payloads: list[dict]) -> None:
+    """
+    Fold the oldest unsummarized messages of each session into `context_summary`
+    once more than CHAT_CONTEXT_MESSAGES of them have piled up, in chunks of at
+    least CHAT_SUMMARY_EVERY. The sessions are read without a lock, so chat turns
+    are not blocked while Gemini summarizes; each fold is then applied only if
+    `summary_message_count` is still what was read, so duplicate tasks for a
+    session fold its messages once.
+    """
+    keep = settings.chat_context_messages
+    result = await db.execute(
+        select(
+            ChatSession.id,
+            ChatSession.message_count,
+            ChatSession.summary_message_count,
+            ChatSession.summary_through,
+            ChatSession.context_summary,
+        ).where(ChatSession.id.in_(_ids(payloads, "session_id")))
+    )
+
+    folds: list[tuple[Row, list[Row]]] = []
+    for session in result.all():
+        unsummarized = session.message_count - session.summary_message_count
+        if unsummarized <= keep:
+            continue
+        fold = max(min(settings.chat_summary_every, unsummarized), unsummarized - keep)
+        query = select(ChatMessage.role, ChatMessage.content, ChatMessage.created_at).where(
+            ChatMessage.session_id == session.id
+        )
+        if session.summary_through is not None:
+            query = query.where(ChatMessage.created_at > session.summary_through)
+        rows = (await db.execute(query.order_by(ChatMessage.created_at).limit(fold))).all()
+        if rows:
+            folds.append((session, rows))
+    if not folds:
+        return
+
+    summaries = await asyncio.gather(
+        *(
+            gemini_client.summarize(
+                session.context_summary,
+                [{"role": row.role, "content": row.content} for row in rows],
+            )
+            for session, rows in folds
+        )
+    )
+    for (session, rows), summary in zip(folds, summaries):
+        # No-op if another run folded this session meanwhile
+        await db.execute(
+            update(ChatSession)
+            .where(
+                ChatSession.id == session.id,
+                ChatSession.summary_message_count == session.summary_message_count,
+            )
+            .values(
+                context_summary=summary,
+                summary_message_count=session.summary_message_count + len(rows),
+                summary_through=rows[-1].created_at,
+            )
+        )
+
+
+@work_queue.handler("mood_note_sentiment")
+async def score_mood_notes(db: AsyncSession, payloads: list[dict]) -> None:
+    result = await db.execute(
+        select(MoodLog.id, MoodLog.note).where(
+            MoodLog.id.in_(_ids(payloads, "mood_log_id")), MoodLog.note.is_not(None)
+        )
+    )
+    rows = result.all()
+    if not rows:
+        return
+
+    sentiments = await asyncio.gather(*(sentiment_analyzer.analyze(row.note) for row in rows))
+    await db.execute(
+        update(MoodLog),
+        [{"id": row.id, "note_sentiment": s["score"]} for row, s in zip(rows, sentiments)],
+    )
+
+
+@work_queue.handler("journal_analytics")
+async def analyze_journal_entries(db: AsyncSession, payloads: list[dict]) -> None:
+    result = await db.execute(
+        select(JournalEntry.id, JournalEntry.content_encrypted, JournalEntry.content_iv).where(
+            JournalEntry.id.in_(_ids(payloads, "entry_id"))
+        )
+    )
+    rows = result.all()
+    if not rows:
+        return
+
+    texts = [decrypt_content(row.content_encrypted, row.content_iv) for row in rows]
+    sentiments = await asyncio.gather(*(sentiment_analyzer.analyze(text) for text in texts))
+    emotions = await asyncio.gather(*(sentiment_analyzer.detect_emotion(text) for text in texts))
+    await db.execute(
+        update(JournalEntry),
+        [
+            {
+                "id": row.id,
+                "sentiment_score": sentiment["score"],
+                "primary_emotion": emotion,
+                "topics": sentiment_analyzer.detect_topics(text),
+            }
+            for row, text, sentiment, emotion in zip(rows, texts, sentiments, emotions)
+        ],
+    )
+
+
+@work_queue.handler("content_view", batch_size=500)
+async def count_content_views(db: AsyncSession, payloads: list[dict]) -> None:
+    # One UPDATE per content item however many views are pending for it
+    views = Counter(UUID(p["content_id"]) for p in payloads)
+    for content_id, count in views.items():
+        await db.execute(
+            update(ContentLibrary)
+            .where(ContentLibrary.id == content_id)
+            .values(view_count=func.coalesce(ContentLibrary.view_count, 0) + count)
+        )
+
+
+# Enqueue helpers for request handlers
+
+
+def enqueue_chat_embedding(db: AsyncSession, message_id: UUID) -> None:
+    work_queue.enqueue(db, "chat_embedding", {"message_id": str(message_id)})
+
+
+def enqueue_chat_summary(db: AsyncSession, session_id: UUID) -> None:
+    work_queue.enqueue(db, "chat_summary", {"session_id": str(session_id)})
+
+
+def enqueue_mood_note_sentiment(db: AsyncSession, mood_log_id: UUID) -> None:
+    work_queue.enqueue(db, "mood_note_sentiment", {"mood_log_id": str(mood_log_id)})
+
+
+def enqueue_journal_analytics(db: AsyncSession, entry_id: UUID) -> None:
+    work_queue.enqueue(db, "journal_analytics", {"entry_id": str(entry_id)})
+
+
+def enqueue_content_view(db: AsyncSession, content_id: UUID) -> None:
+    work_queue.enqueue(db, "content_view", {"content_id": str(content_id)})
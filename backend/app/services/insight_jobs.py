@@ -0,0 +1,206 @@
+"""
+Background insight generation.
+
+Pattern detection is CPU-bound (seconds per user with TREND_ENGINE=prophet). Instead
+of running it inside `POST /insights/generate`, the request enqueues an
+`InsightJob` row and gets its id back; `insight_job_runner` then runs the job on
+this process's event loop, with the detection itself in a small process pool.
+
+- At most INSIGHT_JOB_WORKERS jobs run at once per process; the rest wait as
+  "queued".
+- A partial unique index allows one queued/running job per user, so concurrent
+  requests (from any API worker) share a job.
+- Jobs left queued/running past INSIGHT_JOB_TIMEOUT_SECONDS (e.g. the process
+  died) are failed the next time that user enqueues.
+- The API process also sweeps for them every INSIGHT_JOB_TIMEOUT_SECONDS from
+  startup (`start_recovery`): orphaned queued jobs are run here, orphaned running
+  ones are failed. A job only runs if its queued -> running claim succeeds, so a
+  job resubmitted while another process still holds it runs once.
+
+The nightly sweep (scripts/generate_insights_nightly.py) enqueues through the same
+path for every user with mood logs not yet marked `processed_for_insights`.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+from uuid import UUID
+import asyncio
+import functools
+import logging
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.ml.pattern_detector import PatternInsight, detect_patterns
+from app.models.insight import InsightJob
+from app.utils.process_pool import spawn_pool
+
+logger = logging.getLogger(__name__)
+
+JobWork = Callable[[AsyncSession], Awaitable[int]]  # Returns the number of insights created
+
+
+class InsightJobRunner:
+    def __init__(self, workers: int, timeout_seconds: float):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self.session_factory = AsyncSessionLocal
+        self._pool: ProcessPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._recovery: asyncio.Task | None = None
+        self.succeeded = 0
+        self.failed = 0
+        self.recovered = 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = spawn_pool(self.workers)
+        return self._pool
+
+    async def detect(
+        self, mood_logs: list[dict] | dict[str, list], factors: dict[str, list] | None = None
+    ) -> list[PatternInsight]:
+        """Run pattern detection in a worker process (inline when workers=0)."""
+        if self.workers <= 0:
+            return detect_patterns(mood_logs, factors=factors)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor(), functools.partial(detect_patterns, mood_logs, factors=factors)
+        )
+
+    def submit(self, job_id: UUID, work: JobWork) -> None:
+        """Run an already-inserted queued job in the background."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.workers))
+        task = asyncio.create_task(self._run(job_id, work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _set_status(self, db: AsyncSession, job_id: UUID, **values) -> None:
+        await db.execute(update(InsightJob).where(InsightJob.id == job_id).values(**values))
+        await db.commit()
+
+    async def _claim(self, db: AsyncSession, job_id: UUID) -> bool:
+        result = await db.execute(
+            update(InsightJob)
+            .where(InsightJob.id == job_id, InsightJob.status == "queued")
+            .values(status="running", started_at=datetime.now(timezone.utc))
+            .returning(InsightJob.id)
+        )
+        await db.commit()
+        return result.scalar_one_or_none() is not None
+
+    async def _run(self, job_id: UUID, work: JobWork) -> None:
+        async with self._slots, self.session_factory() as db:
+            if not await self._claim(db, job_id):
+                return  # Picked up by another process
+            try:
+                created = await asyncio.wait_for(work(db), self.timeout_seconds)
+            except Exception as e:
+                await db.rollback()
+                self.failed += 1
+                logger.error(f"Insight job {job_id} failed: {e!r}")
+                await self._set_status(
+                    db,
+                    job_id,
+                    status="failed",
+                    error=(str(e) or type(e).__name__)[:500],
+                    finished_at=datetime.now(timezone.utc),
+                )
+            else:
+                self.succeeded += 1
+                await self._set_status(
+                    db,
+                    job_id,
+                    status="succeeded",
+                    insights_created=created,
+                    finished_at=datetime.now(timezone.utc),
+                )
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self, max_pending: int = 0) -> None:
+        """Wait until at most `max_pending` jobs are still queued or running here."""
+        while len(self._tasks) > max_pending:
+            await asyncio.wait(set(self._tasks), return_when=asyncio.FIRST_COMPLETED)
+
+    def start(self) -> None:
+        """Start the detection workers ahead of the first job."""
+        if self.workers > 0:
+            self._executor()
+
+    async def recover(self, work_for: Callable[[UUID], JobWork]) -> int:
+        """
+        Take over jobs orphaned by a stopped process: resubmit queued ones here
+        with `work_for(user_id)` and fail running ones, which were cut off mid-run.
+        Returns the number resubmitted.
+        """
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=self.timeout_seconds)
+        async with self.session_factory() as db:
+            # A live process fails its own jobs at the timeout, so these are orphans
+            await db.execute(
+                update(InsightJob)
+                .where(InsightJob.status == "running", InsightJob.started_at < cutoff)
+                .values(status="failed", error="Interrupted", finished_at=now)
+            )
+            result = await db.execute(
+                select(InsightJob.id, InsightJob.user_id).where(
+                    InsightJob.status == "queued", InsightJob.created_at < cutoff
+                )
+            )
+            orphans = result.all()
+            await db.commit()
+
+        for job_id, user_id in orphans:
+            self.submit(job_id, work_for(user_id))
+        self.recovered += len(orphans)
+        return len(orphans)
+
+    async def _recover_loop(self, work_for: Callable[[UUID], JobWork]) -> None:
+        while True:
+            try:
+                recovered = await self.recover(work_for)
+                if recovered:
+                    logger.info(f"Resubmitted {recovered} orphaned insight jobs")
+            except Exception as e:
+                logger.error(f"Insight job recovery failed: {e!r}")
+            await asyncio.sleep(self.timeout_seconds)
+
+    def start_recovery(self, work_for: Callable[[UUID], JobWork]) -> None:
+        """Sweep for orphaned jobs now and every INSIGHT_JOB_TIMEOUT_SECONDS."""
+        if self._recovery is None or self._recovery.done():
+            self._recovery = asyncio.create_task(self._recover_loop(work_for))
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "recovered": self.recovered,
+        }
+
+    async def shutdown(self) -> None:
+        # Unfinished jobs stay queued/running in the table for the next recovery sweep
+        if self._recovery is not None:
+            self._recovery.cancel()
+            await asyncio.gather(self._recovery, return_exceptions=True)
+            self._recovery = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+insight_job_runner = InsightJobRunner(
+    workers=settings.insight_job_workers,
+    timeout_seconds=settings.insight_job_timeout_seconds,
+)
@@ -1,15 +1,21 @@
 from datetime import datetime, timezone, timedelta
-from uuid import UUID
+from uuid import UUID, uuid4
 import math
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.models.insight import UserInsight
-from app.models.mood import MoodLog
+from app.models.insight import InsightJob, UserInsight
+from app.models.mood import MoodFactor, MoodLog
 from app.models.user import User
 from app.schemas.insight import InsightResponse, InsightFeedback, PaginatedInsights
-from app.ml.pattern_detector import pattern_detector, PatternInsight
+from app.ml.pattern_detector import PatternInsight
+from app.services.insight_jobs import JobWork, insight_job_runner
 from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.pagination import SortKey, paginate
+from app.utils.principal import UserPrincipal
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
 
 
 class InsightService:
@@ -17,68 +23,92 @@ class InsightService:
         self.db = db
         self.user = current_user
 
-    async def generate_insights(self) -> list[UserInsight]:
-        """Generate new insights from user's mood data."""
-        # Get mood logs from last 90 days
-        cutoff = datetime.now(timezone.utc) - timedelta(days=90)
+    @staticmethod
+    def job_work(user_id: UUID) -> JobWork:
+        """
+        The runner's work for one generation job. Takes the id, not the caller's
+        user object, which may belong to a request session that is closed by then.
+        """
+        async def work(db: AsyncSession) -> int:
+            # Generation only reads the user's id
+            return await InsightService(db, UserPrincipal(id=user_id)).generate_insights_count()
 
-        result = await self.db.execute(
-            select(MoodLog)
+        return work
+
+    async def enqueue_generation(self, trigger: str = "request") -> InsightJob:
+        """
+        Queue an insight-generation job for the user, or return the one already
+        queued/running (concurrent requests share a job).
+        """
+        now = datetime.now(timezone.utc)
+        active = InsightJob.status.in_(ACTIVE_JOB_STATUSES)
+
+        # Jobs orphaned by a crashed or restarted worker would block the user forever
+        await self.db.execute(
+            update(InsightJob)
             .where(
-                MoodLog.user_id == self.user.id,
-                MoodLog.logged_at >= cutoff,
+                InsightJob.user_id == self.user.id,
+                active,
+                InsightJob.created_at < now - timedelta(seconds=insight_job_runner.timeout_seconds),
             )
-            .order_by(MoodLog.logged_at.desc())
+            .values(status="failed", error="Timed out", finished_at=now)
         )
-        logs = result.scalars().all()
 
-        if len(logs) < 14:
-            return []
+        result = await self.db.execute(
+            pg_insert(InsightJob)
+            .values(id=uuid4(), user_id=self.user.id, status="queued", trigger=trigger)
+            .on_conflict_do_nothing(
+                index_elements=[InsightJob.user_id],
+                index_where=text("status IN ('queued', 'running')"),
+            )
+            .returning(InsightJob.id)
+        )
+        job_id = result.scalar_one_or_none()
+        await self.db.commit()
 
-        # Convert to dicts for pattern detector
-        log_dicts = []
-        for log in logs:
-            factors = []
-            if log.factors:
-                 # Depending on how factors are stored (relationship or jsonb). 
-                 # Based on models provided in previous contexts, MoodLog usually has a relationship to MoodFactor 
-                 # OR it might be a JSONB column in some simplified versions. 
-                 # The AGENT_2 prompt implies MoodFactor is a model.
-                 # Let's assume it is a relationship and we need to serialize it.
-                 # If `log.factors` is a list of objects:
-                 try: 
-                    for f in log.factors:
-                        factors.append({
-                            "factor_type": f.factor_type,
-                            "factor_value": f.factor_value,
-                            "impact_score": f.impact_score,
-                        })
-                 except TypeError:
-                     # Fallback if it is not iterable or handled differently
-                     pass
-
-            log_dicts.append({
-                "logged_at": log.logged_at,
-                "mood_score": log.mood_score,
-                # "time_of_day": log.time_of_day, # Assuming this field exists or we derive it
-                # "day_of_week": log.logged_at.weekday(),
-                "factors": factors
-            })
-            
-            # If time_of_day is not on model, derive it:
-            if not hasattr(log, 'time_of_day'):
-                hour = log.logged_at.hour
-                if 5 <= hour < 12: col = "Morning"
-                elif 12 <= hour < 17: col = "Afternoon"
-                elif 17 <= hour < 21: col = "Evening"
-                else: col = "Night"
-                log_dicts[-1]["time_of_day"] = col
-            else:
-                log_dicts[-1]["time_of_day"] = log.time_of_day
+        if job_id is not None:
+            insight_job_runner.submit(job_id, self.job_work(self.user.id))
+            return await self.get_job(job_id)
+
+        # Lost the race to another request: report the user's latest job instead
+        result = await self.db.execute(
+            select(InsightJob)
+            .where(InsightJob.user_id == self.user.id)
+            .order_by(InsightJob.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one()
+
+    async def get_job(self, job_id: UUID) -> InsightJob:
+        result = await self.db.execute(
+            select(InsightJob).where(InsightJob.id == job_id, InsightJob.user_id == self.user.id)
+        )
+        job = result.scalar_one_or_none()
+        if not job:
+            raise NotFoundException("Insight job not found")
+        return job
+
+    async def generate_insights_count(self) -> int:
+        return len(await self.generate_insights())
+
+    async def generate_insights(self) -> list[UserInsight]:
+        """
+        Generate new insights from user's mood data, and mark the logs seen so far
+        as processed. Detection runs in the insight worker pool.
+        """
+        started = datetime.now(timezone.utc)
+        # Get mood logs from last 90 days
+        cutoff = started - timedelta(days=90)
+
+        logs, factors = await self._load_mood_columns(cutoff)
 
+        if len(logs["mood_score"]) < 14:
+            await self._mark_processed(started)
+            await self.db.commit()
+            return []
 
         # Run detector
-        raw_insights = await pattern_detector.analyze_mood_patterns(log_dicts)
+        raw_insights = await insight_job_runner.detect(logs, factors)
         
         saved_insights = []
         for ri in raw_insights:
@@ -99,36 +129,84 @@ class InsightService:
             self.db.add(insight)
             saved_insights.append(insight)
         
-        if saved_insights:
-            await self.db.commit()
-            
+        await self._mark_processed(started)
+        await self.db.commit()
+
         return saved_insights
 
-    async def list_insights(self, page: int = 1, per_page: int = 20) -> PaginatedInsights:
+    async def _load_mood_columns(self, since: datetime) -> tuple[dict[str, list], dict[str, list]]:
+        """
+        One query for everything pattern detection reads since `since`, as columns
+        rather than ORM objects: per log (logged_at, mood_score, time_of_day), and
+        per factor (mood_score, factor_type, impact_score) from the aggregated factors.
+        """
+        has_factor = MoodFactor.id.is_not(None)
+        result = await self.db.execute(
+            select(
+                MoodLog.logged_at,
+                MoodLog.mood_score,
+                MoodLog.time_of_day,
+                func.array_agg(MoodFactor.factor_type).filter(has_factor),
+                func.array_agg(MoodFactor.impact_score).filter(has_factor),
+            )
+            .outerjoin(MoodFactor, MoodFactor.mood_log_id == MoodLog.id)
+            .where(MoodLog.user_id == self.user.id, MoodLog.logged_at >= since)
+            .group_by(MoodLog.id)
+            .order_by(MoodLog.logged_at.desc())
+        )
+
+        logs = {"logged_at": [], "mood_score": [], "time_of_day": []}
+        factors = {"mood_score": [], "factor_type": [], "impact_score": []}
+        for logged_at, mood_score, time_of_day, factor_types, impact_scores in result.all():
+            logs["logged_at"].append(logged_at)
+            logs["mood_score"].append(mood_score)
+            logs["time_of_day"].append(time_of_day)
+            if factor_types:
+                factors["mood_score"].extend([mood_score] * len(factor_types))
+                factors["factor_type"].extend(factor_types)
+                factors["impact_score"].extend(impact_scores)
+        return logs, factors
+
+    async def _mark_processed(self, before: datetime) -> None:
+        """Flag logs created before this run, so the nightly sweep skips the user."""
+        await self.db.execute(
+            update(MoodLog)
+            .where(
+                MoodLog.user_id == self.user.id,
+                MoodLog.processed_for_insights.is_not(True),
+                MoodLog.created_at <= before,
+            )
+            .values(processed_for_insights=True)
+        )
+
+    async def list_insights(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        cursor: str | None = None,
+        include_total: bool | None = None,
+    ) -> PaginatedInsights:
         query = select(UserInsight).where(
             UserInsight.user_id == self.user.id,
             UserInsight.dismissed_at.is_(None),
             (UserInsight.valid_until.is_(None) | (UserInsight.valid_until > datetime.now(timezone.utc)))
-        ).order_by(UserInsight.created_at.desc())
+        )
 
-        # Count
-        count_query = select(func.count(UserInsight.id)).where(
-             UserInsight.user_id == self.user.id,
-             UserInsight.dismissed_at.is_(None),
-             (UserInsight.valid_until.is_(None) | (UserInsight.valid_until > datetime.now(timezone.utc)))
+        result = await paginate(
+            self.db,
+            query,
+            order=[SortKey(UserInsight.created_at)],
+            id_column=UserInsight.id,
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total,
         )
-        total = (await self.db.execute(count_query)).scalar()
 
-        # Paginate
-        offset = (page - 1) * per_page
-        query = query.offset(offset).limit(per_page)
-        
-        result = await self.db.execute(query)
-        insights = result.scalars().all()
-        
         return PaginatedInsights(
-            items=[InsightResponse.model_validate(i) for i in insights],
-            total=total,
+            items=[InsightResponse.model_validate(i) for i in result.items],
+            total=result.total,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            next_cursor=result.next_cursor,
         )
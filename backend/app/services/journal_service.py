@@ -1,8 +1,7 @@
 from datetime import datetime, timezone
 from uuid import UUID
-import math
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from app.models.journal import JournalEntry
 from app.models.user import User
 from app.schemas.journal import (
@@ -12,8 +11,10 @@ from app.schemas.journal import (
     JournalEntryDetail,
     PaginatedJournalEntries,
 )
+from app.services.deferred_handlers import enqueue_journal_analytics
 from app.utils.encryption import encrypt_content, decrypt_content, hash_content
 from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.pagination import SortKey, paginate
 
 
 class JournalService:
@@ -38,6 +39,8 @@ class JournalService:
         )
 
         self.db.add(entry)
+        await self.db.flush()
+        enqueue_journal_analytics(self.db, entry.id)
         await self.db.commit()
         await self.db.refresh(entry)
         return entry
@@ -76,8 +79,10 @@ class JournalService:
         entry_type: str | None = None,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        cursor: str | None = None,
+        include_total: bool | None = None,
     ) -> PaginatedJournalEntries:
-        query = select(JournalEntry).where(JournalEntry.user_id == self.user.id).order_by(JournalEntry.created_at.desc())
+        query = select(JournalEntry).where(JournalEntry.user_id == self.user.id)
 
         if entry_type:
             query = query.where(JournalEntry.entry_type == entry_type)
@@ -86,31 +91,24 @@ class JournalService:
         if end_date:
             query = query.where(JournalEntry.created_at <= end_date)
 
-        # Count
-        count_query = select(func.count(JournalEntry.id)).where(JournalEntry.user_id == self.user.id)
-        if entry_type:
-            count_query = count_query.where(JournalEntry.entry_type == entry_type)
-        if start_date:
-            count_query = count_query.where(JournalEntry.created_at >= start_date)
-        if end_date:
-            count_query = count_query.where(JournalEntry.created_at <= end_date)
-
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
-
-        # Paginate
-        offset = (page - 1) * per_page
-        query = query.offset(offset).limit(per_page)
-
-        result = await self.db.execute(query)
-        entries = result.scalars().all()
+        result = await paginate(
+            self.db,
+            query,
+            order=[SortKey(JournalEntry.created_at)],
+            id_column=JournalEntry.id,
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total,
+        )
 
         return PaginatedJournalEntries(
-            items=[JournalEntryResponse.model_validate(entry) for entry in entries],
-            total=total,
+            items=[JournalEntryResponse.model_validate(entry) for entry in result.items],
+            total=result.total,
             page=page,
             per_page=per_page,
-            pages=math.ceil(total / per_page) if total > 0 else 1,
+            pages=result.pages,
+            next_cursor=result.next_cursor,
         )
 
     async def update_entry(self, entry_id: UUID, data: JournalEntryUpdate) -> JournalEntry:
@@ -130,6 +128,7 @@ class JournalService:
             entry.content_iv = iv
             entry.content_hash = hash_content(data.content)
             entry.word_count = len(data.content.split())
+            enqueue_journal_analytics(self.db, entry.id)
 
         await self.db.commit()
         await self.db.refresh(entry)
@@ -1,11 +1,12 @@
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta, time
 from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, cast, delete, literal, Integer
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
-import math
 
-from app.models.mood import MoodLog, MoodFactor
+from app.models.mood import MoodLog, MoodFactor, MoodDailyRollup
 from app.models.user import User
 from app.schemas.mood import (
     MoodLogCreate,
@@ -16,7 +17,31 @@ from app.schemas.mood import (
     MoodTrendsResponse,
     MoodTrendPoint,
 )
+from app.services.deferred_handlers import enqueue_mood_note_sentiment
 from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.pagination import SortKey, paginate
+
+MAX_STREAK_DAYS = 365  # Max 1 year lookback
+PERIOD_DAYS = {"7d": 7, "30d": 30, "90d": 90}
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def _rollup_aggregates() -> dict:
+    """MoodDailyRollup aggregate columns over a group of MoodLog rows."""
+    return {
+        "log_count": func.count(MoodLog.id),
+        "mood_sum": func.sum(MoodLog.mood_score),
+        "mood_min": func.min(MoodLog.mood_score),
+        "mood_max": func.max(MoodLog.mood_score),
+        "energy_count": func.count(MoodLog.energy_level),
+        "energy_sum": func.coalesce(func.sum(MoodLog.energy_level), 0),
+        "energy_min": func.min(MoodLog.energy_level),
+        "energy_max": func.max(MoodLog.energy_level),
+        "anxiety_count": func.count(MoodLog.anxiety_level),
+        "anxiety_sum": func.coalesce(func.sum(MoodLog.anxiety_level), 0),
+        "anxiety_min": func.min(MoodLog.anxiety_level),
+        "anxiety_max": func.max(MoodLog.anxiety_level),
+    }
 
 
 class MoodService:
@@ -61,6 +86,10 @@ class MoodService:
                 log.factors.append(factor)
 
         self.db.add(log)
+        await self.db.flush()
+        await self._refresh_rollup(self._local_date(logged_at))
+        if log.note:
+            enqueue_mood_note_sentiment(self.db, log.id)
         await self.db.commit()
         await self.db.refresh(log)
         return log
@@ -86,12 +115,13 @@ class MoodService:
         per_page: int = 20,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        cursor: str | None = None,
+        include_total: bool | None = None,
     ) -> PaginatedMoodLogs:
         query = (
             select(MoodLog)
             .options(selectinload(MoodLog.factors))
             .where(MoodLog.user_id == self.user.id)
-            .order_by(MoodLog.logged_at.desc())
         )
 
         if start_date:
@@ -99,29 +129,24 @@ class MoodService:
         if end_date:
             query = query.where(MoodLog.logged_at <= end_date)
 
-        # Count total
-        count_query = select(func.count(MoodLog.id)).where(MoodLog.user_id == self.user.id)
-        if start_date:
-            count_query = count_query.where(MoodLog.logged_at >= start_date)
-        if end_date:
-            count_query = count_query.where(MoodLog.logged_at <= end_date)
-
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar()
-
-        # Paginate
-        offset = (page - 1) * per_page
-        query = query.offset(offset).limit(per_page)
-
-        result = await self.db.execute(query)
-        logs = result.scalars().all()
+        result = await paginate(
+            self.db,
+            query,
+            order=[SortKey(MoodLog.logged_at)],
+            id_column=MoodLog.id,
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total,
+        )
 
         return PaginatedMoodLogs(
-            items=[MoodLogResponse.model_validate(log) for log in logs],
-            total=total,
+            items=[MoodLogResponse.model_validate(log) for log in result.items],
+            total=result.total,
             page=page,
             per_page=per_page,
-            pages=math.ceil(total / per_page) if total > 0 else 1,
+            pages=result.pages,
+            next_cursor=result.next_cursor,
         )
 
     async def update_log(self, log_id: UUID, data: MoodLogUpdate) -> MoodLog:
@@ -131,29 +156,142 @@ class MoodService:
         for field, value in update_data.items():
             setattr(log, field, value)
 
+        if update_data.keys() & {"mood_score", "energy_level", "anxiety_level"}:
+            await self.db.flush()
+            await self._refresh_rollup(self._local_date(log.logged_at))
+
+        if "note" in update_data:
+            log.note_sentiment = None
+            if log.note:
+                enqueue_mood_note_sentiment(self.db, log.id)
+
         await self.db.commit()
         await self.db.refresh(log)
         return log
 
     async def delete_log(self, log_id: UUID) -> None:
         log = await self.get_log(log_id)
+        day = self._local_date(log.logged_at)
         await self.db.delete(log)
+        await self.db.flush()
+        await self._refresh_rollup(day)
         await self.db.commit()
 
-    async def get_stats(self, period: str = "30d") -> MoodStatsResponse:
-        days_map = {"7d": 7, "30d": 30, "90d": 90}
-        days = days_map.get(period, 30)
+    def _local_date(self, dt: datetime) -> date:
+        return dt.astimezone(ZoneInfo(self._local_timezone())).date()
 
-        start_date = datetime.now(timezone.utc) - timedelta(days=days)
+    async def _lock_rollups(self) -> None:
+        """
+        Serialize rollup recomputes for this user until the transaction ends.
 
-        query = select(MoodLog).where(
-            MoodLog.user_id == self.user.id,
-            MoodLog.logged_at >= start_date,
+        Each recompute reads the day's logs in its own READ COMMITTED snapshot, so
+        without this two concurrent writes could each miss the other's log, and the
+        later commit would leave the row wrong. Once the lock is held, the next
+        statement's snapshot includes every log committed by earlier holders.
+        """
+        await self.db.execute(
+            select(func.pg_advisory_xact_lock(func.hashtextextended(f"mood_rollup:{self.user.id}", 0)))
         )
-        result = await self.db.execute(query)
-        logs = result.scalars().all()
 
-        if not logs:
+    async def _refresh_rollup(self, day: date) -> None:
+        """
+        Recompute the user's rollup row for one local day from that day's logs.
+
+        Runs inside the caller's transaction, after the log change is flushed.
+        Recomputing instead of applying deltas keeps min/max correct on update and
+        delete, and only reads the handful of logs from a single day.
+        """
+        await self._lock_rollups()
+
+        tz = ZoneInfo(self._local_timezone())
+        day_start = datetime.combine(day, time.min, tzinfo=tz)
+        day_end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+
+        aggregates = _rollup_aggregates()
+        day_logs = (
+            select(
+                func.gen_random_uuid(),
+                literal(self.user.id, MoodDailyRollup.user_id.type),
+                literal(day, MoodDailyRollup.local_date.type),
+                literal(day.weekday(), MoodDailyRollup.day_of_week.type),
+                *aggregates.values(),
+            )
+            .where(
+                MoodLog.user_id == self.user.id,
+                MoodLog.logged_at >= day_start,
+                MoodLog.logged_at < day_end,
+            )
+            .having(func.count(MoodLog.id) > 0)
+        )
+
+        stmt = insert(MoodDailyRollup).from_select(
+            ["id", "user_id", "local_date", "day_of_week", *aggregates], day_logs
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_mood_rollup_user_date",
+            set_={
+                **{name: stmt.excluded[name] for name in aggregates},
+                "updated_at": func.now(),
+            },
+        )
+        result = await self.db.execute(stmt)
+
+        if result.rowcount == 0:
+            # No logs left on that day
+            await self.db.execute(
+                delete(MoodDailyRollup).where(
+                    MoodDailyRollup.user_id == self.user.id,
+                    MoodDailyRollup.local_date == day,
+                )
+            )
+
+    async def rebuild_rollups(self) -> None:
+        """
+        Recompute all of the user's rollup rows from their logs.
+
+        Rollups are keyed by local date in `User.timezone`, so they are stale once
+        the timezone changes: whatever updates it must call this in the same
+        transaction. Runs inside the caller's transaction; the caller commits.
+        """
+        await self._lock_rollups()
+        await self.db.execute(delete(MoodDailyRollup).where(MoodDailyRollup.user_id == self.user.id))
+
+        aggregates = _rollup_aggregates()
+        local_day = func.date(func.timezone(self._local_timezone(), MoodLog.logged_at))
+        await self.db.execute(
+            insert(MoodDailyRollup).from_select(
+                ["id", "user_id", "local_date", "day_of_week", *aggregates],
+                select(
+                    func.gen_random_uuid(),
+                    literal(self.user.id, MoodDailyRollup.user_id.type),
+                    local_day,
+                    # ISO day of week is 1 (Monday) - 7
+                    cast(func.extract("isodow", local_day), Integer) - 1,
+                    *aggregates.values(),
+                )
+                .where(MoodLog.user_id == self.user.id)
+                .group_by(local_day),
+            )
+        )
+
+    async def _get_rollups(self, days: int) -> list[MoodDailyRollup]:
+        """Rollup rows for the last `days` local days (including today), oldest first."""
+        today = datetime.now(ZoneInfo(self._local_timezone())).date()
+        result = await self.db.execute(
+            select(MoodDailyRollup)
+            .where(
+                MoodDailyRollup.user_id == self.user.id,
+                MoodDailyRollup.local_date > today - timedelta(days=days),
+            )
+            .order_by(MoodDailyRollup.local_date)
+        )
+        return list(result.scalars().all())
+
+    async def get_stats(self, period: str = "30d") -> MoodStatsResponse:
+        days = PERIOD_DAYS.get(period, 30)
+        rollups = await self._get_rollups(days)
+
+        if not rollups:
             return MoodStatsResponse(
                 period=period,
                 avg_mood=0,
@@ -167,34 +305,30 @@ class MoodService:
             )
 
         # Calculate averages
-        avg_mood = sum(log.mood_score for log in logs) / len(logs)
-        energy_values = [log.energy_level for log in logs if log.energy_level]
-        anxiety_values = [log.anxiety_level for log in logs if log.anxiety_level]
-
-        avg_energy = sum(energy_values) / len(energy_values) if energy_values else None
-        avg_anxiety = sum(anxiety_values) / len(anxiety_values) if anxiety_values else None
-
-        # Day analysis
-        day_scores: dict[int, list[int]] = {}
-        for log in logs:
-            day = log.day_of_week
-            if day is not None:
-                day_scores.setdefault(day, []).append(log.mood_score)
-
-        day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        best_day = None
-        worst_day = None
-
-        if day_scores:
-            day_avgs = {d: sum(s) / len(s) for d, s in day_scores.items()}
-            best_day = day_names[max(day_avgs, key=day_avgs.get)]
-            worst_day = day_names[min(day_avgs, key=day_avgs.get)]
-
-        # Trend calculation (simple: compare first half to second half)
-        mid = len(logs) // 2
+        total_logs = sum(r.log_count for r in rollups)
+        avg_mood = sum(r.mood_sum for r in rollups) / total_logs
+        energy_count = sum(r.energy_count for r in rollups)
+        anxiety_count = sum(r.anxiety_count for r in rollups)
+
+        avg_energy = sum(r.energy_sum for r in rollups) / energy_count if energy_count else None
+        avg_anxiety = sum(r.anxiety_sum for r in rollups) / anxiety_count if anxiety_count else None
+
+        # Day analysis: (mood_sum, log_count) per day of week
+        day_totals: dict[int, tuple[int, int]] = {}
+        for r in rollups:
+            mood_sum, count = day_totals.get(r.day_of_week, (0, 0))
+            day_totals[r.day_of_week] = (mood_sum + r.mood_sum, count + r.log_count)
+
+        day_avgs = {d: mood_sum / count for d, (mood_sum, count) in day_totals.items()}
+        best_day = DAY_NAMES[max(day_avgs, key=day_avgs.get)]
+        worst_day = DAY_NAMES[min(day_avgs, key=day_avgs.get)]
+
+        # Trend calculation (simple: compare older half of the days to the newer half)
+        mid = len(rollups) // 2
         if mid > 0:
-            first_half_avg = sum(log.mood_score for log in logs[mid:]) / len(logs[mid:])
-            second_half_avg = sum(log.mood_score for log in logs[:mid]) / mid
+            older, newer = rollups[:mid], rollups[mid:]
+            first_half_avg = sum(r.mood_sum for r in older) / sum(r.log_count for r in older)
+            second_half_avg = sum(r.mood_sum for r in newer) / sum(r.log_count for r in newer)
             diff = second_half_avg - first_half_avg
             trend = "improving" if diff > 0.5 else "declining" if diff < -0.5 else "stable"
         else:
@@ -211,116 +345,73 @@ class MoodService:
             mood_trend=trend,
             best_day=best_day,
             worst_day=worst_day,
-            total_logs=len(logs),
+            total_logs=total_logs,
             streak_days=streak,
         )
 
+    def _local_timezone(self) -> str:
+        try:
+            ZoneInfo(self.user.timezone)
+            return self.user.timezone
+        except (ZoneInfoNotFoundError, ValueError, TypeError):
+            return "UTC"
+
     async def _calculate_streak(self) -> int:
-        """Calculate consecutive days with mood logs."""
-        today = datetime.now(timezone.utc).date()
-        streak = 0
-
-        for i in range(365):  # Max 1 year lookback
-            check_date = today - timedelta(days=i)
-            # Casting logged_at to date. Depending on DB dialect this might need ajustment.
-            # Postgres: func.date(...) works
-            result = await self.db.execute(
-                select(func.count(MoodLog.id)).where(
-                    MoodLog.user_id == self.user.id,
-                    func.date(MoodLog.logged_at) == check_date,
-                )
-            )
-            count = result.scalar()
-            if count > 0:
-                streak += 1
-            else:
-                # If today has no logs, don't break immediately if counting from yesterday? 
-                # Usually streak includes today if logged, or continues from yesterday.
-                # If check_date is today and count is 0, streak is still potentially valid from yesterday?
-                # But simple logic: if day i (today) is 0, streak is 0? Or do we allow missing today?
-                # Let's assume strict streak for now.
-                if i == 0 and count == 0:
-                    continue # Try yesterday
-                else: 
-                     # If previous day (i>0) is missing, streak breaks
-                    if i > 0:
-                         break
-                    # If i==0 and we continued, effectively we are just skipping today.
-                    # But wait, if we skip today, streak starts from yesterday. 
-                    
-        # Retrying logic to be safer:
-        # Check today. If yes, streak starts at 1. Then check yesterday.
-        # If no, check yesterday. If yes, streak starts at 1.
-        # This implementation above is a bit ambiguous. Let's stick to the one provided or make it robust.
-        # Re-reading doc: "Consecutive days with logs".
-        pass 
-        # Actually, let's just stick to the doc implementation or simple correct one.
-        # Creating a more robust loop.
-        
-        current_date_check = today
-        current_streak = 0
-        
-        # Check today first
-        result = await self.db.execute(
-            select(func.count(MoodLog.id)).where(
-                 MoodLog.user_id == self.user.id,
-                 func.date(MoodLog.logged_at) == current_date_check
+        """
+        Calculate consecutive days with mood logs, in the user's local time.
+
+        A streak counts back from today, or from yesterday if nothing has been
+        logged yet today. Computed in a single gaps-and-islands query: subtracting
+        the row number from each distinct log date gives the same value for every
+        date in a run of consecutive days.
+        """
+        tz = self._local_timezone()
+        today = datetime.now(ZoneInfo(tz)).date()
+        lookback = today - timedelta(days=MAX_STREAK_DAYS)
+
+        local_day = func.date(func.timezone(tz, MoodLog.logged_at))
+        days = (
+            select(local_day.label("day"))
+            .where(
+                MoodLog.user_id == self.user.id,
+                MoodLog.logged_at >= datetime.combine(lookback, time.min, tzinfo=ZoneInfo(tz)),
             )
+            .distinct()
+            .subquery()
         )
-        if result.scalar() > 0:
-             current_streak += 1
-        
-        # Check previous days
-        for i in range(1, 365):
-             prev_date = today - timedelta(days=i)
-             result = await self.db.execute(
-                select(func.count(MoodLog.id)).where(
-                     MoodLog.user_id == self.user.id,
-                     func.date(MoodLog.logged_at) == prev_date
-                )
-             )
-             if result.scalar() > 0:
-                 current_streak += 1
-             else:
-                 # If today was missing, we can still have a streak from yesterday?
-                 # Example: logged yesterday (1), today not yet (0). Streak is 1.
-                 # If current_streak is 0 (today empty), and yesterday is empty, streak 0.
-                 # If current_streak is 0 (today empty), and yesterday has log, streak 1.
-                 if i == 1 and current_streak == 0:
-                      # If today missed, but yesterday hit, we allow it? 
-                      # Usually "current streak" implies active. If I didn't log today, my streak might be at risk but valid.
-                      pass 
-                 else:
-                      break
-        return current_streak
+        islands = select(
+            days.c.day,
+            (days.c.day - cast(func.row_number().over(order_by=days.c.day), Integer)).label(
+                "island"
+            ),
+        ).subquery()
 
-
-    async def get_trends(self, period: str = "30d") -> MoodTrendsResponse:
-        days_map = {"7d": 7, "30d": 30, "90d": 90}
-        days = days_map.get(period, 30)
-
-        start_date = datetime.now(timezone.utc) - timedelta(days=days)
-
-        query = (
+        result = await self.db.execute(
             select(
-                func.date(MoodLog.logged_at).label("date"),
-                func.avg(MoodLog.mood_score).label("avg_mood"),
-                func.count(MoodLog.id).label("log_count"),
-            )
-            .where(
-                MoodLog.user_id == self.user.id,
-                MoodLog.logged_at >= start_date,
+                func.count().label("length"),
+                func.max(islands.c.day).label("last_day"),
             )
-            .group_by(func.date(MoodLog.logged_at))
-            .order_by(func.date(MoodLog.logged_at))
+            .group_by(islands.c.island)
+            .order_by(func.max(islands.c.day).desc())
+            .limit(1)
         )
+        latest = result.one_or_none()
 
-        result = await self.db.execute(query)
-        rows = result.all()
+        if latest is None or latest.last_day < today - timedelta(days=1):
+            return 0
+        return min(latest.length, MAX_STREAK_DAYS)
+
+    async def get_trends(self, period: str = "30d") -> MoodTrendsResponse:
+        days = PERIOD_DAYS.get(period, 30)
+        rollups = await self._get_rollups(days)
 
         data_points = [
-            MoodTrendPoint(date=row.date, avg_mood=round(row.avg_mood, 2), log_count=row.log_count)
-            for row in rows
+            MoodTrendPoint(
+                date=r.local_date,
+                avg_mood=round(r.mood_sum / r.log_count, 2),
+                log_count=r.log_count,
+            )
+            for r in rollups
         ]
 
         # Calculate overall trend (simple linear regression slope)
@@ -9,6 +9,7 @@ from app.models.user import User
 from app.schemas.recommendation import RecommendationResponse, RecommendationFeedback, PaginatedRecommendations
 from app.services.content_service import ContentService
 from app.utils.exceptions import NotFoundException, ForbiddenException
+from app.utils.pagination import SortKey, paginate
 
 
 class RecommendationService:
@@ -67,30 +68,34 @@ class RecommendationService:
             
         return existing + new_recs
 
-    async def list_recommendations(self, page: int = 1, per_page: int = 20) -> PaginatedRecommendations:
+    async def list_recommendations(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        cursor: str | None = None,
+        include_total: bool | None = None,
+    ) -> PaginatedRecommendations:
         query = select(Recommendation).where(
             Recommendation.user_id == self.user.id,
             (Recommendation.expires_at.is_(None) | (Recommendation.expires_at > datetime.now(timezone.utc))),
             Recommendation.completed_at.is_(None)
-        ).order_by(Recommendation.priority.desc(), Recommendation.created_at.desc())
+        )
 
-        total = (await self.db.execute(
-            select(func.count(Recommendation.id)).where(
-                 Recommendation.user_id == self.user.id,
-                (Recommendation.expires_at.is_(None) | (Recommendation.expires_at > datetime.now(timezone.utc))),
-                Recommendation.completed_at.is_(None)
-            )
-        )).scalar()
+        result = await paginate(
+            self.db,
+            query,
+            order=[SortKey(Recommendation.priority), SortKey(Recommendation.created_at)],
+            id_column=Recommendation.id,
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+            include_total=include_total,
+        )
 
-        offset = (page - 1) * per_page
-        query = query.offset(offset).limit(per_page)
-        
-        result = await self.db.execute(query)
-        recs = result.scalars().all()
-        
         return PaginatedRecommendations(
-            items=[RecommendationResponse.model_validate(r) for r in recs],
-            total=total,
+            items=[RecommendationResponse.model_validate(r) for r in result.items],
+            total=result.total,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            next_cursor=result.next_cursor,
         )
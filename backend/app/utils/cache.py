@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from typing import Any, Protocol
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Bounded in-process LRU cache with optional per-entry TTL and hit/miss counters.
+
+    Thread-safe, so it can be shared between the event loop and worker threads.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def two_tier_stats(local: LRUCache, shared_hits: int) -> dict[str, Any]:
+    """
+    Stats for an LRUCache in front of a SharedCache. Every lookup goes to the local
+    tier first, so its misses are the shared tier's lookups.
+    """
+    stats = local.stats()
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        **stats,
+        "shared_hits": shared_hits,
+        "overall_hit_rate": round((stats["hits"] + shared_hits) / lookups, 4) if lookups else 0.0,
+    }
+
+
+class SharedCache(Protocol):
+    """Second cache tier shared between workers/pods. Failures must behave like misses."""
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]: ...
+
+    async def set_many(self, items: dict[str, bytes], ttl_seconds: int | None = None) -> None: ...
+
+
+class RedisCache:
+    """SharedCache backed by Redis (`settings.redis_url`)."""
+
+    def __init__(self, url: str, prefix: str):
+        self.url = url
+        self.prefix = prefix
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self.url)
+        return self._client
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        if not keys:
+            return []
+        try:
+            return await self.client.mget([self.prefix + key for key in keys])
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return [None] * len(keys)
+
+    async def set_many(self, items: dict[str, bytes], ttl_seconds: int | None = None) -> None:
+        if not items:
+            return
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(self.prefix + key, value, ex=ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Shared cache write failed: {e}")
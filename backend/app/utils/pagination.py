@@ -0,0 +1,167 @@
+"""
+Shared OFFSET and keyset (cursor) pagination for the service layer.
+
+Every page carries an opaque `next_cursor` encoding the last row's sort key plus
+its id. Following it switches to keyset mode: the next page is a range scan from
+that position instead of an OFFSET, so deep pages cost the same as the first.
+Totals are optional in cursor mode, since a COUNT(*) over the whole filtered set
+is what dominates shallow pages.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, Sequence, TypeVar
+from uuid import UUID
+import base64
+import binascii
+import json
+import math
+
+from sqlalchemy import Select, and_, false, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.utils.exceptions import BadRequestException
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """
+    One ORDER BY column. Uses PostgreSQL's default null placement
+    (NULLS FIRST for DESC, NULLS LAST for ASC), so indexes declared with a
+    plain ASC/DESC still match.
+    """
+    column: InstrumentedAttribute
+    descending: bool = True
+
+    def order_by(self):
+        if self.descending:
+            return self.column.desc().nullsfirst()
+        return self.column.asc().nullslast()
+
+    def after(self, value: Any):
+        """Rows strictly after `value` in this key's order."""
+        if value is None:
+            return self.column.is_not(None) if self.descending else false()
+        if self.descending:
+            return self.column < value
+        return or_(self.column > value, self.column.is_(None))
+
+    def equals(self, value: Any):
+        return self.column.is_(None) if value is None else self.column == value
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    total: int | None
+    next_cursor: str | None
+    page: int
+    per_page: int
+
+    @property
+    def pages(self) -> int | None:
+        if self.total is None:
+            return None
+        return math.ceil(self.total / self.per_page) if self.total > 0 else 1
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(key: SortKey, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = key.column.type.python_type
+    # The cursor is client-supplied: only accept the JSON shape _encode_value writes,
+    # so a constructor never sees e.g. an int where it expects a str
+    if python_type in (datetime, UUID):
+        if not isinstance(value, str):
+            raise TypeError(f"expected a string for {key.column.key}")
+    elif not isinstance(value, (str, int, float)):
+        raise TypeError(f"expected a scalar for {key.column.key}")
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(keys: Sequence[SortKey], item: Any) -> str:
+    values = [_encode_value(getattr(item, key.column.key)) for key in keys]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(keys: Sequence[SortKey], cursor: str) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("cursor length mismatch")
+        return [_decode_value(key, value) for key, value in zip(keys, values)]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise BadRequestException("Invalid pagination cursor")
+
+
+def _keyset_predicate(keys: Sequence[SortKey], values: list[Any]):
+    # All descending and no NULL in the cursor: a row-value comparison the planner
+    # can turn into a single index range (NULL rows sort first, so are never after)
+    if all(key.descending for key in keys) and None not in values:
+        return tuple_(*(key.column for key in keys)) < tuple_(*values)
+
+    # General case: (k1 after v1) OR (k1 = v1 AND k2 after v2) OR ...
+    clauses = []
+    for i, key in enumerate(keys):
+        ties = [keys[j].equals(values[j]) for j in range(i)]
+        clauses.append(and_(*ties, key.after(values[i])))
+    return or_(*clauses)
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    order: Sequence[SortKey],
+    id_column: InstrumentedAttribute,
+    page: int = 1,
+    per_page: int = 20,
+    cursor: str | None = None,
+    include_total: bool | None = None,
+) -> Page:
+    """
+    Run `query` (filters only, no ORDER BY/LIMIT) for one page.
+
+    With `cursor`, the page starts after the cursor's row and `page` is ignored;
+    otherwise it is the OFFSET page `page`. `include_total` defaults to True in
+    OFFSET mode and False in cursor mode.
+    """
+    keys = [*order, SortKey(id_column, descending=order[0].descending)]
+    if include_total is None:
+        include_total = cursor is None
+
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(query.order_by(None).subquery())
+        total = (await db.execute(count_query)).scalar()
+
+    page_query = query.order_by(None).order_by(*(key.order_by() for key in keys))
+    if cursor:
+        page_query = page_query.where(_keyset_predicate(keys, decode_cursor(keys, cursor)))
+    else:
+        page_query = page_query.offset((page - 1) * per_page)
+
+    # One extra row tells us whether there is a next page
+    result = await db.execute(page_query.limit(per_page + 1))
+    items = list(result.scalars().all())
+
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor(keys, items[-1])
+
+    return Page(items=items, total=total, next_cursor=next_cursor, page=page, per_page=per_page)
+
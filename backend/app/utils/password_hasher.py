@@ -0,0 +1,99 @@
+"""
+bcrypt hashing off the event loop.
+
+A bcrypt hash or verify is ~250 ms of pure CPU. Run inline, a burst of logins
+stalls every other coroutine on the worker. `password_hasher` runs them in a
+small process pool instead, with bounded admission: once
+PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE operations are pending, new ones
+are shed with a 503 + Retry-After instead of queueing behind a backlog that would
+time out anyway.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+import asyncio
+import math
+
+from app.config import settings
+from app.utils.exceptions import ServiceUnavailableException
+from app.utils.process_pool import spawn_pool
+from app.utils.security import hash_password, verify_and_update_password
+
+BCRYPT_SECONDS = 0.25  # Rough cost of one operation, for Retry-After
+
+
+def _warm_up() -> None:
+    """Runs in each worker so the first real hash doesn't pay for imports."""
+    hash_password("warm-up")
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self.completed = 0
+        self.shed = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = spawn_pool(self.workers)
+        return self._pool
+
+    def start(self) -> None:
+        """Start the workers ahead of the first login."""
+        if self.workers > 0:
+            pool = self._executor()
+            for _ in range(self.workers):
+                pool.submit(_warm_up)
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        if self.workers <= 0:
+            return fn(*args)
+
+        if self._pending >= self.capacity:
+            self.shed += 1
+            retry_after = math.ceil(self._pending / self.workers * BCRYPT_SECONDS)
+            raise ServiceUnavailableException(
+                "Too many sign-in requests, please retry shortly", retry_after=max(1, retry_after)
+            )
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor(), fn, *args)
+            self.completed += 1
+            return result
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        """Return (valid, new_hash); new_hash is set when the stored hash is deprecated."""
+        return await self._run(verify_and_update_password, password, hashed)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self._pending,
+            "capacity": self.capacity,
+            "completed": self.completed,
+            "shed": self.shed,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
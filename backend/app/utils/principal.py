@@ -0,0 +1,144 @@
+"""
+Authenticated-user principal and its in-process cache.
+
+`get_current_principal` (app/api/deps.py) resolves a token to a `UserPrincipal`:
+a small immutable snapshot of the user's row, cached by `(user_id, token iat)` for
+`AUTH_CACHE_TTL_SECONDS`. Repeat requests with the same token skip the users table.
+
+`invalidate_principal(user_id)` drops every cached principal of a user. It runs
+on logout and, through a mapper event, whenever a flush changes a user's
+subscription or deletes the account. The cache is per process, so other workers
+pick up changes when their entries expire (at most one TTL later).
+"""
+from datetime import datetime, timezone
+from uuid import UUID
+import threading
+import time
+
+from sqlalchemy import event, inspect
+
+from app.config import settings
+from app.models.user import User
+from app.utils.cache import LRUCache
+
+
+class UserPrincipal:
+    """The fields of `User` that request handling needs, without an ORM session."""
+
+    __slots__ = (
+        "id",
+        "email",
+        "email_verified",
+        "display_name",
+        "avatar_url",
+        "timezone",
+        "locale",
+        "subscription_tier",
+        "subscription_expires_at",
+        "created_at",
+    )
+
+    # Selected on a cache miss instead of the full row
+    COLUMNS = (
+        User.id,
+        User.email,
+        User.email_verified,
+        User.display_name,
+        User.avatar_url,
+        User.timezone,
+        User.locale,
+        User.subscription_tier,
+        User.subscription_expires_at,
+        User.created_at,
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_row(cls, row) -> "UserPrincipal":
+        return cls(**row._mapping)
+
+    @property
+    def is_premium(self) -> bool:
+        if self.subscription_tier == "free":
+            return False
+        if self.subscription_expires_at and self.subscription_expires_at < datetime.now(timezone.utc):
+            return False
+        return True
+
+    def __repr__(self):
+        return f"<UserPrincipal {self.id}>"
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(max_entries, ttl_seconds=ttl_seconds)
+        # user_id -> monotonic time of the last invalidation; entries cached
+        # before it are stale. Only needs to outlive the entry TTL.
+        self._invalidated: dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(user_id: UUID, iat: int | None) -> str:
+        return f"{user_id}:{iat or 0}"
+
+    def get(self, user_id: UUID, iat: int | None) -> UserPrincipal | None:
+        entry = self._entries.get(self._key(user_id, iat))
+        if entry is None:
+            return None
+
+        loaded_at, principal = entry
+        invalidated_at = self._invalidated.get(user_id)
+        if invalidated_at is not None and loaded_at <= invalidated_at:
+            self._entries.pop(self._key(user_id, iat))
+            return None
+        return principal
+
+    def set(self, user_id: UUID, iat: int | None, principal: UserPrincipal, loaded_at: float) -> None:
+        """`loaded_at` is when the row was read, so a concurrent invalidation still wins."""
+        self._entries.set(self._key(user_id, iat), (loaded_at, principal))
+
+    def invalidate(self, user_id: UUID) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._invalidated[user_id] = now
+            horizon = now - self.ttl_seconds
+            for stale in [uid for uid, at in self._invalidated.items() if at < horizon]:
+                del self._invalidated[stale]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        with self._lock:
+            self._invalidated.clear()
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.auth_cache_size,
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+)
+
+
+def invalidate_principal(user_id: UUID) -> None:
+    principal_cache.invalidate(user_id)
+
+
+# Principal fields plus deleted_at, which decides whether the user resolves at all
+_WATCHED_ATTRS = (*(name for name in UserPrincipal.__slots__ if name != "id"), "deleted_at")
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_user_change(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _WATCHED_ATTRS):
+        invalidate_principal(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_delete(mapper, connection, target: User) -> None:
+    invalidate_principal(target.id)
@@ -0,0 +1,16 @@
+"""
+Process pools for CPU-bound work (bcrypt, pattern detection) off the event loop.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+
+def spawn_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    A pool whose workers are started with spawn, not fork: the API process holds
+    model threads (ONNX/torch sessions, batcher workers) whose locks a forked
+    child would inherit mid-state.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
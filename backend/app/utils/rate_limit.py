@@ -0,0 +1,263 @@
+"""
+Token-bucket rate limiting with per-route request costs.
+
+Every caller (user id from the bearer token, else client IP) has a request-cost
+budget of RATE_LIMIT_BUDGET units, refilled at RATE_LIMIT_BUDGET_PER_MINUTE.
+Each API request spends its route's cost (1 by default; chat turns, insight
+generation and bcrypt-backed auth cost more). Routes in `ROUTE_LIMITS` also get
+their own per-caller bucket. A request goes through only if every bucket it
+touches has room, and then spends from all of them.
+
+Backends:
+- "memory": buckets in this process (single node, tests).
+- "redis":  one Lua script checks and updates all of a request's buckets
+            atomically, using the server clock, so limits hold across workers.
+
+Backend errors fail open: an unavailable limiter must not take the API down.
+"""
+from dataclasses import dataclass
+from typing import Protocol
+import json
+import logging
+import math
+import re
+import time
+
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.utils.cache import LRUCache
+from app.utils.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Bucket:
+    key: str
+    capacity: float
+    refill_per_second: float
+    cost: float
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    cost: int = 1
+    per_minute: float | None = None  # Own bucket for this route, on top of the budget
+
+
+# Keyed by "METHOD /path/template" (paths relative to the API prefix)
+ROUTE_LIMITS: dict[str, RouteLimit] = {
+    "POST /auth/login": RouteLimit(cost=5, per_minute=10),
+    "POST /auth/register": RouteLimit(cost=5, per_minute=5),
+    "POST /chat/sessions/{session_id}/messages": RouteLimit(cost=10, per_minute=30),
+    "POST /chat/sessions/{session_id}/messages/stream": RouteLimit(cost=10, per_minute=30),
+    "POST /insights/generate": RouteLimit(cost=20, per_minute=5),
+}
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class RateLimitBackend(Protocol):
+    async def consume(self, buckets: list[Bucket]) -> Decision: ...
+
+
+class MemoryRateLimitBackend:
+    def __init__(self, max_keys: int = 100_000):
+        # Evicting a bucket only resets it to full, so an LRU bound is safe
+        self._buckets = LRUCache(max_keys)
+
+    async def consume(self, buckets: list[Bucket]) -> Decision:
+        # No awaits in here, so the check-and-update is atomic on the event loop
+        now = time.monotonic()
+        levels = []
+        retry_after = 0.0
+        for bucket in buckets:
+            tokens, updated_at = self._buckets.get(bucket.key) or (bucket.capacity, now)
+            tokens = min(bucket.capacity, tokens + (now - updated_at) * bucket.refill_per_second)
+            if tokens < bucket.cost:
+                retry_after = max(retry_after, (bucket.cost - tokens) / bucket.refill_per_second)
+            levels.append(tokens)
+
+        allowed = retry_after == 0.0
+        for bucket, tokens in zip(buckets, levels):
+            self._buckets.set(bucket.key, (tokens - bucket.cost if allowed else tokens, now))
+
+        remaining = min(t - b.cost if allowed else t for b, t in zip(buckets, levels))
+        return Decision(allowed, remaining, retry_after)
+
+
+# KEYS: bucket keys. ARGV: capacity, refill/s, cost per key.
+# Returns {allowed, remaining, retry_after}; floats as strings (Lua numbers
+# are truncated to integers on the way out).
+TOKEN_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local levels = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 - 2])
+    local rate = tonumber(ARGV[i * 3 - 1])
+    local cost = tonumber(ARGV[i * 3])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    if tokens < cost then
+        retry_after = math.max(retry_after, (cost - tokens) / rate)
+    end
+    levels[i] = tokens
+end
+local allowed = retry_after == 0
+local remaining = nil
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 3 - 2])
+    local rate = tonumber(ARGV[i * 3 - 1])
+    local tokens = levels[i]
+    if allowed then
+        tokens = tokens - tonumber(ARGV[i * 3])
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+    if remaining == nil or tokens < remaining then
+        remaining = tokens
+    end
+end
+return {allowed and 1 or 0, tostring(remaining), tostring(retry_after)}
+"""
+
+
+class RedisRateLimitBackend:
+    def __init__(self, url: str, prefix: str = "rl:"):
+        self.url = url
+        self.prefix = prefix
+        self._client = None
+        self._script = None
+
+    @property
+    def script(self):
+        if self._script is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self.url)
+            self._script = self._client.register_script(TOKEN_BUCKET_LUA)
+        return self._script
+
+    async def consume(self, buckets: list[Bucket]) -> Decision:
+        args = []
+        for bucket in buckets:
+            args += [bucket.capacity, bucket.refill_per_second, bucket.cost]
+        allowed, remaining, retry_after = await self.script(
+            keys=[self.prefix + bucket.key for bucket in buckets], args=args
+        )
+        return Decision(bool(allowed), float(remaining), float(retry_after))
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, route_limits: dict[str, RouteLimit]):
+        self.backend = backend
+        self._routes: list[tuple[str, re.Pattern, str, RouteLimit]] = []
+        for route, limit in route_limits.items():
+            method, path = route.split(" ", 1)
+            regex, _, _ = compile_path(settings.api_v1_prefix + path)
+            self._routes.append((method, regex, route, limit))
+
+    def route_limit(self, method: str, path: str) -> tuple[str, RouteLimit] | None:
+        for route_method, regex, route, limit in self._routes:
+            if route_method == method and regex.match(path):
+                return route, limit
+        return None
+
+    def buckets(self, identity: str, method: str, path: str) -> list[Bucket]:
+        matched = self.route_limit(method, path)
+        route, limit = matched if matched else (None, RouteLimit())
+        cost = settings.rate_limit_route_costs.get(route, limit.cost) if route else limit.cost
+
+        buckets = [
+            Bucket(
+                key=f"budget:{identity}",
+                capacity=settings.rate_limit_budget,
+                refill_per_second=settings.rate_limit_budget_per_minute / 60,
+                cost=cost,
+            )
+        ]
+        if limit.per_minute:
+            buckets.append(
+                Bucket(
+                    key=f"route:{route}:{identity}",
+                    capacity=limit.per_minute,
+                    refill_per_second=limit.per_minute / 60,
+                    cost=1,
+                )
+            )
+        return buckets
+
+    async def check(self, identity: str, method: str, path: str) -> Decision:
+        try:
+            return await self.backend.consume(self.buckets(identity, method, path))
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return Decision(True, 0, 0)
+
+
+async def _identity(scope: Scope) -> str:
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            auth = value.decode("latin-1")
+            if auth.startswith("Bearer "):
+                payload = await decode_token(auth[7:])
+                if payload and payload.get("type") == "access":
+                    return f"user:{payload['sub']}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware, so streamed (SSE) responses pass through untouched."""
+
+    def __init__(self, app: ASGIApp, limiter: "RateLimiter | None" = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            not settings.rate_limit_enabled
+            or scope["type"] != "http"
+            or not scope["path"].startswith(settings.api_v1_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        decision = await self.limiter.check(await _identity(scope), scope["method"], scope["path"])
+        if not decision.allowed:
+            retry_after = str(max(1, math.ceil(decision.retry_after)))
+            body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", retry_after.encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await self.app(scope, receive, send)
+
+
+def _build_backend() -> RateLimitBackend:
+    if settings.rate_limit_backend == "redis":
+        return RedisRateLimitBackend(settings.redis_url)
+    return MemoryRateLimitBackend()
+
+
+rate_limiter = RateLimiter(_build_backend(), ROUTE_LIMITS)
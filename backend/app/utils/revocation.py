@@ -0,0 +1,218 @@
+"""
+Revoked-token list, keyed by the JWT `jti` claim.
+
+`decode_token` asks `revocation_list.is_revoked(jti)` for every token. A Bloom
+filter of all live revocations answers almost every check in-process; only its
+positives (revoked tokens plus ~REVOCATION_BLOOM_ERROR_RATE false positives) go
+to the backing store:
+
+- "memory": a dict in this process (single worker, tests).
+- "redis":  `revoked:<jti>` keys expiring at the token's `exp`, plus a sorted set
+            by `exp` that every process rebuilds its filter from. Any server
+            speaking the Redis protocol works, including local stand-ins.
+
+Entries expire at the token's own `exp`, after which the signature check rejects
+it anyway. A background task (started in the app lifespan) rebuilds the filter
+from the store every REVOCATION_SYNC_SECONDS, which drops expired entries and
+bounds how long another process takes to see a revocation made elsewhere.
+
+`revoke` reports whether this call was the one that revoked the token, so
+single-use tokens (refresh rotation) can be spent exactly once across workers.
+"""
+from typing import Iterable, Protocol
+import asyncio
+import hashlib
+import logging
+import math
+import time
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing (Kirsch-Mitzenmacher) over one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationBackend(Protocol):
+    async def add(self, jti: str, expires_at: float) -> bool:
+        """Store the jti; False if it was already revoked."""
+        ...
+
+    async def contains(self, jti: str) -> bool: ...
+
+    async def live_entries(self) -> list[str]:
+        """All jtis that have not expired yet (used to rebuild the Bloom filter)."""
+        ...
+
+
+class MemoryRevocationBackend:
+    def __init__(self):
+        self._entries: dict[str, float] = {}
+
+    async def add(self, jti: str, expires_at: float) -> bool:
+        # No await between the check and the write: atomic on the event loop
+        if await self.contains(jti):
+            return False
+        self._entries[jti] = expires_at
+        return True
+
+    async def contains(self, jti: str) -> bool:
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    async def live_entries(self) -> list[str]:
+        now = time.time()
+        for jti in [jti for jti, exp in self._entries.items() if exp <= now]:
+            del self._entries[jti]
+        return list(self._entries)
+
+
+class RedisRevocationBackend:
+    """Redis-protocol backend, reached only on Bloom positives and when rebuilding."""
+
+    KEY_PREFIX = "revoked:"
+    INDEX_KEY = "revoked:index"
+
+    def __init__(self, url: str | None = None, client=None):
+        self.url = url or settings.redis_url
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis.asyncio as redis
+
+            self._client = redis.from_url(self.url)
+        return self._client
+
+    async def add(self, jti: str, expires_at: float) -> bool:
+        # SET NX decides the race: only one concurrent revoke of a jti gets True
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(self.KEY_PREFIX + jti, 1, exat=int(math.ceil(expires_at)), nx=True)
+        pipe.zadd(self.INDEX_KEY, {jti: expires_at})
+        created, _ = await pipe.execute()
+        return bool(created)
+
+    async def contains(self, jti: str) -> bool:
+        try:
+            return bool(await self.client.exists(self.KEY_PREFIX + jti))
+        except Exception as e:
+            # Only Bloom positives get here, which are mostly revoked: fail closed
+            logger.warning(f"Revocation lookup failed, treating token as revoked: {e}")
+            return True
+
+    async def live_entries(self) -> list[str]:
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zremrangebyscore(self.INDEX_KEY, "-inf", now)
+        pipe.zrangebyscore(self.INDEX_KEY, now, "+inf")
+        _, members = await pipe.execute()
+        return [m.decode() if isinstance(m, bytes) else m for m in members]
+
+
+class RevocationList:
+    def __init__(
+        self,
+        backend: RevocationBackend,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        sync_seconds: float = 5.0,
+    ):
+        self.backend = backend
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self._filter = BloomFilter(capacity, error_rate)
+        self._syncer: asyncio.Task | None = None
+        # Revoked in this process since the running rebuild started reading the store
+        self._recent: set[str] = set()
+        self.checks = 0
+        self.store_lookups = 0
+
+    async def sync(self) -> None:
+        """Rebuild the filter from the store's live entries."""
+        self._recent = set()
+        try:
+            entries = await self.backend.live_entries()
+        except Exception as e:
+            logger.warning(f"Revocation list sync failed, keeping the previous filter: {e}")
+            return
+        bloom = BloomFilter(max(self.capacity, len(entries) * 2), self.error_rate)
+        for jti in [*entries, *self._recent]:
+            bloom.add(jti)
+        self._filter = bloom
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await self.sync()
+            await asyncio.sleep(self.sync_seconds)
+
+    def start(self) -> None:
+        if self._syncer is None or self._syncer.done():
+            self._syncer = asyncio.create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        if self._syncer is not None:
+            self._syncer.cancel()
+            await asyncio.gather(self._syncer, return_exceptions=True)
+            self._syncer = None
+
+    async def revoke(self, jti: str | None, expires_at: float) -> bool:
+        """Revoke `jti` until `expires_at`; False if it was already revoked (or expired)."""
+        if not jti or expires_at <= time.time():
+            return False
+        self._filter.add(jti)
+        self._recent.add(jti)
+        return await self.backend.add(jti, expires_at)
+
+    async def is_revoked(self, jti: str | None) -> bool:
+        if not jti:
+            return False
+        self.checks += 1
+        if jti not in self._filter:
+            return False
+        self.store_lookups += 1
+        return await self.backend.contains(jti)
+
+    def stats(self) -> dict:
+        return {
+            "syncing": self._syncer is not None and not self._syncer.done(),
+            "checks": self.checks,
+            "store_lookups": self.store_lookups,
+            "bloom_bits": self._filter.num_bits,
+            "bloom_hashes": self._filter.num_hashes,
+        }
+
+
+def _build_backend() -> RevocationBackend:
+    if settings.revocation_backend == "redis":
+        return RedisRevocationBackend(settings.redis_url)
+    return MemoryRevocationBackend()
+
+
+revocation_list = RevocationList(
+    _build_backend(),
+    capacity=settings.revocation_bloom_capacity,
+    error_rate=settings.revocation_bloom_error_rate,
+    sync_seconds=settings.revocation_sync_seconds,
+)
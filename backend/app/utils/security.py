@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta, timezone
-from uuid import UUID
+from uuid import UUID, uuid4
 import jwt
 from passlib.context import CryptContext
 from app.config import settings
+from app.utils.revocation import revocation_list
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -15,6 +16,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify, and return a fresh hash if the stored one uses deprecated settings."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def create_access_token(user_id: UUID, expires_delta: timedelta | None = None) -> str:
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=settings.access_token_expire_minutes)
@@ -22,6 +28,8 @@ def create_access_token(user_id: UUID, expires_delta: timedelta | None = None) -
     payload = {
         "sub": str(user_id),
         "exp": expire,
+        "iat": datetime.now(timezone.utc),
+        "jti": uuid4().hex,
         "type": "access",
     }
     return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
@@ -32,14 +40,24 @@ def create_refresh_token(user_id: UUID) -> str:
     payload = {
         "sub": str(user_id),
         "exp": expire,
+        "iat": datetime.now(timezone.utc),
+        "jti": uuid4().hex,
         "type": "refresh",
     }
     return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
-def decode_token(token: str) -> dict | None:
+async def decode_token(token: str) -> dict | None:
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        return payload
     except jwt.PyJWTError:
         return None
+
+    if await revocation_list.is_revoked(payload.get("jti")):
+        return None
+    return payload
+
+
+async def revoke_token(payload: dict) -> bool:
+    """Revoke a decoded token until it expires; False if it already was."""
+    return await revocation_list.revoke(payload.get("jti"), payload["exp"])
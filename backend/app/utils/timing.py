@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+from typing import Awaitable, Iterator, TypeVar
+import time
+
+T = TypeVar("T")
+
+
+class StageTimer:
+    """Wall-clock milliseconds per named stage of a request, plus the total so far."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = int((time.perf_counter() - start) * 1000)
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable` as stage `name` (for stages run concurrently as tasks)."""
+        with self.stage(name):
+            return await awaitable
+
+    def elapsed_ms(self) -> int:
+        return int((time.perf_counter() - self.started) * 1000)
+
+    def breakdown(self) -> dict[str, int]:
+        """Stage timings with the total; concurrent stages overlap, so they can sum past it."""
+        return {**self.stages, "total": self.elapsed_ms()}
@@ -0,0 +1,200 @@
+"""
+Durable queue for work that can run after the response.
+
+Request handlers call `work_queue.enqueue(db, kind, payload)`, which adds a
+`DeferredTask` row to the request's own session: the task commits (or rolls back)
+together with the change it belongs to, and survives restarts until handled.
+Committing a session that enqueued something wakes this process's worker.
+
+Each kind has its own worker task, so a slow handler (a Gemini call) does not
+hold up the others. A worker claims up to its handler's batch size of due tasks with
+`FOR UPDATE SKIP LOCKED` (so several API processes can share the table), runs
+the handler once for the whole batch in that transaction, and deletes the rows.
+If a batch fails, its tasks are retried one by one so a single bad payload
+cannot hold back the rest; failed tasks back off exponentially and are dropped
+after DEFERRED_MAX_ATTEMPTS.
+
+Handlers are registered with `@work_queue.handler(kind)` (see
+app/services/deferred_handlers.py).
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+from uuid import UUID
+import asyncio
+import logging
+
+from sqlalchemy import delete, event, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.deferred import DeferredTask
+
+logger = logging.getLogger(__name__)
+
+HandlerFn = Callable[[AsyncSession, list[dict]], Awaitable[None]]
+
+ENQUEUED_KEY = "work_queue_enqueued"
+
+
+@dataclass(frozen=True)
+class Handler:
+    kind: str
+    fn: HandlerFn
+    batch_size: int
+
+
+class WorkQueue:
+    def __init__(self, poll_seconds: float, batch_size: int, max_attempts: int):
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.session_factory = AsyncSessionLocal
+        self.handlers: dict[str, Handler] = {}
+        self._wakes: dict[str, asyncio.Event] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def handler(self, kind: str, batch_size: int | None = None) -> Callable[[HandlerFn], HandlerFn]:
+        """Register `fn(db, payloads)` for tasks of `kind`. It must not commit."""
+
+        def register(fn: HandlerFn) -> HandlerFn:
+            self.handlers[kind] = Handler(kind, fn, batch_size or self.batch_size)
+            return fn
+
+        return register
+
+    def enqueue(self, db: AsyncSession, kind: str, payload: dict, delay_seconds: float = 0) -> None:
+        """Add a task to `db`'s transaction; it is queued once the caller commits."""
+        if kind not in self.handlers:
+            raise ValueError(f"No deferred task handler for {kind!r}")
+        task = DeferredTask(kind=kind, payload=payload, attempts=0)
+        if delay_seconds:
+            task.run_after = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+        db.add(task)
+        db.sync_session.info[ENQUEUED_KEY] = True
+
+    def notify(self) -> None:
+        for wake in self._wakes.values():
+            wake.set()
+
+    async def run_once(self) -> int:
+        """Process one batch of due tasks per kind, kinds concurrently. Returns the number handled."""
+        handled = await asyncio.gather(*(self._run_batch(handler) for handler in list(self.handlers.values())))
+        return sum(handled)
+
+    async def _run_batch(self, handler: Handler, task_ids: list[UUID] | None = None) -> int:
+        query = (
+            select(DeferredTask.id, DeferredTask.payload)
+            .where(DeferredTask.kind == handler.kind, DeferredTask.run_after <= func.now())
+            .order_by(DeferredTask.run_after)
+            .limit(handler.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        if task_ids is not None:
+            query = query.where(DeferredTask.id.in_(task_ids))
+
+        async with self.session_factory() as db:
+            rows = (await db.execute(query)).all()
+            if not rows:
+                return 0
+            ids = [row.id for row in rows]
+            try:
+                await handler.fn(db, [row.payload for row in rows])
+                await db.execute(delete(DeferredTask).where(DeferredTask.id.in_(ids)))
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                if len(ids) > 1:
+                    logger.warning(f"Deferred {handler.kind} batch of {len(ids)} failed, retrying singly: {e!r}")
+                    handled = 0
+                    for task_id in ids:
+                        handled += await self._run_batch(handler, [task_id])
+                    return handled
+                await self._record_failure(db, handler.kind, ids[0], e)
+                return 0
+
+        self.processed += len(ids)
+        return len(ids)
+
+    async def _record_failure(self, db: AsyncSession, kind: str, task_id: UUID, error: Exception) -> None:
+        self.failed += 1
+        result = await db.execute(
+            update(DeferredTask)
+            .where(DeferredTask.id == task_id)
+            .values(
+                attempts=DeferredTask.attempts + 1,
+                run_after=func.now() + text("interval '1 second'") * func.power(2, DeferredTask.attempts),
+                last_error=repr(error)[:1000],
+            )
+            .returning(DeferredTask.attempts)
+        )
+        attempts = result.scalar_one_or_none()
+        if attempts is not None and attempts >= self.max_attempts:
+            await db.execute(delete(DeferredTask).where(DeferredTask.id == task_id))
+            self.dropped += 1
+            logger.error(f"Dropping deferred {kind} task {task_id} after {attempts} attempts: {error!r}")
+        else:
+            logger.warning(f"Deferred {kind} task {task_id} failed (attempt {attempts}): {error!r}")
+        await db.commit()
+
+    async def _loop(self, handler: Handler, wake: asyncio.Event) -> None:
+        while True:
+            wake.clear()
+            try:
+                handled = await self._run_batch(handler)
+            except Exception as e:
+                logger.error(f"Deferred {handler.kind} pass failed: {e!r}")
+                handled = 0
+            if handled:
+                continue  # Drain the backlog before sleeping
+            try:
+                await asyncio.wait_for(wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        for kind, handler in self.handlers.items():
+            worker = self._workers.get(kind)
+            if worker is None or worker.done():
+                wake = self._wakes[kind] = asyncio.Event()
+                self._workers[kind] = asyncio.create_task(self._loop(handler, wake))
+
+    async def stop(self) -> None:
+        # Unfinished tasks stay in the table for the next start
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        self._wakes.clear()
+
+    def stats(self) -> dict:
+        return {
+            "running": sorted(kind for kind, worker in self._workers.items() if not worker.done()),
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+work_queue = WorkQueue(
+    poll_seconds=settings.deferred_poll_seconds,
+    batch_size=settings.deferred_batch_size,
+    max_attempts=settings.deferred_max_attempts,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_worker(session: Session) -> None:
+    if session.info.pop(ENQUEUED_KEY, False):
+        work_queue.notify()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_enqueued(session: Session, previous_transaction) -> None:
+    session.info.pop(ENQUEUED_KEY, None)
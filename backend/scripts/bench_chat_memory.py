@@ -0,0 +1,135 @@
+"""
+Recall and latency of chat memory recall (HNSW) against exact nearest-neighbour search.
+
+Seeds --users throwaway users with --messages embedded chat messages each (clustered
+random 384-d vectors, spread over a few sessions per user), then runs --queries
+searches through ChatService._recall, the production query:
+  - exact: the same query with index scans disabled (sequential scan and sort)
+  - ANN: the HNSW index at each --ef-search value (CHAT_MEMORY_EF_SEARCH)
+and reports recall@k against exact plus p50/p95 latency.
+
+Needs the index from migration 010. Seeding 100k rows into an indexed table takes a
+few minutes.
+
+Usage:
+    python -m scripts.bench_chat_memory [--users 200] [--messages 500] [--queries 200] \\
+        [--k 3] [--ef-search 10,20,40,80,160]
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy import insert, text
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.models.chat import ChatMessage, ChatSession
+from app.models.user import User
+from app.services.chat_service import ChatService
+
+DIMENSION = 384
+SESSIONS_PER_USER = 5
+INSERT_CHUNK = 5_000
+
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+async def seed(args: argparse.Namespace, rng: np.random.Generator, centers: np.ndarray) -> list[User]:
+    async with AsyncSessionLocal() as db:
+        users = [User(email=f"memory-bench-{time.time_ns()}-{i}@example.com") for i in range(args.users)]
+        db.add_all(users)
+        await db.flush()
+        sessions = [ChatSession(user_id=user.id) for user in users for _ in range(SESSIONS_PER_USER)]
+        db.add_all(sessions)
+        await db.flush()
+
+        rows = []
+        for i in range(args.users * args.messages):
+            session = sessions[i % len(sessions)]
+            vector = unit(centers[rng.integers(len(centers))] + 0.5 * rng.standard_normal(DIMENSION))
+            rows.append({
+                "session_id": session.id,
+                "role": "user",
+                "content": f"m{i}",
+                "embedding": vector.astype(np.float32),
+            })
+        for start in range(0, len(rows), INSERT_CHUNK):
+            await db.execute(insert(ChatMessage), rows[start:start + INSERT_CHUNK])
+        await db.commit()
+    return users
+
+
+async def search(user: User, vector: list[float], exact: bool) -> tuple[set[str], float]:
+    async with AsyncSessionLocal() as db:
+        if exact:
+            await db.execute(text("SET LOCAL enable_indexscan = off"))
+        service = ChatService(db, user)
+        start = time.perf_counter()
+        # A fresh session id: nothing is in the context window, so nothing is skipped
+        rows = await service._recall(ChatSession(id=uuid4()), vector)
+        elapsed = time.perf_counter() - start
+    return {row.content for row in rows}, elapsed
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(0)
+    centers = unit(rng.standard_normal((50, DIMENSION)))
+    settings.chat_memory_k = args.k
+    settings.chat_memory_max_distance = 2.0  # Cosine distance upper bound: keep every hit
+
+    users = await seed(args, rng, centers)
+    print(
+        f"{args.users} users x {args.messages} messages, {args.queries} queries, k={args.k}, "
+        f"iterative_scan={settings.chat_memory_iterative_scan or 'off'}"
+    )
+    try:
+        queries = [
+            (
+                users[rng.integers(len(users))],
+                unit(centers[rng.integers(len(centers))] + 0.5 * rng.standard_normal(DIMENSION)).tolist(),
+            )
+            for _ in range(args.queries)
+        ]
+
+        exact = []
+        latencies = []
+        for user, vector in queries:
+            found, elapsed = await search(user, vector, exact=True)
+            exact.append(found)
+            latencies.append(elapsed)
+        print(f"  exact          recall 1.000   p50 {np.percentile(latencies, 50) * 1000:7.2f} ms"
+              f"   p95 {np.percentile(latencies, 95) * 1000:7.2f} ms")
+
+        for ef_search in args.ef_search:
+            settings.chat_memory_ef_search = ef_search
+            hits = 0
+            latencies = []
+            for (user, vector), truth in zip(queries, exact):
+                found, elapsed = await search(user, vector, exact=False)
+                hits += len(found & truth)
+                latencies.append(elapsed)
+            recall = hits / max(1, sum(len(truth) for truth in exact))
+            print(f"  ef_search={ef_search:<4d} recall {recall:.3f}   p50 {np.percentile(latencies, 50) * 1000:7.2f} ms"
+                  f"   p95 {np.percentile(latencies, 95) * 1000:7.2f} ms")
+    finally:
+        async with AsyncSessionLocal() as db:
+            for user in users:
+                await db.delete(await db.get(User, user.id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument(
+        "--ef-search", type=lambda v: [int(x) for x in v.split(",")], default=[10, 20, 40, 80, 160]
+    )
+    asyncio.run(run(parser.parse_args()))
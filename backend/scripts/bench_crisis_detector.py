@@ -0,0 +1,61 @@
+"""
+Micro-benchmark for CrisisDetector: combined single-pass scan vs the per-pattern loop.
+
+Usage:
+    python -m scripts.bench_crisis_detector [n_messages]
+"""
+import random
+import sys
+import time
+
+from app.ml.crisis_detector import CrisisDetector
+
+FILLER_WORDS = (
+    "i feel today work sleep friend family tired happy good bad okay anxious about the "
+    "and maybe tomorrow really want go to school talk my mom dad life week better night"
+).split()
+
+CRISIS_PHRASES = [
+    "i want to die",
+    "feeling worthless lately",
+    "so hopeless and trapped",
+    "i can't cope anymore",
+    "thinking about self-harm",
+    "exhausted of living like this",
+]
+
+
+def build_corpus(n: int, crisis_ratio: float = 0.02, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        words = rng.choices(FILLER_WORDS, k=rng.randint(5, 60))
+        if rng.random() < crisis_ratio:
+            words.insert(rng.randint(0, len(words)), rng.choice(CRISIS_PHRASES))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def run(n: int = 100_000) -> None:
+    detector = CrisisDetector()
+    corpus = build_corpus(n)
+
+    start = time.perf_counter()
+    baseline = [detector._scan_patterns(text) for text in corpus]
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    combined = [detector._scan(text) for text in corpus]
+    combined_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(baseline, combined) if a != b)
+
+    print(f"messages:          {n}")
+    print(f"per-pattern loop:  {loop_seconds:.3f}s ({loop_seconds / n * 1e6:.1f} us/msg)")
+    print(f"combined scan:     {combined_seconds:.3f}s ({combined_seconds / n * 1e6:.1f} us/msg)")
+    print(f"speedup:           {loop_seconds / combined_seconds:.2f}x")
+    print(f"mismatches:        {mismatches}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,108 @@
+"""
+Time and peak Python memory of InsightService's mood read path for a heavy logger.
+
+Seeds a throwaway user with --logs mood logs (spread over the 90-day window) and
+--factors-per-log factors each, then compares:
+  - ORM: full MoodLog objects with factors selectin-loaded, converted to dicts
+    (what generate_insights used to do, minus the lazy-load failure)
+  - columnar: InsightService._load_mood_columns (one query, columns + array_agg)
+
+Usage:
+    python -m scripts.bench_insight_read_path [--logs 10000] [--factors-per-log 3]
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import selectinload
+
+from app.database import AsyncSessionLocal, engine
+from app.models.mood import MoodFactor, MoodLog
+from app.models.user import User
+from app.services.insight_service import InsightService
+
+FACTOR_TYPES = ["sleep", "exercise", "social", "work", "weather", "health"]
+
+
+async def orm_read(db, user_id, since) -> list[dict]:
+    result = await db.execute(
+        select(MoodLog)
+        .options(selectinload(MoodLog.factors))
+        .where(MoodLog.user_id == user_id, MoodLog.logged_at >= since)
+        .order_by(MoodLog.logged_at.desc())
+    )
+    return [
+        {
+            "logged_at": log.logged_at,
+            "mood_score": log.mood_score,
+            "time_of_day": log.time_of_day,
+            "factors": [
+                {"factor_type": f.factor_type, "factor_value": f.factor_value, "impact_score": f.impact_score}
+                for f in log.factors
+            ],
+        }
+        for log in result.scalars().all()
+    ]
+
+
+async def measure(label: str, make_coro) -> None:
+    async with AsyncSessionLocal() as db:
+        tracemalloc.start()
+        start = time.perf_counter()
+        await make_coro(db)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"  {label:9s} {elapsed * 1000:8.1f} ms   peak {peak / 1e6:7.1f} MB")
+
+
+async def run(args: argparse.Namespace) -> None:
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(days=90)
+
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"insight-bench-{time.time_ns()}@example.com")
+        db.add(user)
+        await db.flush()
+        log_ids = (await db.execute(
+            insert(MoodLog).returning(MoodLog.id),
+            [
+                {
+                    "user_id": user.id,
+                    "mood_score": random.randint(1, 10),
+                    "logged_at": now - timedelta(minutes=random.randint(0, 89 * 24 * 60)),
+                    "time_of_day": random.choice(["morning", "afternoon", "evening", "night"]),
+                }
+                for _ in range(args.logs)
+            ],
+        )).scalars().all()
+        await db.execute(
+            insert(MoodFactor),
+            [
+                {"mood_log_id": log_id, "factor_type": t, "impact_score": random.randint(-5, 5)}
+                for log_id in log_ids
+                for t in random.sample(FACTOR_TYPES, args.factors_per_log)
+            ],
+        )
+        await db.commit()
+
+    print(f"{args.logs} logs x {args.factors_per_log} factors")
+    try:
+        await measure("ORM", lambda db: orm_read(db, user.id, since))
+        await measure("columnar", lambda db: InsightService(db, user)._load_mood_columns(since))
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.delete(await db.get(User, user.id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logs", type=int, default=10_000)
+    parser.add_argument("--factors-per-log", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,75 @@
+"""
+p50/p99 latency of GET /health while a burst of concurrent logins is in flight.
+
+Run it against a live server twice, once with PASSWORD_HASH_WORKERS=0 (bcrypt
+inline on the event loop, the old behaviour) and once with the process pool:
+
+    PASSWORD_HASH_WORKERS=0 uvicorn app.main:app --port 8000 &
+    python -m scripts.bench_login_concurrency --logins 50
+
+Logins beyond the hasher's admission limit come back as 503 and are counted
+separately.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+PASSWORD = "bench-password-123"
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(base_url: str, logins: int, interval_ms: float) -> None:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        email = f"login-bench-{uuid.uuid4().hex[:8]}@example.com"
+        response = await client.post(
+            "/api/v1/auth/register", json={"email": email, "password": PASSWORD}
+        )
+        response.raise_for_status()
+
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(client, stop, interval_ms / 1000))
+        await asyncio.sleep(0.5)  # Idle baseline samples
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(
+                client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+                for _ in range(logins)
+            )
+        )
+        burst_seconds = time.perf_counter() - start
+
+        stop.set()
+        latencies = sorted(await prober)
+
+    codes = [r.status_code for r in responses]
+    print(f"logins:         {logins} in {burst_seconds:.2f}s")
+    print(f"  200 ok:       {codes.count(200)}")
+    print(f"  503 shed:     {codes.count(503)}")
+    print(f"/health samples: {len(latencies)}")
+    print(f"  p50:          {statistics.median(latencies):.1f} ms")
+    print(f"  p99:          {latencies[max(0, int(len(latencies) * 0.99) - 1)]:.1f} ms")
+    print(f"  max:          {latencies[-1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--interval-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.base_url, args.logins, args.interval_ms))
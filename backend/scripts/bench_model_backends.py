@@ -0,0 +1,109 @@
+"""
+Accuracy parity and CPU latency/throughput of the torch vs ONNX INT8 model backends.
+
+Exports the ONNX artifacts on first run (cached under ONNX_CACHE_DIR).
+
+Usage:
+    python -m scripts.bench_model_backends [--texts 512] [--batch-size 32]
+"""
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from app.ml.backends import (
+    OnnxEmbeddingBackend,
+    OnnxSentimentBackend,
+    TorchEmbeddingBackend,
+    TorchSentimentBackend,
+)
+
+SAMPLES = [
+    "I had a really good day with my friends",
+    "Work was stressful and I couldn't sleep",
+    "Feeling okay, nothing special happened",
+    "I'm so anxious about the exam tomorrow",
+    "Grateful for the sunny weather and a long walk",
+    "Everything feels pointless lately",
+    "My therapist session helped a lot",
+    "I don't know how I feel today",
+]
+
+
+def build_texts(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(SAMPLES, k=rng.randint(1, 3))) for _ in range(n)]
+
+
+def time_backend(fn, texts: list[str], batch_size: int) -> dict:
+    # Warm-up
+    fn(texts[:batch_size])
+
+    single = []
+    for text in texts[:64]:
+        start = time.perf_counter()
+        fn([text])
+        single.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        fn(texts[i : i + batch_size])
+    elapsed = time.perf_counter() - start
+
+    single.sort()
+    return {
+        "p50_ms": round(statistics.median(single), 2),
+        "p95_ms": round(single[int(len(single) * 0.95) - 1], 2),
+        "throughput_per_s": round(len(texts) / elapsed, 1),
+    }
+
+
+def sentiment_parity(texts: list[str], batch_size: int) -> None:
+    torch_backend, onnx_backend = TorchSentimentBackend(), OnnxSentimentBackend()
+
+    torch_out, onnx_out = [], []
+    for i in range(0, len(texts), batch_size):
+        torch_out += torch_backend.predict(texts[i : i + batch_size])
+        onnx_out += onnx_backend.predict(texts[i : i + batch_size])
+
+    agreement = sum(
+        a["label"].lower() == b["label"].lower() for a, b in zip(torch_out, onnx_out)
+    ) / len(texts)
+    score_diff = max(abs(a["score"] - b["score"]) for a, b in zip(torch_out, onnx_out))
+
+    print("Sentiment")
+    print(f"  label agreement:  {agreement:.2%}")
+    print(f"  max score diff:   {score_diff:.4f}")
+    print(f"  torch:            {time_backend(torch_backend.predict, texts, batch_size)}")
+    print(f"  onnx int8:        {time_backend(onnx_backend.predict, texts, batch_size)}")
+
+
+def embedding_parity(texts: list[str], batch_size: int) -> None:
+    torch_backend, onnx_backend = TorchEmbeddingBackend(), OnnxEmbeddingBackend()
+
+    torch_vecs = np.vstack(
+        [torch_backend.encode(texts[i : i + batch_size]) for i in range(0, len(texts), batch_size)]
+    )
+    onnx_vecs = np.vstack(
+        [onnx_backend.encode(texts[i : i + batch_size]) for i in range(0, len(texts), batch_size)]
+    )
+    torch_vecs /= np.linalg.norm(torch_vecs, axis=1, keepdims=True)
+    cosine = (torch_vecs * onnx_vecs).sum(axis=1)
+
+    print("Embedding")
+    print(f"  cosine vs torch:  mean={cosine.mean():.4f} min={cosine.min():.4f}")
+    print(f"  torch:            {time_backend(torch_backend.encode, texts, batch_size)}")
+    print(f"  onnx int8:        {time_backend(onnx_backend.encode, texts, batch_size)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    corpus = build_texts(args.texts)
+    sentiment_parity(corpus, args.batch_size)
+    embedding_parity(corpus, args.batch_size)
@@ -0,0 +1,66 @@
+"""
+Query count and latency of MoodService._calculate_streak for growing streak lengths.
+
+Seeds a throwaway user with one mood log per day for each streak length, then counts
+the SQL statements issued while computing the streak. Expect one query regardless
+of length (the previous per-day loop issued up to ~730).
+
+Usage:
+    python -m scripts.bench_mood_streak
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app.database import AsyncSessionLocal, engine
+from app.models.mood import MoodLog
+from app.models.user import User
+from app.services.mood_service import MoodService
+
+STREAK_LENGTHS = [1, 7, 30, 90, 180, 365]
+
+
+async def run() -> None:
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+    async with AsyncSessionLocal() as db:
+        for length in STREAK_LENGTHS:
+            user = User(email=f"streak-bench-{length}-{time.time_ns()}@example.com")
+            db.add(user)
+            await db.flush()
+
+            now = datetime.now(timezone.utc)
+            db.add_all(
+                MoodLog(user_id=user.id, mood_score=6, logged_at=now - timedelta(days=i))
+                for i in range(length)
+            )
+            await db.commit()
+
+            service = MoodService(db, user)
+            statements = 0
+            start = time.perf_counter()
+            streak = await service._calculate_streak()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            print(
+                f"streak={length:>3}  computed={streak:>3}  "
+                f"queries={statements}  time={elapsed_ms:.1f}ms"
+            )
+
+            await db.delete(user)
+            await db.commit()
+
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,100 @@
+"""
+Trend fitting throughput: batched numpy engine vs. per-user fits vs. Prophet.
+
+Generates synthetic 90-day mood series (trend + weekly pattern + noise, ~25%
+days missing, a few outliers) and times:
+  - numpy, batched: every user in one fit_trends call
+  - numpy, per user: one fit_trends call per user (what PatternDetector does)
+  - prophet: one Prophet fit per user, on a small sample (skipped if unavailable)
+
+It also reports how often the numpy and Prophet trend directions agree.
+
+Usage:
+    python -m scripts.bench_trend_engine [--users 5000] [--days 90] [--prophet-users 20]
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.ml.trend import fit_trends
+
+
+def synthetic_series(users: int, days: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    slopes = rng.normal(0, 0.03, users)
+    weekly = rng.normal(0, 0.8, (users, 7))
+    weekly -= weekly.mean(axis=1, keepdims=True)
+    values = 6 + slopes[:, None] * t + weekly[:, t % 7] + rng.normal(0, 1, (users, days))
+    outliers = rng.random((users, days)) < 0.03
+    values[outliers] = rng.choice([1.0, 10.0], outliers.sum())
+    values = np.clip(values, 1, 10)
+    values[rng.random((users, days)) < 0.25] = np.nan
+    return values, t % 7, slopes
+
+
+def prophet_trend_change(values: np.ndarray) -> float:
+    from prophet import Prophet
+
+    observed = ~np.isnan(values)
+    df = pd.DataFrame({
+        "ds": pd.date_range("2024-01-01", periods=len(values))[observed],  # A Monday
+        "y": values[observed],
+    })
+    model = Prophet(
+        daily_seasonality=False,
+        weekly_seasonality=True,
+        yearly_seasonality=False,
+        changepoint_prior_scale=0.1,
+    )
+    model.fit(df)
+    trend = model.predict(model.make_future_dataframe(periods=0))["trend"]
+    return float(trend.iloc[-1] - trend.iloc[0])
+
+
+def main(args: argparse.Namespace) -> None:
+    values, weekdays, slopes = synthetic_series(args.users, args.days)
+
+    start = time.perf_counter()
+    fit = fit_trends(values, weekdays)
+    batched = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in values:
+        fit_trends(row, weekdays)
+    per_user = time.perf_counter() - start
+
+    print(f"{args.users} users x {args.days} days")
+    print(f"  numpy batched:  {batched * 1000:8.1f} ms total, {batched / args.users * 1e6:8.1f} us/user")
+    print(f"  numpy per user: {per_user * 1000:8.1f} ms total, {per_user / args.users * 1e6:8.1f} us/user")
+    print(f"  slope recovery: mean abs error {np.abs(fit.slope - slopes).mean():.4f}/day")
+
+    sample = min(args.prophet_users, args.users)
+    if sample <= 0:
+        return
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    logging.getLogger("prophet").setLevel(logging.WARNING)
+    try:
+        start = time.perf_counter()
+        prophet_changes = np.array([prophet_trend_change(row) for row in values[:sample]])
+        prophet_seconds = time.perf_counter() - start
+    except Exception as e:
+        print(f"  prophet:        unavailable ({e})")
+        return
+
+    numpy_changes = fit.trend_change()[:sample]
+    agree = np.sign(numpy_changes) == np.sign(prophet_changes)
+    print(f"  prophet:        {prophet_seconds * 1000:8.1f} ms for {sample} users, "
+          f"{prophet_seconds / sample * 1e6:8.1f} us/user")
+    print(f"  direction agreement with prophet: {agree.mean():.0%} of {sample}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--prophet-users", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,68 @@
+"""
+Nightly insight generation for every user with unprocessed mood logs.
+
+Selects users who have mood logs with `processed_for_insights` still false and
+enqueues an insight job for each, through the same path as
+POST /insights/generate: users who already have a job queued or running are
+skipped, and each finished job marks that user's logs processed. Detection runs
+in a process pool of --workers processes.
+
+Run from cron, e.g. `0 3 * * *`:
+    python -m scripts.generate_insights_nightly [--workers N] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import os
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models.mood import MoodLog
+from app.models.user import User
+from app.services.insight_jobs import insight_job_runner
+from app.services.insight_service import InsightService
+
+
+async def main(args: argparse.Namespace) -> None:
+    insight_job_runner.workers = args.workers
+    insight_job_runner.start()
+
+    unprocessed = (
+        select(MoodLog.user_id)
+        .where(MoodLog.processed_for_insights.is_not(True))
+        .distinct()
+    )
+    query = select(User).where(User.id.in_(unprocessed), User.deleted_at.is_(None))
+
+    enqueued = 0
+    already_running = 0
+    try:
+        async with AsyncSessionLocal() as scan, AsyncSessionLocal() as db:
+            stream = await scan.stream_scalars(query.execution_options(yield_per=args.batch_size))
+            async for user in stream:
+                before = insight_job_runner.pending
+                await InsightService(db, user).enqueue_generation(trigger="nightly")
+                if insight_job_runner.pending > before:
+                    enqueued += 1
+                else:
+                    already_running += 1
+
+                # Keep every worker busy without queueing the whole user table
+                await insight_job_runner.drain(max_pending=args.workers * 2)
+
+        await insight_job_runner.drain()
+    finally:
+        await insight_job_runner.shutdown()
+
+    stats = insight_job_runner.stats()
+    print(
+        f"enqueued {enqueued} jobs ({already_running} users already had one): "
+        f"{stats['succeeded']} succeeded, {stats['failed']} failed"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
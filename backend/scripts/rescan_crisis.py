@@ -0,0 +1,147 @@
+"""
+Re-scan historical chat messages and mood notes for crisis indicators.
+
+Run after the crisis patterns change. Rows are streamed with server-side cursors,
+scored across all cores in a process pool, and any hits are written back as
+CrisisEvent rows in bulk (plus the per-row crisis flags).
+
+Rows already flagged are skipped: the flag is set both by the live chat path
+(which raised its own CrisisEvent) and by earlier rescans, so each source row
+produces at most one event however often the script runs.
+
+Usage:
+    python -m scripts.rescan_crisis [--source chat|mood|all] [--batch-size 2000]
+                                    [--workers N] [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from uuid import UUID
+
+from sqlalchemy import insert, select, update
+
+from app.database import AsyncSessionLocal
+from app.ml.crisis_detector import CrisisResult, analyze_many
+from app.models.chat import ChatMessage, ChatSession
+from app.models.crisis import CrisisEvent
+from app.models.mood import MoodLog
+from app.utils.encryption import hash_content
+
+# source name -> (trigger_source stored on CrisisEvent, row query, model to flag, flag column)
+SOURCES = {
+    "chat": (
+        "chat",
+        select(ChatMessage.id, ChatSession.user_id, ChatMessage.content)
+        .join(ChatSession, ChatSession.id == ChatMessage.session_id)
+        .where(ChatMessage.role == "user", ChatMessage.crisis_detected.is_not(True)),
+        ChatMessage,
+        "crisis_detected",
+    ),
+    "mood": (
+        "mood_log",
+        select(MoodLog.id, MoodLog.user_id, MoodLog.note).where(
+            MoodLog.note.is_not(None), MoodLog.crisis_flag_triggered.is_not(True)
+        ),
+        MoodLog,
+        "crisis_flag_triggered",
+    ),
+}
+
+
+async def write_events(
+    trigger_source: str,
+    model,
+    flag_column: str,
+    rows: list[tuple[UUID, UUID, str]],
+    results: list[CrisisResult],
+    dry_run: bool,
+) -> int:
+    """
+    Insert CrisisEvent rows for the crisis hits of one batch and flag their rows.
+
+    The flag update is conditional, so a row flagged since it was read (e.g. by a
+    concurrent run) does not get a second event.
+    """
+    hits = {
+        row_id: (user_id, hash_content(text), result)
+        for (row_id, user_id, text), result in zip(rows, results)
+        if result.is_crisis
+    }
+    if not hits or dry_run:
+        return len(hits)
+
+    async with AsyncSessionLocal() as db:
+        flagged = await db.execute(
+            update(model)
+            .where(model.id.in_(list(hits)), getattr(model, flag_column).is_not(True))
+            .values({flag_column: True})
+            .returning(model.id)
+        )
+        new_ids = flagged.scalars().all()
+
+        if new_ids:
+            await db.execute(
+                insert(CrisisEvent),
+                [
+                    {
+                        "user_id": hits[row_id][0],
+                        "trigger_source": trigger_source,
+                        "trigger_content_hash": hits[row_id][1],
+                        "severity": hits[row_id][2].severity,
+                        "detection_confidence": hits[row_id][2].confidence,
+                    }
+                    for row_id in new_ids
+                ],
+            )
+        await db.commit()
+
+        return len(new_ids)
+
+
+async def rescan_source(
+    name: str, pool: ProcessPoolExecutor, workers: int, batch_size: int, dry_run: bool
+) -> None:
+    trigger_source, query, model, flag_column = SOURCES[name]
+    loop = asyncio.get_running_loop()
+    pending: set[asyncio.Task] = set()
+    scanned = 0
+    created = 0
+
+    async def process(rows: list[tuple[UUID, UUID, str]]) -> int:
+        results = await loop.run_in_executor(pool, analyze_many, [r[2] for r in rows])
+        return await write_events(trigger_source, model, flag_column, rows, results, dry_run)
+
+    async with AsyncSessionLocal() as db:
+        stream = await db.stream(query.execution_options(yield_per=batch_size))
+        async for partition in stream.partitions():
+            rows = [tuple(row) for row in partition]
+            scanned += len(rows)
+            pending.add(asyncio.create_task(process(rows)))
+
+            # Keep every worker busy without buffering the whole table in memory
+            if len(pending) >= workers * 2:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                created += sum(task.result() for task in done)
+
+        if pending:
+            created += sum(await asyncio.gather(*pending))
+
+    action = "would create" if dry_run else "created"
+    print(f"[{name}] scanned {scanned} rows, {action} {created} crisis events")
+
+
+async def main(args: argparse.Namespace) -> None:
+    sources = list(SOURCES) if args.source == "all" else [args.source]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for name in sources:
+            await rescan_source(name, pool, args.workers, args.batch_size, args.dry_run)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", choices=[*SOURCES, "all"], default="all")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(main(parser.parse_args()))
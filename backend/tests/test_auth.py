@@ -80,3 +80,23 @@ async def test_get_me(client: AsyncClient):
     assert response.status_code == 200
     data = response.json()
     assert data["email"] == "me@example.com"
+
+@pytest.mark.asyncio
+async def test_password_hasher_sheds_load_when_saturated():
+    import asyncio
+    from fastapi import HTTPException
+    from app.utils.password_hasher import PasswordHasher
+
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    try:
+        hashed = await hasher.hash("password123")
+        assert (await hasher.verify("password123", hashed))[0]
+
+        results = await asyncio.gather(
+            *(hasher.verify("password123", hashed) for _ in range(5)), return_exceptions=True
+        )
+        shed = [r for r in results if isinstance(r, HTTPException)]
+        assert len(shed) == 3
+        assert all(e.status_code == 503 and "Retry-After" in e.headers for e in shed)
+    finally:
+        hasher.shutdown()
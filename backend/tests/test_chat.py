@@ -1,8 +1,11 @@
+import asyncio
+import time
 import pytest
-from uuid import uuid4
+from uuid import UUID, uuid4
 from httpx import AsyncClient
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.chat import ChatSession
+from app.models.chat import ChatMessage, ChatSession
 
 pytestmark = pytest.mark.asyncio
 
@@ -49,6 +52,215 @@ async def test_send_message(client: AsyncClient, token_headers: dict):
     assert data["message"]["role"] == "assistant"
     assert data["message"]["content"]
     assert "suggestions" in data
+    assert {"crisis_detection", "generation", "user_embedding", "persist", "total"} <= set(data["timings"])
+
+
+async def test_send_message_runs_independent_stages_concurrently(
+    client: AsyncClient, token_headers: dict, monkeypatch
+):
+    from app.ml.crisis_detector import crisis_detector
+    from app.ml.embeddings import embedding_service
+
+    analyze = crisis_detector.analyze
+    spans = {}
+
+    async def slow_analyze(text):
+        start = time.perf_counter()
+        await asyncio.sleep(0.3)
+        result = await analyze(text)
+        spans["crisis_detection"] = (start, time.perf_counter())
+        return result
+
+    async def slow_embedding(text):
+        start = time.perf_counter()
+        await asyncio.sleep(0.3)
+        spans.setdefault("user_embedding", (start, time.perf_counter()))
+        return [0.0] * embedding_service.dimension
+
+    monkeypatch.setattr(crisis_detector, "analyze", slow_analyze)
+    monkeypatch.setattr(embedding_service, "generate", slow_embedding)
+
+    r = await client.post("/api/v1/chat/sessions", headers=token_headers, json={})
+    response = await client.post(
+        f"/api/v1/chat/sessions/{r.json()['id']}/messages",
+        headers=token_headers,
+        json={"content": "Long day at work"},
+    )
+
+    timings = response.json()["timings"]
+    assert timings["crisis_detection"] >= 300 and timings["user_embedding"] >= 300
+    # Overlapping, not back to back: each started before the other finished
+    (crisis_start, crisis_end), (embed_start, embed_end) = spans["crisis_detection"], spans["user_embedding"]
+    assert crisis_start < embed_end and embed_start < crisis_end
+
+
+async def test_similar_messages_from_other_sessions_are_recalled(
+    client: AsyncClient, token_headers: dict, monkeypatch
+):
+    from app.ml.embeddings import embedding_service
+    from app.ml.gemini_client import gemini_client
+
+    contexts = []
+
+    async def fake_chat(messages, is_crisis=False, **kwargs):
+        contexts.append(messages)
+        return {"content": "I hear you.", "model": "test", "tokens_used": 3}
+
+    async def topic_embedding(text):
+        vector = [0.0] * embedding_service.dimension
+        vector[0 if "sleep" in text else 1] = 1.0
+        return vector
+
+    monkeypatch.setattr(gemini_client, "chat", fake_chat)
+    monkeypatch.setattr(embedding_service, "generate", topic_embedding)
+
+    r = await client.post("/api/v1/chat/sessions", headers=token_headers, json={})
+    for content in ["I can't sleep at night", "Work is really busy"]:
+        await client.post(
+            f"/api/v1/chat/sessions/{r.json()['id']}/messages",
+            headers=token_headers,
+            json={"content": content},
+        )
+
+    r = await client.post("/api/v1/chat/sessions", headers=token_headers, json={})
+    response = await client.post(
+        f"/api/v1/chat/sessions/{r.json()['id']}/messages",
+        headers=token_headers,
+        json={"content": "My sleep is still rough"},
+    )
+    assert "memory_recall" in response.json()["timings"]
+
+    recalled = contexts[-1][0]["content"]
+    assert recalled.startswith("(From our earlier conversations")
+    assert "I can't sleep at night" in recalled
+    assert "Work is really busy" not in recalled
+
+
+async def test_older_messages_are_folded_into_the_session_summary(
+    client: AsyncClient, token_headers: dict, db: AsyncSession, monkeypatch
+):
+    from app.config import settings
+    from app.ml.gemini_client import gemini_client
+    from app.utils.work_queue import work_queue
+
+    monkeypatch.setattr(settings, "chat_context_messages", 4)
+    monkeypatch.setattr(settings, "chat_summary_every", 2)
+    monkeypatch.setattr(settings, "chat_memory_k", 0)
+    contexts = []
+    folded = []
+
+    async def fake_chat(messages, is_crisis=False, **kwargs):
+        contexts.append(messages)
+        return {"content": f"reply {len(contexts)}", "model": "test", "tokens_used": 3}
+
+    async def fake_summarize(summary, messages):
+        folded.extend(m["content"] for m in messages)
+        return f"summary of {len(folded)} messages"
+
+    monkeypatch.setattr(gemini_client, "chat", fake_chat)
+    monkeypatch.setattr(gemini_client, "summarize", fake_summarize)
+
+    r = await client.post("/api/v1/chat/sessions", headers=token_headers, json={})
+    session_id = r.json()["id"]
+    for turn in range(1, 7):
+        response = await client.post(
+            f"/api/v1/chat/sessions/{session_id}/messages",
+            headers=token_headers,
+            json={"content": f"message {turn}"},
+        )
+        assert response.status_code == 200
+        await work_queue.run_once()
+
+    # Oldest first, in conversation order
+    assert folded[:4] == ["message 1", "reply 1", "message 2", "reply 2"]
+
+    session = await db.get(ChatSession, UUID(session_id))
+    await db.refresh(session)
+    assert session.message_count == 12
+    assert session.summary_message_count == 8
+    assert session.context_summary == "summary of 8 messages"
+
+    # Summary + at most 4 recent messages + the new one, however long the session
+    assert all(len(context) <= 6 for context in contexts)
+    last = contexts[-1]
+    assert last[0]["content"].startswith("(Summary of our conversation so far")
+    assert last[-1] == {"role": "user", "content": "message 6"}
+
+
+async def test_stream_closed_early_keeps_the_turn(
+    client: AsyncClient, db: AsyncSession, test_user, monkeypatch
+):
+    from app.ml.gemini_client import gemini_client
+    from app.schemas.chat import ChatMessageSend, ChatSessionCreate
+    from app.services.chat_service import ChatService
+
+    async def fake_chat_stream(messages, is_crisis=False, **kwargs):
+        yield {"type": "delta", "text": "I hear"}
+        yield {"type": "delta", "text": " you."}
+        yield {"type": "done", "content": "I hear you.", "model": "test", "tokens_used": 3}
+
+    monkeypatch.setattr(gemini_client, "chat_stream", fake_chat_stream)
+
+    service = ChatService(db, test_user)
+    session = await service.create_session(ChatSessionCreate())
+    events = await service.stream_message(session.id, ChatMessageSend(content="Rough night"))
+    assert (await anext(events))[0] == "delta"
+    await events.aclose()  # What the server does when the client disconnects
+
+    db.expire_all()
+    result = await db.execute(
+        select(ChatMessage.role, ChatMessage.content, ChatMessage.model_used)
+        .where(ChatMessage.session_id == session.id)
+        .order_by(ChatMessage.created_at)
+    )
+    assert result.all() == [("user", "Rough night", None), ("assistant", "I hear", "aborted")]
+    assert (await db.get(ChatSession, session.id)).message_count == 2
+
+
+async def test_concurrent_summaries_fold_a_session_once(
+    client: AsyncClient, db: AsyncSession, test_user, monkeypatch
+):
+    from datetime import datetime, timedelta, timezone
+    from app.config import settings
+    from app.ml.gemini_client import gemini_client
+    from app.services.deferred_handlers import summarize_chat_sessions
+    from app.utils.work_queue import work_queue
+
+    monkeypatch.setattr(settings, "chat_context_messages", 2)
+    monkeypatch.setattr(settings, "chat_summary_every", 2)
+    started = datetime.now(timezone.utc)
+    session = ChatSession(user_id=test_user.id, message_count=6)
+    db.add(session)
+    await db.flush()
+    db.add_all(
+        ChatMessage(session_id=session.id, role="user", content=f"m{i}", created_at=started + timedelta(seconds=i))
+        for i in range(6)
+    )
+    await db.commit()
+
+    calls = []
+    both_summarizing = asyncio.Event()
+
+    async def fake_summarize(summary, messages):
+        # Both runs read the session before either writes
+        calls.append(messages)
+        if len(calls) == 2:
+            both_summarizing.set()
+        await both_summarizing.wait()
+        return f"summary of {len(messages)} messages"
+
+    monkeypatch.setattr(gemini_client, "summarize", fake_summarize)
+
+    async def run():
+        async with work_queue.session_factory() as worker_db:
+            await summarize_chat_sessions(worker_db, [{"session_id": str(session.id)}])
+            await worker_db.commit()
+
+    await asyncio.gather(run(), run())
+
+    await db.refresh(session)
+    assert session.summary_message_count == 4
+    assert session.context_summary == "summary of 4 messages"
 
 
 async def test_crisis_detection_in_chat(client: AsyncClient, token_headers: dict):
@@ -69,3 +281,33 @@ async def test_crisis_detection_in_chat(client: AsyncClient, token_headers: dict
     assert data["crisis_alert"] is not None
     assert data["crisis_alert"]["severity"] in ["high", "critical"]
     assert len(data["crisis_alert"]["resources"]) > 0
+
+
+async def test_stream_message_crisis_alert_first(
+    client: AsyncClient, token_headers: dict, db: AsyncSession
+):
+    r = await client.post("/api/v1/chat/sessions", headers=token_headers, json={})
+    session_id = r.json()["id"]
+
+    response = await client.post(
+        f"/api/v1/chat/sessions/{session_id}/messages/stream",
+        headers=token_headers,
+        json={"content": "I want to kill myself"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [
+        line.removeprefix("event: ")
+        for line in response.text.splitlines()
+        if line.startswith("event: ")
+    ]
+    assert events[0] == "crisis_alert"
+    assert "delta" in events
+    assert events[-1] == "done"
+
+    # Persisted after the request's own db session was released
+    db.expire_all()
+    session = await client.get(f"/api/v1/chat/sessions/{session_id}", headers=token_headers)
+    assert session.json()["message_count"] == 2
+    assert [m["role"] for m in session.json()["messages"]] == ["user", "assistant"]
@@ -40,3 +40,33 @@ async def test_crisis_self_check_critical(client: AsyncClient, token_headers: di
     data = response.json()
     assert data["risk_level"] == "critical"
     assert data["professional_referral_suggested"] is True
+
+
+async def test_combined_scan_matches_per_pattern_loop():
+    from app.ml.crisis_detector import CrisisDetector
+    from scripts.bench_crisis_detector import build_corpus
+
+    detector = CrisisDetector()
+    corpus = build_corpus(2000, crisis_ratio=0.3) + [
+        "Everyone would be better without me, I'm worthless and hopeless",
+        "I want to die, I'm suicidal and can't cope",
+        "exhausted of life, trapped, desperate",
+        "I'm not going to give up on this SELF HARM recovery",
+    ]
+
+    for text in corpus:
+        expected = detector._build_result(*detector._scan_patterns(text))
+        assert await detector.analyze(text) == expected
+
+
+async def test_analyze_many_in_process_pool():
+    from concurrent.futures import ProcessPoolExecutor
+    from app.ml.crisis_detector import analyze_many, crisis_detector
+
+    texts = ["I want to kill myself", "", None, "feeling hopeless and trapped", "good day"]
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = pool.submit(analyze_many, texts).result()
+
+    assert [r.severity for r in results] == ["critical", "none", "none", "medium", "none"]
+    assert results == [crisis_detector.detect(t) for t in texts]
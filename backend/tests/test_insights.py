@@ -1,20 +1,32 @@
+import asyncio
 import pytest
 from httpx import AsyncClient
-from app.main import app
-from app.models.mood import MoodLog
+from sqlalchemy import select
+from app.models.insight import InsightJob
+from app.models.mood import MoodFactor, MoodLog
+from app.models.user import User
+from app.services.insight_jobs import insight_job_runner
+from app.services.insight_service import InsightService
 from datetime import datetime, timezone, timedelta
+from uuid import uuid4
 
 @pytest.mark.asyncio
-async def test_generate_insights_empty(async_client: AsyncClient, test_user, token_headers):
-    response = await async_client.post("/api/v1/insights/generate", headers=token_headers)
+async def test_generate_insights_empty(client: AsyncClient, test_user, token_headers):
+    response = await client.post("/api/v1/insights/generate", headers=token_headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] in ("queued", "running")
+
+    await insight_job_runner.drain()
+    response = await client.get(f"/api/v1/insights/jobs/{job['id']}", headers=token_headers)
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
+    assert data["status"] == "succeeded"
     # Should be empty if no mood logs
-    assert len(data) == 0
+    assert data["insights_created"] == 0
 
 @pytest.mark.asyncio
-async def test_generate_insights_with_data(async_client: AsyncClient, db_session, test_user, token_headers):
+async def test_generate_insights_with_data(client: AsyncClient, db, test_user, token_headers):
     # Seed mood data
     base_time = datetime.now(timezone.utc)
     for i in range(15):
@@ -24,22 +36,80 @@ async def test_generate_insights_with_data(async_client: AsyncClient, db_session
             logged_at=base_time - timedelta(days=i),
             description="Test log"
         )
-        db_session.add(log)
-    await db_session.commit()
+        db.add(log)
+    await db.commit()
 
-    response = await async_client.post("/api/v1/insights/generate", headers=token_headers)
-    assert response.status_code == 200
+    # Concurrent requests for the same user share one job
+    first, second = await asyncio.gather(
+        client.post("/api/v1/insights/generate", headers=token_headers),
+        client.post("/api/v1/insights/generate", headers=token_headers),
+    )
+    assert first.status_code == second.status_code == 202
+    assert first.json()["id"] == second.json()["id"]
+
+    await insight_job_runner.drain()
+    response = await client.get(f"/api/v1/insights/jobs/{first.json()['id']}", headers=token_headers)
     data = response.json()
-    
-    # We expect at least one insight (e.g. pattern or trend)
-    # but strictly depends on the pattern detector logic and data
-    # This test primarily checks the endpoint doesn't crash
-    assert isinstance(data, list)
+
+    # The number of insights depends on the pattern detector logic and data;
+    # this checks the job completes and the logs are marked processed
+    assert data["status"] == "succeeded"
+    result = await db.execute(
+        select(MoodLog.processed_for_insights).where(MoodLog.user_id == test_user.id)
+    )
+    assert all(result.scalars().all())
 
 @pytest.mark.asyncio
-async def test_list_insights(async_client: AsyncClient, token_headers):
-    response = await async_client.get("/api/v1/insights", headers=token_headers)
+async def test_list_insights(client: AsyncClient, token_headers):
+    response = await client.get("/api/v1/insights", headers=token_headers)
     assert response.status_code == 200
     data = response.json()
     assert "items" in data
     assert "total" in data
+
+
+@pytest.mark.asyncio
+async def test_load_mood_columns_aggregates_factors(db, test_user):
+    base_time = datetime.now(timezone.utc)
+    for i in range(3):
+        log = MoodLog(
+            user_id=test_user.id,
+            mood_score=5 + i,
+            logged_at=base_time - timedelta(days=i),
+            time_of_day="morning",
+        )
+        log.factors = [MoodFactor(factor_type=t, impact_score=i) for t in ["sleep", "work"][:i]]
+        db.add(log)
+    await db.commit()
+
+    service = InsightService(db, test_user)
+    logs, factors = await service._load_mood_columns(base_time - timedelta(days=90))
+
+    assert logs["mood_score"] == [5, 6, 7]  # Newest first
+    assert logs["time_of_day"] == ["morning"] * 3
+    assert sorted(zip(factors["mood_score"], factors["factor_type"], factors["impact_score"])) == [
+        (6, "sleep", 1),
+        (7, "sleep", 2),
+        (7, "work", 2),
+    ]
+
+
+
+@pytest.mark.asyncio
+async def test_recover_takes_over_orphaned_jobs(client: AsyncClient, db, test_user):
+    # Left behind by a process that stopped: one never started, one cut off mid-run
+    stale = datetime.now(timezone.utc) - timedelta(seconds=insight_job_runner.timeout_seconds + 60)
+    other_user = User(email=f"user-{uuid4().hex[:12]}@example.com")
+    db.add(other_user)
+    await db.flush()
+    queued = InsightJob(user_id=test_user.id, status="queued", created_at=stale)
+    running = InsightJob(user_id=other_user.id, status="running", created_at=stale, started_at=stale)
+    db.add_all([queued, running])
+    await db.commit()
+
+    assert await insight_job_runner.recover(InsightService.job_work) == 1
+    await insight_job_runner.drain()
+
+    db.expire_all()
+    assert (await db.get(InsightJob, queued.id)).status == "succeeded"
+    assert (await db.get(InsightJob, running.id)).status == "failed"
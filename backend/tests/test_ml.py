@@ -0,0 +1,187 @@
+import asyncio
+import pytest
+
+from app.ml.batching import MicroBatcher
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_micro_batcher_coalesces_concurrent_requests():
+    calls = []
+
+    def double(items: list[int]) -> list[int]:
+        calls.append(len(items))
+        return [i * 2 for i in items]
+
+    batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=20, name="test")
+    try:
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+    finally:
+        await batcher.close()
+
+    assert results == [i * 2 for i in range(20)]
+    assert sum(calls) == 20
+    assert max(calls) <= 8
+    assert len(calls) < 20
+
+
+async def test_micro_batcher_propagates_errors():
+    def fail(items: list[int]) -> list[int]:
+        raise ValueError("model failed")
+
+    batcher = MicroBatcher(fail, max_batch_size=4, max_wait_ms=1, name="test")
+    try:
+        with pytest.raises(ValueError):
+            await batcher.submit(1)
+    finally:
+        await batcher.close()
+
+
+async def test_micro_batcher_runs_batches_on_bounded_pool():
+    import threading
+    import time
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_identity(items: list[int]) -> list[int]:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return items
+
+    batcher = MicroBatcher(slow_identity, max_batch_size=4, max_wait_ms=1, max_workers=2)
+    try:
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(32)))
+    finally:
+        await batcher.close()
+
+    assert results == list(range(32))
+    assert peak <= 2
+    stats = batcher.stats()
+    assert stats["items_processed"] == 32
+    assert stats["largest_batch_size"] <= 4
+    assert stats["queue_depth"] == 0
+
+
+async def test_embedding_cache_reuses_vectors():
+    import numpy as np
+    from app.ml.embeddings import EmbeddingService
+
+    encoded = []
+
+    class FakeBackend:
+        def encode(self, texts: list[str]) -> np.ndarray:
+            encoded.extend(texts)
+            return np.full((len(texts), 384), len(encoded), dtype=np.float32)
+
+    service = EmbeddingService()
+    service._model = FakeBackend()
+    try:
+        first = await service.generate("I understand")
+        batch = await service.generate_batch(["i  understand", "Continue", "", "Continue"])
+    finally:
+        await service.batcher.close()
+
+    assert encoded == ["i understand", "continue"]
+    assert batch[0] == first
+    assert batch[1] == batch[3]
+    assert batch[2] == [0.0] * 384
+    assert service.stats()["cache"]["hits"] == 1
+
+
+async def test_two_tier_stats_counts_shared_hits_against_local_lookups():
+    from app.utils.cache import LRUCache, two_tier_stats
+
+    cache = LRUCache(10)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.get("c")
+
+    stats = two_tier_stats(cache, shared_hits=1)
+    assert (stats["hits"], stats["misses"], stats["shared_hits"]) == (1, 2, 1)
+    assert stats["overall_hit_rate"] == round(2 / 3, 4)
+
+
+async def test_gemini_caches_only_deterministic_or_templated_requests():
+    from types import SimpleNamespace
+    from app.ml.gemini_client import GeminiClient
+
+    configs = []
+
+    async def generate_content(model, contents, config):
+        configs.append(config)
+        return SimpleNamespace(text=f"reply {len(configs)}", usage_metadata=SimpleNamespace(total_token_count=7))
+
+    client = GeminiClient()
+    client.client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+    messages = [{"role": "user", "content": "Start my check-in"}]
+
+    templated = await client.chat(messages, cacheable=True)
+    repeat = await client.chat(messages, cacheable=True)
+    assert repeat["content"] == templated["content"] == "reply 1"
+    assert repeat["tokens_used"] == 0
+
+    # Sampled, or a crisis turn: always a fresh model call
+    await client.chat(messages)
+    await client.chat(messages, is_crisis=True, cacheable=True)
+    deterministic = await client.chat(messages, temperature=0.0)
+    assert (await client.chat(messages, temperature=0.0))["content"] == deterministic["content"]
+    assert len(configs) == 4
+
+    # Config objects are reused per (is_crisis, temperature, max_tokens)
+    assert configs[0] is configs[1]
+    assert configs[0] is not configs[2] and configs[0] is not configs[3]
+    assert client.stats()["configs"] == 3
+
+
+async def test_gemini_does_not_cache_a_truncated_stream():
+    from types import SimpleNamespace
+    from app.ml.gemini_client import GeminiClient
+
+    calls = []
+
+    async def generate_content_stream(model, contents, config):
+        calls.append(config)
+
+        async def chunks():
+            yield SimpleNamespace(text="Hello", usage_metadata=None)
+            if len(calls) == 1:
+                raise ConnectionError("stream reset")
+            yield SimpleNamespace(text=" there", usage_metadata=None)
+
+        return chunks()
+
+    client = GeminiClient()
+    client.client = SimpleNamespace(
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content_stream=generate_content_stream))
+    )
+    messages = [{"role": "user", "content": "Start my check-in"}]
+
+    async def stream() -> dict:
+        return [event async for event in client.chat_stream(messages, cacheable=True)][-1]
+
+    assert (await stream())["content"] == "Hello"  # Cut off: not cached
+    assert (await stream())["content"] == "Hello there"
+    assert (await stream())["content"] == "Hello there"
+    assert len(calls) == 2
+
+
+async def test_embedding_shared_cache_is_namespaced_by_model_and_backend(monkeypatch):
+    from app.config import settings
+    from app.ml.backends import EMBEDDING_MODEL
+    from app.ml.embeddings import EmbeddingService
+
+    monkeypatch.setattr(settings, "embedding_cache_shared", True)
+    monkeypatch.setattr(settings, "ml_backend", "onnx")
+    service = EmbeddingService()
+    try:
+        assert service.shared_cache.prefix == f"emb:{EMBEDDING_MODEL}:onnx:"
+    finally:
+        await service.batcher.close()
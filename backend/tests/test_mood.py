@@ -55,3 +55,80 @@ async def test_mood_trends(client: AsyncClient, normal_user_token_headers):
     response = await client.get("/api/v1/mood/trends", headers=normal_user_token_headers)
     assert response.status_code == 200
     assert "data_points" in response.json()
+
+@pytest.mark.asyncio
+async def test_mood_stats_streak(client: AsyncClient, normal_user_token_headers):
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime.now(timezone.utc)
+    for days_ago in range(3):
+        await client.post(
+            "/api/v1/mood/logs",
+            json={"mood_score": 6, "logged_at": (now - timedelta(days=days_ago)).isoformat()},
+            headers=normal_user_token_headers,
+        )
+
+    response = await client.get("/api/v1/mood/stats?period=7d", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert response.json()["streak_days"] >= 3
+
+@pytest.mark.asyncio
+async def test_mood_trends_follow_log_updates(client: AsyncClient, normal_user_token_headers):
+    from datetime import datetime, timedelta, timezone
+
+    logged_at = (datetime.now(timezone.utc) - timedelta(days=20)).isoformat()
+    response = await client.post(
+        "/api/v1/mood/logs",
+        json={"mood_score": 2, "logged_at": logged_at},
+        headers=normal_user_token_headers,
+    )
+    log_id = response.json()["id"]
+
+    def day_point(trends):
+        return next(p for p in trends["data_points"] if p["date"] == logged_at[:10])
+
+    response = await client.patch(
+        f"/api/v1/mood/logs/{log_id}", json={"mood_score": 4}, headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    response = await client.get("/api/v1/mood/trends?period=30d", headers=normal_user_token_headers)
+    assert day_point(response.json())["avg_mood"] == 4
+
+    response = await client.delete(f"/api/v1/mood/logs/{log_id}", headers=normal_user_token_headers)
+    assert response.status_code == 204
+    response = await client.get("/api/v1/mood/trends?period=30d", headers=normal_user_token_headers)
+    assert all(p["date"] != logged_at[:10] for p in response.json()["data_points"])
+
+@pytest.mark.asyncio
+async def test_list_mood_logs_cursor(client: AsyncClient, normal_user_token_headers):
+    for score in (3, 4, 5):
+        await client.post("/api/v1/mood/logs", json={"mood_score": score}, headers=normal_user_token_headers)
+
+    first = (await client.get(
+        "/api/v1/mood/logs?per_page=2", headers=normal_user_token_headers
+    )).json()
+    assert first["next_cursor"]
+
+    second = (await client.get(
+        f"/api/v1/mood/logs?per_page=2&cursor={first['next_cursor']}", headers=normal_user_token_headers
+    )).json()
+    assert second["total"] is None
+    assert not {item["id"] for item in first["items"]} & {item["id"] for item in second["items"]}
+
+@pytest.mark.asyncio
+async def test_rebuild_rollups_after_timezone_change(db, test_user):
+    from datetime import datetime, timezone
+    from app.models.mood import MoodDailyRollup
+    from app.services.mood_service import MoodService
+
+    db.add(MoodLog(user_id=test_user.id, mood_score=3, logged_at=datetime(2026, 3, 2, 23, 30, tzinfo=timezone.utc)))
+    await db.commit()
+
+    test_user.timezone = "Asia/Tokyo"
+    await MoodService(db, test_user).rebuild_rollups()
+    await db.commit()
+
+    rollups = (await db.execute(
+        select(MoodDailyRollup).where(MoodDailyRollup.user_id == test_user.id)
+    )).scalars().all()
+    assert [(r.local_date.isoformat(), r.day_of_week, r.log_count) for r in rollups] == [("2026-03-03", 1, 1)]
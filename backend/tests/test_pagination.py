@@ -0,0 +1,48 @@
+import base64
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.models import ChatSession, Recommendation
+from app.utils.pagination import SortKey, _keyset_predicate, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    keys = [SortKey(Recommendation.priority), SortKey(Recommendation.created_at), SortKey(Recommendation.id)]
+    row = SimpleNamespace(priority=7, created_at=datetime(2026, 5, 1, 9, 30, tzinfo=timezone.utc), id=uuid4())
+
+    cursor = encode_cursor(keys, row)
+    assert decode_cursor(keys, cursor) == [row.priority, row.created_at, row.id]
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(keys, cursor[:-4] + "!!!!")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("values", [[None, None, 5], [7, 5, 5], [7, "2026-05-01T09:30:00+00:00", 5], [[1], None, None]])
+def test_cursor_rejects_mistyped_values(values):
+    keys = [SortKey(Recommendation.priority), SortKey(Recommendation.created_at), SortKey(Recommendation.id)]
+    cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(keys, cursor)
+    assert exc.value.status_code == 400
+
+
+def test_keyset_predicate_handles_null_sort_values():
+    keys = [SortKey(ChatSession.last_message_at), SortKey(ChatSession.id)]
+    dialect = postgresql.dialect()
+
+    # Rows after a NULL last_message_at: the remaining NULLs by id, then every non-NULL
+    null_cursor = str(_keyset_predicate(keys, [None, uuid4()]).compile(dialect=dialect))
+    assert "last_message_at IS NOT NULL" in null_cursor
+    assert "last_message_at IS NULL AND chat_sessions.id <" in null_cursor
+
+    # Non-NULL cursor: a single row-value comparison
+    row_value = str(_keyset_predicate(keys, [datetime.now(timezone.utc), uuid4()]).compile(dialect=dialect))
+    assert row_value.startswith("(chat_sessions.last_message_at, chat_sessions.id) <")
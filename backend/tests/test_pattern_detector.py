@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from app.ml.pattern_detector import PatternDetector
+
+
+def _factor_columns(rows: int = 300, seed: int = 0) -> dict[str, list]:
+    rng = np.random.default_rng(seed)
+    mood = rng.integers(1, 11, rows).astype(float)
+    types = rng.choice(["sleep", "work", "weather", "rare"], rows, p=[0.4, 0.3, 0.29, 0.01])
+    impact = np.select(
+        [types == "sleep", types == "work"],
+        [mood * 0.8, -mood * 0.5],
+        0,
+    ) + rng.normal(0, 1.5, rows)
+    impact = [None if i % 17 == 0 else float(v) for i, v in enumerate(impact)]
+    return {"mood_score": mood.tolist(), "factor_type": types.tolist(), "impact_score": impact}
+
+
+def test_factor_correlations_match_pandas():
+    factors = _factor_columns()
+    df = pd.DataFrame(factors)
+
+    insights = PatternDetector()._detect_factor_correlations(df)
+
+    assert [i.data_points["factor_type"] for i in insights] == ["sleep", "work"]
+    for insight in insights:
+        factor_type = insight.data_points["factor_type"]
+        group = df[df["factor_type"] == factor_type]
+        expected = group["mood_score"].corr(group["impact_score"].astype(float))
+        assert insight.data_points["correlation"] == round(expected, 2)
+        assert insight.data_points["sample_size"] == len(group)
+    assert "Good sleep" in insights[0].title
+    assert "Poor work" in insights[1].title
+
+
+def test_nested_factors_match_columns():
+    factors = _factor_columns(seed=1)
+    logs = [
+        {"mood_score": m, "factors": [{"factor_type": t, "impact_score": i}]}
+        for m, t, i in zip(factors["mood_score"], factors["factor_type"], factors["impact_score"])
+    ]
+    detector = PatternDetector()
+
+    flattened = detector._factor_columns(pd.DataFrame(logs))
+
+    assert flattened == factors
+    nested = detector._detect_factor_correlations(pd.DataFrame(flattened))
+    columnar = detector._detect_factor_correlations(pd.DataFrame(factors))
+    assert [i.data_points for i in nested] == [i.data_points for i in columnar]
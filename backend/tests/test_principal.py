@@ -0,0 +1,33 @@
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.utils.principal import PrincipalCache, UserPrincipal
+
+
+def test_principal_cache_invalidation():
+    cache = PrincipalCache(max_entries=100, ttl_seconds=30)
+    user_id = uuid4()
+    principal = UserPrincipal(id=user_id, subscription_tier="free")
+
+    cache.set(user_id, 1000, principal, loaded_at=time.monotonic())
+    assert cache.get(user_id, 1000) is principal
+    assert cache.get(user_id, 1001) is None  # Other token, other entry
+
+    # A row read before the invalidation must not be served after it
+    loaded_at = time.monotonic()
+    cache.invalidate(user_id)
+    cache.set(user_id, 1000, principal, loaded_at=loaded_at)
+    assert cache.get(user_id, 1000) is None
+
+    cache.set(user_id, 1000, principal, loaded_at=time.monotonic())
+    assert cache.get(user_id, 1000) is principal
+
+
+def test_principal_from_row():
+    row = SimpleNamespace(_mapping={"id": uuid4(), "timezone": "Europe/Paris", "subscription_tier": "premium"})
+    principal = UserPrincipal.from_row(row)
+
+    assert principal.timezone == "Europe/Paris"
+    assert principal.is_premium
+    assert not hasattr(principal, "__dict__")
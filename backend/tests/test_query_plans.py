@@ -0,0 +1,72 @@
+"""
+EXPLAIN regression tests for the hot per-user queries.
+
+Sequential scans are disabled for the session, so the planner only picks one when
+no index can serve the query - i.e. when an index from migration 006 is missing or
+a query stops matching it.
+"""
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import literal_column, or_, select
+from sqlalchemy.dialects import postgresql
+
+from app.models import ContentLibrary, JournalEntry, MoodFactor, MoodLog, Recommendation, UserInsight
+
+USER_ID = uuid4()
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+async def explain(db, stmt) -> str:
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    conn = await db.connection()
+    await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    result = await conn.exec_driver_sql(f"EXPLAIN {sql}")
+    return "\n".join(row[0] for row in result)
+
+
+HOT_QUERIES = {
+    "mood_logs_range": select(MoodLog)
+    .where(MoodLog.user_id == USER_ID, MoodLog.logged_at >= NOW - timedelta(days=90))
+    .order_by(MoodLog.logged_at.desc()),
+    "mood_logs_page": select(MoodLog)
+    .where(MoodLog.user_id == USER_ID)
+    .order_by(MoodLog.logged_at.desc())
+    .limit(20),
+    "mood_factors_for_logs": select(MoodFactor).where(MoodFactor.mood_log_id == uuid4()),
+    "journal_entries_page": select(JournalEntry)
+    .where(JournalEntry.user_id == USER_ID)
+    .order_by(JournalEntry.created_at.desc())
+    .limit(20),
+    "active_insights": select(UserInsight)
+    .where(
+        UserInsight.user_id == USER_ID,
+        UserInsight.dismissed_at.is_(None),
+        or_(UserInsight.valid_until.is_(None), UserInsight.valid_until > NOW),
+    )
+    .order_by(UserInsight.created_at.desc())
+    .limit(20),
+    "todays_recommendations": select(Recommendation).where(
+        Recommendation.user_id == USER_ID, Recommendation.created_at >= NOW
+    ),
+    "open_recommendations": select(Recommendation)
+    .where(
+        Recommendation.user_id == USER_ID,
+        or_(Recommendation.expires_at.is_(None), Recommendation.expires_at > NOW),
+        Recommendation.completed_at.is_(None),
+    )
+    .order_by(Recommendation.priority.desc(), Recommendation.created_at.desc())
+    .limit(20),
+    # JSONB has no literal renderer; this is the SQL `target_moods.contains(["anxious"])` emits
+    "content_by_mood": select(ContentLibrary).where(
+        ContentLibrary.target_moods.op("@>")(literal_column("""'["anxious"]'::jsonb"""))
+    ),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", HOT_QUERIES)
+async def test_hot_queries_use_an_index(db, name):
+    plan = await explain(db, HOT_QUERIES[name])
+    assert "Seq Scan" not in plan, plan
@@ -0,0 +1,41 @@
+import pytest
+
+from app.config import settings
+from app.utils.rate_limit import MemoryRateLimitBackend, RateLimiter, RouteLimit
+
+LOGIN = ("POST", f"{settings.api_v1_prefix}/auth/login")
+CHAT = ("POST", f"{settings.api_v1_prefix}/chat/sessions/4f1c/messages")
+LIST = ("GET", f"{settings.api_v1_prefix}/mood/logs")
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_budget", 20)
+    monkeypatch.setattr(settings, "rate_limit_budget_per_minute", 60)
+    return RateLimiter(
+        MemoryRateLimitBackend(),
+        {
+            "POST /auth/login": RouteLimit(cost=5, per_minute=3),
+            "POST /chat/sessions/{session_id}/messages": RouteLimit(cost=10),
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_route_bucket_limits_before_budget(limiter):
+    results = [await limiter.check("ip:1", *LOGIN) for _ in range(4)]
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[-1].retry_after > 0
+    # Other callers are unaffected
+    assert (await limiter.check("ip:2", *LOGIN)).allowed
+
+
+@pytest.mark.asyncio
+async def test_costs_share_one_budget(limiter):
+    assert (await limiter.check("user:a", *CHAT)).allowed
+    assert (await limiter.check("user:a", *CHAT)).allowed
+    # 20 units spent: even a cost-1 read is refused until the budget refills
+    denied = await limiter.check("user:a", *LIST)
+    assert not denied.allowed
+    assert 0 < denied.retry_after <= 1
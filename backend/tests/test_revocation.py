@@ -0,0 +1,56 @@
+import asyncio
+import time
+from uuid import uuid4
+
+from app.utils.revocation import BloomFilter, MemoryRevocationBackend, RevocationList
+from app.utils.security import create_access_token, create_refresh_token, decode_token, revoke_token
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [uuid4().hex for _ in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(uuid4().hex in bloom for _ in range(10_000))
+    assert false_positives < 300  # ~1% expected
+
+
+async def test_revocation_list_only_consults_store_on_bloom_hits():
+    revocations = RevocationList(MemoryRevocationBackend(), capacity=1000, error_rate=0.001)
+    await revocations.revoke("stolen", time.time() + 60)
+    await revocations.revoke("already-expired", time.time() - 1)
+
+    assert await revocations.is_revoked("stolen")
+    assert not await revocations.is_revoked("already-expired")
+    for _ in range(100):
+        assert not await revocations.is_revoked(uuid4().hex)
+    assert revocations.store_lookups <= 3
+
+
+async def test_revocation_list_sync_rebuilds_from_store():
+    backend = MemoryRevocationBackend()
+    revocations = RevocationList(backend, capacity=1000, error_rate=0.001)
+    # Revoked by another process: only the store has it until the next rebuild
+    await backend.add("elsewhere", time.time() + 60)
+    assert not await revocations.is_revoked("elsewhere")
+
+    await revocations.sync()
+    assert await revocations.is_revoked("elsewhere")
+
+
+async def test_revoked_token_no_longer_decodes():
+    token = create_access_token(uuid4())
+    payload = await decode_token(token)
+    assert payload is not None
+
+    assert await revoke_token(payload)
+    assert await decode_token(token) is None
+
+
+async def test_concurrent_rotation_spends_a_refresh_token_once():
+    payload = await decode_token(create_refresh_token(uuid4()))
+
+    spent = await asyncio.gather(*(revoke_token(payload) for _ in range(5)))
+    assert spent.count(True) == 1
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+import socketio
+from httpx import AsyncClient
+
+from app.api import socket as gateway
+from app.ml.gemini_client import gemini_client
+from app.models.user import User
+from app.utils.rate_limit import Decision
+from app.utils.security import create_access_token, decode_token, revoke_token
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def emitted(client: AsyncClient, monkeypatch):
+    """Record what the gateway sends instead of going through a real socket."""
+    events = []
+
+    async def emit(event, data, to=None, skip_sid=None):
+        events.append((event, data))
+
+    async def enter_room(sid, room):
+        events.append(("entered", {"room": room}))
+
+    async def disconnect(sid):
+        events.append(("disconnected", {}))
+        await gateway.disconnect(sid)
+
+    monkeypatch.setattr(gateway.sio, "emit", emit)
+    monkeypatch.setattr(gateway.sio, "enter_room", enter_room)
+    monkeypatch.setattr(gateway.sio, "disconnect", disconnect)
+    yield events
+    for sid in list(gateway.connections):
+        await gateway.disconnect(sid)
+
+
+async def _wait_for(events: list, name: str) -> dict:
+    for _ in range(200):
+        for event, data in events:
+            if event == name:
+                return data
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{name} was never sent: {events}")
+
+
+async def _connect_and_join(client, token_headers, test_user: User, sid: str) -> str:
+    await gateway.connect(sid, {}, {"token": create_access_token(test_user.id)})
+    r = await client.post("/api/v1/chat/sessions", headers=token_headers, json={})
+    room_id = r.json()["id"]
+    await gateway.join_room(sid, {"roomId": room_id})
+    return room_id
+
+
+async def test_connect_rejects_invalid_token(emitted):
+    with pytest.raises(socketio.exceptions.ConnectionRefusedError):
+        await gateway.connect("sid-bad", {}, {"token": "not-a-jwt"})
+    assert "sid-bad" not in gateway.connections
+
+
+async def test_join_room_checks_session_ownership(client, emitted, test_user):
+    await gateway.connect("sid-join", {}, {"token": create_access_token(test_user.id)})
+    await gateway.join_room("sid-join", {"roomId": "00000000-0000-0000-0000-000000000000"})
+
+    assert (await _wait_for(emitted, "error"))["message"] == "Chat session not found"
+    assert "entered" not in [event for event, _ in emitted]
+
+
+async def test_send_message_streams_and_persists(
+    client, db, emitted, token_headers, test_user, monkeypatch
+):
+    async def fake_stream(messages, is_crisis=False, **kwargs):
+        yield {"type": "delta", "text": "I hear "}
+        yield {"type": "delta", "text": "you."}
+        yield {
+            "type": "done", "content": "I hear you.", "tokens_used": 3, "model": "test", "suggestions": None
+        }
+
+    monkeypatch.setattr(gemini_client, "chat_stream", fake_stream)
+    room_id = await _connect_and_join(client, token_headers, test_user, "sid-msg")
+    assert ("entered", {"room": room_id}) in emitted
+
+    await gateway.send_message("sid-msg", {"id": "c1", "sessionId": room_id, "content": "Rough day"})
+
+    message = await _wait_for(emitted, "new_message")
+    assert message["content"] == "I hear you."
+    assert [d["text"] for e, d in emitted if e == "message_delta"] == ["I hear ", "you."]
+
+    db.expire_all()  # Persisted through the stream's own session
+    session = await client.get(f"/api/v1/chat/sessions/{room_id}", headers=token_headers)
+    assert session.json()["message_count"] == 2
+
+
+async def test_expired_token_drops_the_connection(client, emitted, token_headers, test_user):
+    room_id = await _connect_and_join(client, token_headers, test_user, "sid-exp")
+    gateway.connections["sid-exp"].token = create_access_token(test_user.id, timedelta(seconds=-1))
+
+    await gateway.send_message("sid-exp", {"id": "c1", "sessionId": room_id, "content": "Hello"})
+
+    assert ("disconnected", {}) in emitted
+    assert "sid-exp" not in gateway.connections
+    assert "new_message" not in [event for event, _ in emitted]
+
+
+async def test_leave_room_rechecks_the_token(client, emitted, token_headers, test_user):
+    room_id = await _connect_and_join(client, token_headers, test_user, "sid-leave")
+    await revoke_token(await decode_token(gateway.connections["sid-leave"].token))
+
+    await gateway.leave_room("sid-leave", {"roomId": room_id})
+
+    assert ("disconnected", {}) in emitted
+    assert "sid-leave" not in gateway.connections
+
+
+async def test_send_message_is_rate_limited(client, emitted, token_headers, test_user, monkeypatch):
+    from app.config import settings
+
+    async def deny(identity, method, path):
+        assert identity == f"user:{test_user.id}"
+        assert path.endswith("/messages/stream")
+        return Decision(allowed=False, remaining=0, retry_after=4.2)
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(gateway.rate_limiter, "check", deny)
+    room_id = await _connect_and_join(client, token_headers, test_user, "sid-rl")
+
+    await gateway.send_message("sid-rl", {"id": "c1", "sessionId": room_id, "content": "Hello"})
+
+    status = await _wait_for(emitted, "message_status")
+    assert status == {"id": "c1", "status": "error", "retryAfter": 5}
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.pattern_detector import PatternDetector
+from app.ml.trend import daily_series, fit_trends
+
+
+def _series(slopes, days=60, seed=0, missing=0.2):
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    weekly = np.array([-1.5, -0.5, 0, 0.5, 0.5, 1.0, 0.0])
+    values = 5 + np.asarray(slopes)[:, None] * t + weekly[t % 7] + rng.normal(0, 0.5, (len(slopes), days))
+    values[:, ::11] = 10.0  # Outlier days
+    values[rng.random(values.shape) < missing] = np.nan
+    return values, t % 7, weekly
+
+
+def test_fit_trends_recovers_slope_and_weekday_effects():
+    slopes = np.array([0.05, -0.05, 0.0])
+    values, weekdays, weekly = _series(slopes, days=120)
+
+    fit = fit_trends(values, weekdays)
+
+    np.testing.assert_allclose(fit.slope, slopes, atol=0.01)
+    np.testing.assert_allclose(fit.weekday_effects, np.tile(weekly, (3, 1)), atol=0.4)
+    np.testing.assert_allclose(fit.weekday_effects.sum(axis=1), 0, atol=1e-9)
+
+
+def test_fit_trends_batched_matches_per_series():
+    values, weekdays, _ = _series(np.linspace(-0.1, 0.1, 8), seed=1)
+    values[3] = np.nan  # A user with no data at all
+    values[4, 1:] = np.nan  # ...and one with a single day
+
+    fit = fit_trends(values, weekdays)
+
+    for i, row in enumerate(values):
+        single = fit_trends(row, weekdays)
+        np.testing.assert_allclose(single.slope, fit.slope[i : i + 1], atol=1e-9)
+    assert fit.slope[3] == 0 and fit.slope[4] == 0
+    assert np.all(np.isfinite(fit.intercept))
+
+
+def test_daily_series_averages_per_day_and_fills_gaps():
+    dates = np.array(["2026-01-05T08:00", "2026-01-05T20:00", "2026-01-08T09:00"], dtype="datetime64[m]")
+
+    values, weekdays, days = daily_series(dates, np.array([4, 6, 9]))
+
+    np.testing.assert_array_equal(values, [5, np.nan, np.nan, 9])
+    np.testing.assert_array_equal(weekdays, [0, 1, 2, 3])  # 2026-01-05 is a Monday
+    assert len(days) == 2
+
+
+def _mood_logs(slope: float, days: int = 45) -> list[dict]:
+    rng = np.random.default_rng(2)
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "logged_at": now - timedelta(days=days - i),
+            "mood_score": float(np.clip(5 + slope * i + rng.normal(0, 0.7), 1, 10)),
+            "factors": [],
+        }
+        for i in range(days)
+    ]
+
+
+@pytest.mark.parametrize("slope,word", [(0.08, "upward"), (-0.08, "declining")])
+def test_pattern_detector_reports_trend_direction(slope, word):
+    insights = PatternDetector(trend_engine="numpy").detect(_mood_logs(slope))
+
+    trends = [i for i in insights if i.insight_type == "trend"]
+    assert len(trends) == 1
+    assert word in trends[0].title
+    assert np.sign(trends[0].data_points["trend_change"]) == np.sign(slope)
+
+
+def test_numpy_trend_direction_agrees_with_prophet():
+    pytest.importorskip("prophet")
+    values, weekdays, _ = _series(np.array([0.06, -0.06, 0.03, -0.03]), days=45, seed=3)
+    days = pd.date_range("2026-01-05", periods=values.shape[1])  # Starts on a Monday
+    detector = PatternDetector(trend_engine="prophet")
+
+    numpy_changes = fit_trends(values, weekdays).trend_change()
+    for row, numpy_change in zip(values, numpy_changes):
+        observed = ~np.isnan(row)
+        daily = pd.DataFrame({"ds": days[observed], "y": row[observed]})
+        try:
+            trend = detector._fit_trend_prophet(daily)
+        except Exception as e:  # e.g. no Stan backend installed
+            pytest.skip(f"Prophet cannot fit here: {e}")
+        assert np.sign(trend[-1] - trend[0]) == np.sign(numpy_change)
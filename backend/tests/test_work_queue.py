@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models.content import ContentLibrary
+from app.models.deferred import DeferredTask
+from app.utils.work_queue import work_queue
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_content_views_are_counted_after_the_response(
+    client: AsyncClient, db, token_headers: dict
+):
+    content = ContentLibrary(content_type="meditation", title="Body scan", is_active=True, view_count=0)
+    db.add(content)
+    await db.commit()
+
+    for _ in range(3):
+        response = await client.get(f"/api/v1/content/{content.id}", headers=token_headers)
+        assert response.status_code == 200
+
+    pending = await db.execute(select(DeferredTask).where(DeferredTask.kind == "content_view"))
+    assert len(pending.scalars().all()) == 3
+
+    assert await work_queue.run_once() >= 3
+
+    await db.refresh(content)
+    assert content.view_count == 3
+    remaining = await db.execute(select(DeferredTask).where(DeferredTask.kind == "content_view"))
+    assert remaining.scalars().all() == []
+
+
+async def test_failed_batch_is_retried_singly(client: AsyncClient, db):
+    handled = []
+
+    @work_queue.handler("test_flaky", batch_size=10)
+    async def flaky(session, payloads):
+        if any(p["n"] == 2 for p in payloads):
+            raise ValueError("bad payload")
+        handled.extend(p["n"] for p in payloads)
+
+    try:
+        for n in range(4):
+            work_queue.enqueue(db, "test_flaky", {"n": n})
+        await db.commit()
+
+        assert await work_queue.run_once() == 3
+        assert sorted(handled) == [0, 1, 3]
+
+        result = await db.execute(select(DeferredTask).where(DeferredTask.kind == "test_flaky"))
+        (failed,) = result.scalars().all()
+        await db.refresh(failed)
+        assert failed.payload == {"n": 2}
+        assert failed.attempts == 1
+        assert "bad payload" in failed.last_error
+    finally:
+        work_queue.handlers.pop("test_flaky")
+        await db.execute(DeferredTask.__table__.delete().where(DeferredTask.kind == "test_flaky"))
+        await db.commit()
+
+
+async def test_kinds_are_processed_concurrently(client: AsyncClient, db):
+    other_ran = asyncio.Event()
+
+    @work_queue.handler("test_slow")
+    async def slow(session, payloads):
+        # Sequential kinds would deadlock here until the timeout
+        await asyncio.wait_for(other_ran.wait(), 5)
+
+    @work_queue.handler("test_fast")
+    async def fast(session, payloads):
+        other_ran.set()
+
+    try:
+        work_queue.enqueue(db, "test_slow", {})
+        work_queue.enqueue(db, "test_fast", {})
+        await db.commit()
+
+        assert await work_queue.run_once() >= 2
+    finally:
+        work_queue.handlers.pop("test_slow")
+        work_queue.handlers.pop("test_fast")
+        await db.execute(DeferredTask.__table__.delete().where(DeferredTask.kind.in_(["test_slow", "test_fast"])))
+        await db.commit()